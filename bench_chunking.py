@@ -0,0 +1,120 @@
+"""Compare Discord chunking strategies on patches stored in the Deadlock DB.
+
+Usage: python bench_chunking.py [--limit 1950] [--rows 50] [--large-kb 500]
+Needs the same environment as main.py (Deadlock DB, PATCH_CHANNEL_ID).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+from time import perf_counter
+
+os.environ.setdefault("BOT_SKIP_RUN", "1")
+
+import main  # noqa: E402
+import patch_chunking  # noqa: E402
+
+
+def _greedy_pack_blocks(
+    blocks: list[str],
+    limit: int,
+    sizes: list[int] | None = None,
+    separator: str = "\n\n",
+    separator_size: int | None = None,
+) -> list[str]:
+    """Reference: the greedy packer used before balanced packing."""
+    if sizes is None:
+        sizes = [len(block) for block in blocks]
+    sep_size = len(separator) if separator_size is None else separator_size
+    chunks: list[str] = []
+    current: list[str] = []
+    current_size = 0
+    for block, size in zip(blocks, sizes):
+        if current and current_size + sep_size + size > limit:
+            chunks.append(separator.join(current))
+            current = []
+            current_size = 0
+        current_size += size + (sep_size if current else 0)
+        current.append(block)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def _load_texts(rows: int) -> list[tuple[str, str]]:
+    result = main._db_query_all(
+        """
+        SELECT url, posted_at, translated_content, translated_hash
+        FROM changelog_posts
+        WHERE translated_content IS NOT NULL OR translated_hash IS NOT NULL
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (rows,),
+    )
+    texts = []
+    for row in result:
+        translated = main._stored_text(row["translated_content"], row["translated_hash"])
+        cleaned = main._cleanup_for_discord(translated, row["posted_at"])
+        texts.append((row["url"], cleaned))
+    return texts
+
+
+def _describe(chunks: list[str]) -> str:
+    sizes = [len(chunk) for chunk in chunks]
+    if not sizes:
+        return "0 chunks"
+    spread = statistics.pstdev(sizes) if len(sizes) > 1 else 0.0
+    return f"{len(sizes)} chunks, min={min(sizes)}, stdev={spread:.0f}"
+
+
+def bench_discord_packing(texts: list[tuple[str, str]], limit: int) -> None:
+    greedy_total = balanced_total = 0
+    greedy_time = balanced_time = 0.0
+    original = patch_chunking.pack_blocks_balanced
+    for url, text in texts:
+        start = perf_counter()
+        patch_chunking.pack_blocks_balanced = _greedy_pack_blocks
+        try:
+            greedy = main._smart_chunks(text, limit)
+        finally:
+            patch_chunking.pack_blocks_balanced = original
+        greedy_time += perf_counter() - start
+
+        start = perf_counter()
+        balanced = main._smart_chunks(text, limit)
+        balanced_time += perf_counter() - start
+
+        greedy_total += len(greedy)
+        balanced_total += len(balanced)
+        print(f"{url}\n  greedy:   {_describe(greedy)}\n  balanced: {_describe(balanced)}")
+
+    print(
+        f"\n{len(texts)} patches: greedy {greedy_total} messages in {greedy_time * 1000:.1f} ms, "
+        f"balanced {balanced_total} messages in {balanced_time * 1000:.1f} ms"
+    )
+
+
+def bench_large_input(texts: list[tuple[str, str]], target_bytes: int) -> None:
+    """Time both chunking stages on one synthetic input built by repeating stored patches."""
+    sample = "\n\n".join(text for _url, text in texts) or "- Abrams: Leben um 50 erhoeht."
+    large = (sample + "\n\n") * max(1, target_bytes // max(1, len(sample)))
+    for label, run in (
+        ("translation", lambda: main._split_text_for_translation(large)),
+        ("discord", lambda: main._smart_chunks(large)),
+    ):
+        start = perf_counter()
+        chunks = run()
+        print(f"{label}: {len(large) // 1024} KB -> {len(chunks)} chunks in {(perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=main.PATCH_CHUNK_LIMIT)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--large-kb", type=int, default=500)
+    args = parser.parse_args()
+    texts = _load_texts(args.rows)
+    bench_discord_packing(texts, args.limit)
+    bench_large_input(texts, args.large_kb * 1024)
@@ -0,0 +1,129 @@
+"""Check the fused output normalizer against the step-by-step chain and time both.
+
+Usage: python bench_normalizer.py [--rows 50] [--repeat 5]
+Needs the same environment as main.py (Deadlock DB, PATCH_CHANNEL_ID).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from time import perf_counter
+
+os.environ.setdefault("BOT_SKIP_RUN", "1")
+
+import main  # noqa: E402
+import patch_normalizer  # noqa: E402
+
+
+def _remove_inline_citations(text: str) -> str:
+    if not text:
+        return text
+    cleaned = patch_normalizer.CITATION_RE.sub("", text)
+    cleaned = re.sub(r"[ \t]+\n", "\n", cleaned)
+    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+    return cleaned.strip()
+
+
+def _inject_patch_heading(text: str, posted_at: str | None) -> str:
+    heading = main._patch_heading(posted_at)
+    if not text or not heading:
+        return text
+    return patch_normalizer.inject_heading(text, heading)
+
+
+def reference_translation(text: str) -> str:
+    return main._repair_known_hero_sections_uncached(main._remove_links(_remove_inline_citations(text)))
+
+
+def reference_partial(text: str) -> str:
+    cleaned = main._strip_code_fences(text)
+    cleaned = _remove_inline_citations(cleaned)
+    cleaned = main._remove_links(cleaned)
+    cleaned = main._strip_role_ping(cleaned)
+    cleaned = re.sub(r"(?im)^###\s*deadlock patch notes.*$", "", cleaned)
+    cleaned = re.split(r"(?m)^_{3,}\s*$", cleaned, maxsplit=1)[0]
+    cleaned = re.split(r"(?im)^\*\*kurzzusammenfassung\*\*.*$", cleaned, maxsplit=1)[0]
+    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+    return main._repair_known_hero_sections_uncached(cleaned.strip())
+
+
+def reference_discord(text: str, posted_at: str | None) -> str:
+    cleaned = main._strip_code_fences(text)
+    cleaned = _remove_inline_citations(cleaned)
+    cleaned = main._remove_links(cleaned)
+    cleaned = main._strip_role_ping(cleaned)
+    cleaned = main._repair_known_hero_sections_uncached(cleaned)
+    return _inject_patch_heading(cleaned, posted_at)
+
+
+def _modes(posted_at: str | None) -> dict:
+    role_ping = main._get_role_ping()
+    repair = main._repair_known_hero_sections_uncached
+    return {
+        "translation": (
+            reference_translation,
+            lambda text: patch_normalizer.normalize(text, repair=repair).text,
+        ),
+        "partial": (
+            reference_partial,
+            lambda text: patch_normalizer.normalize(
+                text, strip_fences=True, role_ping=role_ping, partial=True, repair=repair
+            ).text,
+        ),
+        "discord": (
+            lambda text: reference_discord(text, posted_at),
+            lambda text: patch_normalizer.normalize(
+                text,
+                strip_fences=True,
+                role_ping=role_ping,
+                repair=repair,
+                heading=main._patch_heading(posted_at),
+            ).text,
+        ),
+    }
+
+
+def _load_texts(rows: int) -> list[tuple[str, str | None, str]]:
+    result = main._db_query_all(
+        """
+        SELECT url, posted_at, translated_content, translated_hash
+        FROM changelog_posts
+        WHERE translated_content IS NOT NULL OR translated_hash IS NOT NULL
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (rows,),
+    )
+    return [
+        (row["url"], row["posted_at"], main._stored_text(row["translated_content"], row["translated_hash"]))
+        for row in result
+    ]
+
+
+def bench_normalizer(texts: list[tuple[str, str | None, str]], repeat: int) -> int:
+    mismatches = 0
+    timings: dict[str, list[float]] = {}
+    for url, posted_at, text in texts:
+        for mode, (reference, fused) in _modes(posted_at).items():
+            if reference(text) != fused(text):
+                mismatches += 1
+                print(f"ABWEICHUNG {mode}: {url}")
+            for label, func in (("chain", reference), ("fused", fused)):
+                start = perf_counter()
+                for _ in range(repeat):
+                    func(text)
+                timings.setdefault(f"{mode}/{label}", []).append((perf_counter() - start) / repeat)
+
+    print(f"\n{len(texts)} patches, {mismatches} mismatches")
+    for key, values in sorted(timings.items()):
+        print(f"{key:<20} {sum(values) * 1000:8.1f} ms")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    raise SystemExit(1 if bench_normalizer(_load_texts(args.rows), args.repeat) else 0)
@@ -186,16 +186,26 @@ def _process_steam_page(url: str, soup: BeautifulSoup) -> Optional[Dict[str, str
     }
 
 
-def process(url: str) -> Optional[Dict[str, str]]:
+def fetch_page(url: str) -> tuple[str, str]:
+    """Download the page; returns (final URL after redirects, HTML)."""
     response = requests.get(url, headers=REQUEST_HEADERS, timeout=20)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, features="html.parser")
+    return response.url, response.text
+
+
+def parse_page(url: str, page_html: str) -> Optional[Dict[str, str]]:
+    """CPU-only part of process(); safe to run in a worker process."""
+    soup = BeautifulSoup(page_html, features="html.parser")
 
-    steam_result = _process_steam_page(response.url, soup)
+    steam_result = _process_steam_page(url, soup)
     if steam_result:
         return steam_result
 
-    return _process_forum_page(response.url, soup)
+    return _process_forum_page(url, soup)
+
+
+def process(url: str) -> Optional[Dict[str, str]]:
+    return parse_page(*fetch_page(url))
 
 
 if __name__ == "__main__":
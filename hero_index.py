@@ -0,0 +1,212 @@
+"""Aho-Corasick index over hero and item names.
+
+One automaton holds every known hero name, its aliases and the item names
+stored in the Deadlock DB. Text is lowercased and non-word characters become
+spaces (length-preserving), so "Grey-Talon" and "grey talon" match the same
+pattern and match offsets stay valid for the original line.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable
+
+HERO = "hero"
+ITEM = "item"
+
+_NON_WORD_RE = re.compile(r"[\W_]")
+
+
+@dataclass(frozen=True, slots=True)
+class NameMatch:
+    start: int
+    end: int
+    name: str
+    kind: str
+
+
+def _fold(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Sehr seltene Zeichen (z.B. "İ") werden beim Lowercasing laenger -> einzeln falten.
+        lowered = "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+    return _NON_WORD_RE.sub(" ", lowered)
+
+
+class NameIndex:
+    def __init__(self, entries: Iterable[tuple[str, str, str]]) -> None:
+        """entries: (pattern, canonical name, kind); earlier entries win on identical patterns."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Laengster Treffer, der in diesem Zustand endet: (Laenge, Name, Art).
+        self._match: list[tuple[int, str, str] | None] = [None]
+        # Alle Treffer, die in diesem Zustand enden (inkl. ueber Fail-Links).
+        self._outputs: list[tuple[tuple[int, str, str], ...]] = [()]
+        self.size = 0
+
+        for pattern, name, kind in entries:
+            folded = _fold(pattern).strip()
+            if not folded:
+                continue
+            state = 0
+            for char in folded:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._match.append(None)
+                    self._outputs.append(())
+                state = next_state
+            if self._match[state] is None:
+                self._match[state] = (len(folded), name, kind)
+                self.size += 1
+        self._build_fail_links()
+
+    def _build_fail_links(self) -> None:
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        for state in range(len(self._goto)):
+            own = self._match[state]
+            self._outputs[state] = (own,) if own else ()
+        while queue:
+            state = queue.popleft()
+            self._outputs[state] = self._outputs[state] + self._outputs[self._fail[state]]
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+
+    def find_all(self, text: str) -> list[NameMatch]:
+        """Every whole-word mention in one scan; overlaps resolved leftmost-longest."""
+        if not text or self.size == 0:
+            return []
+        folded = _fold(text)
+        limit = len(folded)
+        candidates: list[NameMatch] = []
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        for position, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, name, kind in self._outputs[state]:
+                start = position - length + 1
+                end = position + 1
+                if (start == 0 or folded[start - 1] == " ") and (end == limit or folded[end] == " "):
+                    candidates.append(NameMatch(start, end, name, kind))
+
+        candidates.sort(key=lambda match: (match.start, -match.end))
+        result: list[NameMatch] = []
+        covered = 0
+        for match in candidates:
+            if match.start >= covered:
+                result.append(match)
+                covered = match.end
+        return result
+
+    def leading(self, text: str) -> NameMatch | None:
+        """Longest whole-word name at the very start of text (trie walk, no full scan)."""
+        if not text or self.size == 0:
+            return None
+        best: NameMatch | None = None
+        state = 0
+        goto = self._goto
+        for position, char in enumerate(text):
+            state = goto[state].get(char.lower() if char.isalnum() else " ", -1)
+            if state < 0:
+                break
+            found = self._match[state]
+            end = position + 1
+            if found and (end == len(text) or not (text[end].isalnum())):
+                best = NameMatch(0, end, found[1], found[2])
+        return best
+
+    def exact(self, text: str) -> NameMatch | None:
+        stripped = (text or "").strip()
+        match = self.leading(stripped)
+        if match and match.end == len(stripped):
+            return match
+        return None
+
+
+_item_names: tuple[str, ...] = ()
+_default_index: NameIndex | None = None
+# Zaehlt jede Aenderung der Item-Liste; patch_document verwirft damit veraltete Klassifizierungen.
+_version = 0
+
+
+def _hero_entries() -> list[tuple[str, str, str]]:
+    # Spaet importiert, weil perplexity_requests selbst diesen Index nutzt.
+    import perplexity_requests
+
+    entries: list[tuple[str, str, str]] = []
+    for name in perplexity_requests.KNOWN_HERO_NAMES:
+        entries.append((name, name, HERO))
+        if "&" in name:
+            entries.append((name.replace("&", "and"), name, HERO))
+    for alias, target in perplexity_requests.hero_name_aliases().items():
+        canonical = perplexity_requests.canonical_hero_name(target)
+        if canonical:
+            entries.append((alias, canonical, HERO))
+    return entries
+
+
+def default_index() -> NameIndex:
+    global _default_index
+    if _default_index is None:
+        entries = _hero_entries()
+        entries.extend((name, name, ITEM) for name in _item_names)
+        _default_index = NameIndex(entries)
+    return _default_index
+
+
+def item_names() -> tuple[str, ...]:
+    return _item_names
+
+
+def version() -> int:
+    return _version
+
+
+def set_item_names(names: Iterable[str]) -> bool:
+    """Replace the item list; returns True (and rebuilds lazily) if it changed."""
+    global _item_names, _default_index, _version
+    cleaned = tuple(sorted({" ".join(str(name).split()) for name in names if str(name).strip()}))
+    if cleaned == _item_names:
+        return False
+    _item_names = cleaned
+    _default_index = None
+    _version += 1
+    return True
+
+
+def name_prefix(body: str, kinds: tuple[str, ...] = (HERO, ITEM)) -> tuple[NameMatch, str] | None:
+    """Split 'Name: rest' when Name is a known hero/item; returns (match, rest)."""
+    match = default_index().leading(body)
+    if match is None or match.kind not in kinds:
+        return None
+    tail = body[match.end :]
+    if len(tail) < 2 or tail[0] != ":" or not tail[1].isspace():
+        return None
+    return match, tail[1:].lstrip()
+
+
+def heading_name(text: str) -> NameMatch | None:
+    """The single hero/item a header names, ignoring surrounding punctuation like 'Lady Geist:'."""
+    matches = default_index().find_all(text)
+    if len(matches) != 1:
+        return None
+    match = matches[0]
+    rest = text[: match.start] + text[match.end :]
+    if any(char.isalnum() for char in rest):
+        return None
+    return match
@@ -1,4 +1,6 @@
 import dotenv
+import hashlib
+import json
 import os
 import sys
 from pathlib import Path
@@ -8,17 +10,38 @@ import asyncio
 import signal
 import re
 import socket
-from datetime import datetime, timezone
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from time import perf_counter
+from typing import Callable
 
 import changelog_content_fetcher
 import changelog_latest_fetcher
 
+import hero_index
+import patch_blobs
+import patch_chunking
+import patch_db_writer
+import patch_document
+import patch_eventlog
+import patch_executors
+import patch_fingerprint
+import patch_loop_monitor
+import patch_metrics
+import patch_normalizer
+import patch_profiling
+import patch_tracing
 import perplexity_requests
+import translation_memory
 
 KV_NAMESPACE = "patchnotes_bot"
 KV_LAST_PATCH_KEY = "last_forum_url"
 KV_LAST_TEST_POST_KEY = "last_test_post_url"
+KV_ITEM_NAMES_KEY = "item_names"
 
 DEADLOCK_ROOT = Path(os.getenv("DEADLOCK_HOME") or Path.home() / "Documents" / "Deadlock")
 # Load Deadlock env first so service.config picks up required tokens, then this repo's .env.
@@ -48,6 +71,10 @@ PATCH_OUTPUT_DIR = os.getenv("PATCH_OUTPUT_DIR")  # wenn gesetzt, werden Ausgabe
 DEFAULT_MAX_CATCHUP_POSTS = 1
 MAX_CATCHUP_POSTS = max(1, int(os.getenv("PATCH_MAX_CATCHUP_POSTS", str(DEFAULT_MAX_CATCHUP_POSTS))))
 DISCORD_MESSAGE_HARD_LIMIT = 2000
+DISCORD_EMBED_DESCRIPTION_LIMIT = 4096
+DISCORD_EMBED_TITLE_LIMIT = 256
+DISCORD_EMBED_TOTAL_LIMIT = 6000
+DISCORD_EMBEDS_PER_MESSAGE = 10
 DEFAULT_PATCH_CHUNK_LIMIT = 1950
 PATCH_CHUNK_LIMIT = min(
     DISCORD_MESSAGE_HARD_LIMIT,
@@ -64,11 +91,80 @@ PATCH_AUTO_INCLUDE_PING = _env_flag("PATCH_AUTO_INCLUDE_PING", True)
 PATCH_FORCE_POST_LATEST_ON_START = _env_flag("PATCH_FORCE_POST_LATEST_ON_START")
 PATCH_TRANSLATE_SPLIT_THRESHOLD = max(2000, int(os.getenv("PATCH_TRANSLATE_SPLIT_THRESHOLD", "18000")))
 PATCH_TRANSLATE_CHUNK_TARGET = max(2000, int(os.getenv("PATCH_TRANSLATE_CHUNK_TARGET", "9000")))
+# Teil-Limit fuer gesplittete Uebersetzungen in geschaetzten Tokens (ca. 4 Zeichen pro Token).
+PATCH_TRANSLATE_CHUNK_TOKENS = max(
+    500, int(os.getenv("PATCH_TRANSLATE_CHUNK_TOKENS", str(PATCH_TRANSLATE_CHUNK_TARGET // 4)))
+)
+# Hedging: zweite Anfrage (Fallback-Modell oder Strict-Mode), wenn die erste zu lange braucht.
+PATCH_TRANSLATE_HEDGE = _env_flag("PATCH_TRANSLATE_HEDGE")
+PATCH_TRANSLATE_HEDGE_MODEL = (os.getenv("PATCH_TRANSLATE_HEDGE_MODEL") or "").strip() or None
+PATCH_TRANSLATE_HEDGE_PERCENTILE = min(0.99, max(0.5, float(os.getenv("PATCH_TRANSLATE_HEDGE_PERCENTILE", "0.9"))))
+PATCH_TRANSLATE_HEDGE_INITIAL_DELAY = max(1.0, float(os.getenv("PATCH_TRANSLATE_HEDGE_INITIAL_DELAY", "30")))
+PATCH_TRANSLATE_HEDGE_MIN_DELAY = max(1.0, float(os.getenv("PATCH_TRANSLATE_HEDGE_MIN_DELAY", "10")))
+PATCH_TRANSLATE_HEDGE_MAX_DELAY = max(
+    PATCH_TRANSLATE_HEDGE_MIN_DELAY, float(os.getenv("PATCH_TRANSLATE_HEDGE_MAX_DELAY", "60"))
+)
+PATCH_TRANSLATE_HEDGE_MIN_SAMPLES = 5
+# Batching: mehrere kurze Catch-up-Posts in einer Anfrage uebersetzen.
+PATCH_BATCH_TRANSLATE = _env_flag("PATCH_BATCH_TRANSLATE")
+PATCH_BATCH_MAX_POST_CHARS = max(200, int(os.getenv("PATCH_BATCH_MAX_POST_CHARS", "2500")))
+PATCH_BATCH_MAX_CHARS = max(PATCH_BATCH_MAX_POST_CHARS, int(os.getenv("PATCH_BATCH_MAX_CHARS", "8000")))
+PATCH_BATCH_MAX_POSTS = max(2, int(os.getenv("PATCH_BATCH_MAX_POSTS", "6")))
+# Translation Memory: bekannte Bullets aus frueheren Uebersetzungen lokal einsetzen.
+PATCH_TRANSLATION_MEMORY = _env_flag("PATCH_TRANSLATION_MEMORY")
+PATCH_USAGE_SUMMARY_DAYS = max(1, int(os.getenv("PATCH_USAGE_SUMMARY_DAYS", "7")))
+# Anzahl paralleler Worker fuer Fetch/Uebersetzung/Versand; die Erkennung laeuft unabhaengig davon.
+PATCH_PIPELINE_WORKERS = max(1, int(os.getenv("PATCH_PIPELINE_WORKERS", "2")))
+# "text" = eine Nachricht pro PATCH_CHUNK_LIMIT-Chunk, "embeds" = Abschnitte in Embeds packen.
+PATCH_SEND_MODE = (os.getenv("PATCH_SEND_MODE", "text") or "text").strip().lower()
+# Sofort eine englische Vorschau posten und nach der Uebersetzung in-place ersetzen.
+PATCH_RAW_PREVIEW = _env_flag("PATCH_RAW_PREVIEW")
+PATCH_TRANSLATE_LATENCY_WINDOW = 50
+# Prometheus-Metriken unter http://HOST:PORT/metrics; 0 = aus.
+PATCH_METRICS_PORT = max(0, int(os.getenv("PATCH_METRICS_PORT", "0")))
+PATCH_METRICS_HOST = os.getenv("PATCH_METRICS_HOST", "127.0.0.1")
+# JSON-Lines-Eventlog (eine Zeile pro _timing_log-Event); leer = aus.
+PATCH_EVENT_LOG = os.getenv("PATCH_EVENT_LOG", "").strip()
+PATCH_EVENT_LOG_MAX_BYTES = max(1024, int(os.getenv("PATCH_EVENT_LOG_MAX_BYTES", str(10 * 1024 * 1024))))
+PATCH_EVENT_LOG_BACKUPS = max(0, int(os.getenv("PATCH_EVENT_LOG_BACKUPS", "5")))
+# Ein Trace pro Patch (Chrome-Trace-JSON, z.B. fuer Perfetto) in diesem Ordner; leer = aus.
+PATCH_TRACE_DIR = os.getenv("PATCH_TRACE_DIR", "").strip()
+patch_tracing.configure(PATCH_TRACE_DIR or None)
+# Profiling des naechsten Patch-Laufs: off | next | always (zusaetzlich per !tprofile scharf schaltbar).
+PATCH_PROFILE = (os.getenv("PATCH_PROFILE", "off") or "off").strip().lower()
+PATCH_PROFILE_DIR = os.getenv("PATCH_PROFILE_DIR", "profiles")
+patch_profiling.configure(PATCH_PROFILE, PATCH_PROFILE_DIR)
+# Event-Loop-Stalls ab dieser Dauer mit Stack melden (auch fuer Profile); 0 = aus.
+PATCH_LOOP_STALL_MS = max(0, int(os.getenv("PATCH_LOOP_STALL_MS", "250")))
+# Texte komprimiert und per Hash in patchnotes_blobs ablegen (inkl. Uebersetzungs-Versionen).
+PATCH_BLOB_STORE = _env_flag("PATCH_BLOB_STORE")
+# Gleichen Patch von Steam und Forum nur einmal uebersetzen/posten (Fingerprint-Vergleich).
+PATCH_CROSS_SOURCE_DEDUPE = _env_flag("PATCH_CROSS_SOURCE_DEDUPE", True)
+PATCH_DEDUPE_WINDOW = max(1, int(os.getenv("PATCH_DEDUPE_WINDOW", "50")))
+# Gelernte Item-Namen, die so lange in keinem Patch mehr vorkamen, fliegen aus der Liste.
+PATCH_ITEM_NAMES_MAX_AGE_DAYS = max(1, int(os.getenv("PATCH_ITEM_NAMES_MAX_AGE_DAYS", "365")))
+# Worker pro Executor (PATCH_POOL_POLL, _PARSE, _TRANSLATE, _CPU, _HTML, _IO); DB bleibt bei einem Worker.
+for _pool_name in (
+    patch_executors.POLL,
+    patch_executors.PARSE,
+    patch_executors.TRANSLATE,
+    patch_executors.CPU,
+    patch_executors.HTML,
+    patch_executors.IO,
+):
+    _pool_size = os.getenv(f"PATCH_POOL_{_pool_name.upper()}")
+    if _pool_size:
+        patch_executors.configure(_pool_name, int(_pool_size))
+# >0: HTML-Parsing in so vielen Prozessen statt Threads (am GIL vorbei).
+PATCH_HTML_PROCESSES = max(0, int(os.getenv("PATCH_HTML_PROCESSES", "0")))
+if PATCH_HTML_PROCESSES:
+    patch_executors.configure(patch_executors.HTML, PATCH_HTML_PROCESSES, processes=True)
 
 _TIMING_EVENTS_MINIMAL = {
     "new_patch_detected",
     "new_patch_processed",
     "new_patch_error",
+    "translate_hedge_done",
 }
 
 intents = discord.Intents.default()
@@ -128,10 +224,37 @@ class PatchnotesClient(discord.Client):
         await self._ensure_threaded_resolver()
         await super().setup_hook()
 
+    async def close(self) -> None:
+        # Noch eingereihte DB-Schreibvorgaenge (Checkpoint, Usage, Loeschungen) abschliessen,
+        # bevor asyncio.run die offenen Tasks abbricht.
+        try:
+            await _db_writer.flush()
+        except Exception as exc:
+            print(f"DB-Schreibvorgaenge konnten nicht abgeschlossen werden: {exc}")
+        await super().close()
+
 
 client = PatchnotesClient(intents=intents)
 stop_event = asyncio.Event()
 _scan_task: asyncio.Task | None = None
+_metrics_runner = None
+_loop_monitor: patch_loop_monitor.LoopMonitor | None = None
+# Latenzen der Primaer-Anfragen, getrennt nach Teilstuecken (partial) und ganzen Posts.
+_translate_latency_samples: dict[bool, deque[float]] = {
+    False: deque(maxlen=PATCH_TRANSLATE_LATENCY_WINDOW),
+    True: deque(maxlen=PATCH_TRANSLATE_LATENCY_WINDOW),
+}
+_hedge_stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0}
+_translation_memory = translation_memory.TranslationMemory()
+_db_writer = patch_db_writer.DbWriter(deadlock_db)
+_blob_store = patch_blobs.BlobStore(deadlock_db)
+# Patches, deren Uebersetzung gerade laeuft: URL -> (Fingerprint, Ergebnis).
+_content_claims: dict[str, tuple[patch_fingerprint.Fingerprint, asyncio.Future]] = {}
+# Sammelt die Usage-Records aller Perplexity-Aufrufe des gerade verarbeiteten Patches.
+_usage_records: ContextVar["_UsageCollector | None"] = ContextVar("patch_usage_records", default=None)
+# Schuetzt den Uebergang "Aufruf abgebrochen" <-> "Record eingesammelt" zwischen Loop und Worker.
+_usage_lock = threading.Lock()
+_translation_memory_loaded = False
 
 
 def _strip_code_fences(text: str) -> str:
@@ -278,6 +401,10 @@ async def _resolve_patch_channel() -> discord.abc.Messageable | None:
 
 
 def _timing_log(event: str, **fields) -> None:
+    # Metriken unabhaengig vom Log-Level, damit die Verteilungen vollstaendig sind.
+    patch_metrics.registry.record_event(event, fields)
+    # Das Eventlog bekommt alle Events; Zeitstempel formatiert der Writer-Thread.
+    patch_eventlog.emit(event, fields)
     if PATCH_TIMING_LEVEL == "off":
         return
     if PATCH_TIMING_LEVEL == "minimal" and event not in _TIMING_EVENTS_MINIMAL:
@@ -296,25 +423,13 @@ def _timing_log(event: str, **fields) -> None:
     print(" | ".join(parts))
 
 
-def _inject_patch_heading(text: str, posted_at: str | None) -> str:
-    if not text:
-        return text
+def _patch_heading(posted_at: str | None) -> str | None:
     if not posted_at:
-        return text
+        return None
     date_str = _format_patch_date(posted_at) or str(posted_at).strip()
     if not date_str:
-        return text
-
-    heading = f"### Deadlock Patch Notes ({date_str})"
-    stripped = text.lstrip()
-    lines = stripped.splitlines()
-    if not lines:
-        return heading
-    first_line = lines[0].strip()
-    if first_line.lower().startswith("### deadlock patch notes"):
-        rest = "\n".join(lines[1:]).lstrip("\n")
-        return heading + ("\n" + rest if rest else "")
-    return heading + "\n" + stripped
+        return None
+    return f"### Deadlock Patch Notes ({date_str})"
 
 
 def _find_saved_changelog_row(url: str | None):
@@ -322,8 +437,9 @@ def _find_saved_changelog_row(url: str | None):
     if not normalized:
         return None
     try:
+        _ensure_changelog_tables()
         row = deadlock_db.query_one(
-            "SELECT id, url, raw_content FROM changelog_posts WHERE url=? ORDER BY id DESC LIMIT 1",
+            "SELECT id, url, fingerprint FROM changelog_posts WHERE url=? ORDER BY id DESC LIMIT 1",
             (normalized,),
         )
         if row or not _is_forum_link(normalized):
@@ -335,7 +451,7 @@ def _find_saved_changelog_row(url: str | None):
 
         return deadlock_db.query_one(
             """
-            SELECT id, url, raw_content
+            SELECT id, url, fingerprint
             FROM changelog_posts
             WHERE url LIKE ? OR url LIKE ?
             ORDER BY id DESC
@@ -347,15 +463,81 @@ def _find_saved_changelog_row(url: str | None):
         return None
 
 
-def _get_db_raw_content(url: str | None) -> str | None:
+def _db_query_all(sql: str, params: tuple = ()) -> list:
+    query_all = getattr(deadlock_db, "query_all", None)
+    if callable(query_all):
+        return list(query_all(sql, params))
+    cursor = deadlock_db.execute(sql, params)
+    return list(cursor.fetchall()) if cursor is not None else []
+
+
+def _load_fingerprint_source(url: str | None) -> tuple[int, str | None, str | None] | None:
+    """(row id, stored fingerprint, raw text if the fingerprint is still missing) of the saved row."""
     if not url:
         return None
     row = _find_saved_changelog_row(url)
-    if row:
-        return row["raw_content"]
+    if not row:
+        return None
+    if row["fingerprint"]:
+        return row["id"], row["fingerprint"], None
+    texts = deadlock_db.query_one("SELECT raw_content, raw_hash FROM changelog_posts WHERE id=?", (row["id"],))
+    return row["id"], None, _stored_text(texts["raw_content"], texts["raw_hash"]) if texts else None
+
+
+@patch_tracing.traced("db.store_fingerprint")
+def _store_fingerprint(row_id: int, encoded: str) -> None:
+    deadlock_db.execute("UPDATE changelog_posts SET fingerprint=? WHERE id=?", (encoded, row_id))
+
+
+async def _get_db_fingerprint(url: str | None) -> patch_fingerprint.Fingerprint | None:
+    """Stored MinHash fingerprint of the saved row; rows from before fingerprints are backfilled once."""
+    source = await patch_executors.run_db(_load_fingerprint_source, url)
+    if source is None:
+        return None
+    row_id, encoded, raw_content = source
+    if encoded:
+        return patch_fingerprint.decode(encoded)
+    if not raw_content:
+        return None
+    fingerprint = await patch_executors.run_cpu(patch_fingerprint.fingerprint, raw_content)
+    _db_writer.submit(_store_fingerprint, row_id, fingerprint.encode())
+    return fingerprint
+
+
+def _find_duplicate_row(url: str, fingerprint: patch_fingerprint.Fingerprint) -> tuple[str, str] | None:
+    """Recent saved patch from the other source (Steam vs. forum) with the same content."""
+    _ensure_changelog_tables()
+    rows = _db_query_all(
+        """
+        SELECT id, url, fingerprint
+        FROM changelog_posts
+        WHERE fingerprint IS NOT NULL AND url != ? AND duplicate_of IS NULL
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (url, PATCH_DEDUPE_WINDOW),
+    )
+    for row in rows:
+        if _is_forum_link(row["url"]) == _is_forum_link(url):
+            continue
+        if not patch_fingerprint.is_near_duplicate(patch_fingerprint.decode(row["fingerprint"]), fingerprint):
+            continue
+        texts = deadlock_db.query_one(
+            "SELECT translated_content, translated_hash FROM changelog_posts WHERE id=?", (row["id"],)
+        )
+        translated = _stored_text(texts["translated_content"], texts["translated_hash"]) if texts else None
+        if translated:
+            return _normalize_patch_link(row["url"]), translated
     return None
 
 
+def _stored_text(text: str | None, blob_hash: str | None) -> str | None:
+    """Plain column value, or the blob it references when stored content-addressed."""
+    if text is not None:
+        return text
+    return _blob_store.get(blob_hash)
+
+
 def _get_retranslate_mode(content: str | None) -> bool | None:
     if not content:
         return None
@@ -369,15 +551,9 @@ def _get_retranslate_mode(content: str | None) -> bool | None:
     return None
 
 
-_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?\u2026])\s+")
-_BULLET_PREFIX_RE = re.compile(r"^(\s*(?:[-*]|\u2022|\d+[.)])\s+)(.+)$")
-_SECTION_HEADER_RE = re.compile(r"^\*\*[^*]+\*\*\s*$|^#{1,3}\s+\S|^\[\s*.+\s*\]\s*$")
-# Matches "- HeroName: ..." bullets to group by hero name (e.g. "- Yamato: ..." → "Yamato")
-_HERO_BULLET_RE = re.compile(r"^-\s+([A-ZÄÖÜ][a-zA-ZäöüÄÖÜß]*):\s+")
-_CITATION_RE = re.compile(r"\[(?:\d+(?:,\s*\d+)*)\]")
-_MASKED_LINK_RE = re.compile(r"\[([^\]\n]+)\]\((?:https?://[^)\s]+)\)")
-_ANGLE_URL_RE = re.compile(r"<https?://[^>\s]+>")
-_RAW_URL_RE = re.compile(r"(?<!\()https?://[^\s)>]+")
+_MASKED_LINK_RE = patch_normalizer.MASKED_LINK_RE
+_ANGLE_URL_RE = patch_normalizer.ANGLE_URL_RE
+_RAW_URL_RE = patch_normalizer.RAW_URL_RE
 _BAD_TRANSLATION_MARKERS = (
     "ich kann diese anfrage nicht erfuellen",
     "ich kann diese anfrage nicht erfüllen",
@@ -428,15 +604,6 @@ def _extract_model_response_text(api_response: dict | None) -> str:
         return ""
 
 
-def _remove_inline_citations(text: str) -> str:
-    if not text:
-        return text
-    cleaned = _CITATION_RE.sub("", text)
-    cleaned = re.sub(r"[ \t]+\n", "\n", cleaned)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-    return cleaned.strip()
-
-
 def _remove_links(text: str) -> str:
     if not text:
         return text
@@ -453,6 +620,10 @@ def _remove_links(text: str) -> str:
 def _repair_known_hero_sections(text: str) -> str:
     if not text:
         return text
+    return patch_document.parse(text).derive("repaired", _repair_known_hero_sections_uncached)
+
+
+def _repair_known_hero_sections_uncached(text: str) -> str:
     repairer = getattr(perplexity_requests, "repair_known_hero_sections", None)
     if not callable(repairer):
         return text
@@ -463,215 +634,326 @@ def _repair_known_hero_sections(text: str) -> str:
     return repaired or text
 
 
-def _cleanup_partial_translation(text: str) -> str:
-    cleaned = _strip_code_fences(text)
-    cleaned = _remove_inline_citations(cleaned)
-    cleaned = _remove_links(cleaned)
-    cleaned = _strip_role_ping(cleaned)
-    cleaned = re.sub(r"(?im)^###\s*deadlock patch notes.*$", "", cleaned)
-    cleaned = re.split(r"(?m)^_{3,}\s*$", cleaned, maxsplit=1)[0]
-    cleaned = re.split(r"(?im)^\*\*kurzzusammenfassung\*\*.*$", cleaned, maxsplit=1)[0]
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-    return _repair_known_hero_sections(cleaned.strip())
+def _normalize_output(text: str, context: str | None = None, **options) -> str:
+    """Fused model-output cleanup (see patch_normalizer); logs what it changed."""
+    result = patch_normalizer.normalize(text, repair=_repair_known_hero_sections, **options)
+    changed = {key: value for key, value in result.changes.items() if value}
+    if changed:
+        _timing_log("output_normalized", context=context, **changed)
+    return result.text
 
 
-def _split_text_for_translation(text: str, limit: int) -> list[str]:
-    """Split text into chunks for translation, keeping hero/item sections together."""
+def _split_text_for_translation(text: str, limit: int = PATCH_TRANSLATE_CHUNK_TOKENS) -> list[str]:
+    """Split text into chunks for translation (limit in estimated tokens), keeping hero/item sections together."""
     if not text:
         return []
-    if len(text) <= limit:
-        return [text.strip()]
-
-    blocks = _parse_sections(text)
-
-    # If no sections detected, fall back to simple line splitting
-    if len(blocks) <= 1:
-        return _split_text_for_translation_legacy(text, limit)
-
-    def _block_to_str(block_lines: list[str]) -> str:
-        return "\n".join(block_lines).strip()
-
-    def _split_large_block(block_lines: list[str], lim: int) -> list[str]:
-        """Split a block that alone exceeds limit at line boundaries."""
-        result: list[str] = []
-        current_lines: list[str] = []
-        current_len = 0
-        for line in block_lines:
-            add_len = len(line) + (1 if current_lines else 0)
-            if current_lines and current_len + add_len > lim:
-                result.append("\n".join(current_lines).strip())
-                current_lines = []
-                current_len = 0
-                add_len = len(line)
-            current_lines.append(line)
-            current_len += add_len
-        if current_lines:
-            result.append("\n".join(current_lines).strip())
-        return [r for r in result if r]
-
-    chunks: list[str] = []
-    current_lines: list[str] = []
-    current_len = 0
+    lines = patch_document.parse(text).lines
+    return list(patch_chunking.iter_chunks(text, limit, patch_chunking.TOKENS, lines=lines))
 
-    def _flush() -> None:
-        nonlocal current_lines, current_len
-        if current_lines:
-            chunks.append("\n".join(current_lines).strip())
-        current_lines.clear()
-        current_len = 0
 
-    for block in blocks:
-        block_str = _block_to_str(block)
-        block_len = len(block_str)
+class _UsageCollector(list):
+    """Usage records of one patch (or one batch of posts, split evenly)."""
 
-        if block_len > limit:
-            _flush()
-            chunks.extend(_split_large_block(block, limit))
-            continue
-
-        sep_len = 2 if current_lines else 0
-        if current_lines and current_len + sep_len + block_len > limit:
-            _flush()
+    def __init__(self, *urls: str | None) -> None:
+        super().__init__()
+        self.urls = urls or (None,)
 
-        if current_lines:
-            current_lines.append("")
-            current_len += 1
-        current_lines.extend(block)
-        current_len = len("\n".join(current_lines))
+    def save_late(self, record: dict) -> None:
+        # Der Patch wurde schon gespeichert (abgebrochener Hedge-Verlierer): eigener Write.
+        for url in self.urls:
+            _db_writer.submit_threadsafe(save_translation_usage, url, [record], share=len(self.urls))
 
-    _flush()
-    return [c for c in chunks if c.strip()] or ([text.strip()] if text.strip() else [])
 
+def _fetch_answer_recorded(record: dict, *args):
+    """Run fetch_answer in a worker thread and add its usage to the active collector.
 
-def _split_text_for_translation_legacy(text: str, limit: int) -> list[str]:
-    """Legacy line-based splitting fallback when no sections detected."""
-    units: list[str] = []
-    for raw_line in text.splitlines():
-        if not raw_line.strip():
-            units.append("")
-            continue
-        units.extend(_split_line_units(raw_line.rstrip(), limit))
-
-    chunks: list[str] = []
-    current_lines: list[str] = []
-    current_len = 0
-
-    def _flush() -> None:
-        nonlocal current_lines, current_len
-        while current_lines and not current_lines[-1].strip():
-            current_lines.pop()
-        if current_lines:
-            chunks.append("\n".join(current_lines).rstrip())
-        current_lines = []
-        current_len = 0
-
-    for unit in units:
-        if not current_lines and unit == "":
-            continue
-
-        add_len = len(unit) if not current_lines else len(unit) + 1
-        if current_lines and current_len + add_len > limit:
-            _flush()
-            if unit == "":
-                continue
-            add_len = len(unit)
-
-        if len(unit) > limit:
-            for piece in _hard_wrap_words(unit, limit):
-                piece_add_len = len(piece) if not current_lines else len(piece) + 1
-                if current_lines and current_len + piece_add_len > limit:
-                    _flush()
-                    piece_add_len = len(piece)
-                current_lines.append(piece)
-                current_len += piece_add_len
-            continue
-
-        current_lines.append(unit)
-        current_len += add_len
-
-    _flush()
-    return chunks or ([text.strip()] if text.strip() else [])
-
-
-async def _request_patch_translation(
+    The record is filled in the thread itself. If the awaiting task was
+    cancelled first (hedge loser), the collector may already be saved, so
+    the record is written on its own instead.
+    """
+    records = _usage_records.get()
+    start = perf_counter()
+    api_response = None
+    try:
+        api_response = perplexity_requests.fetch_answer(*args)
+        return api_response
+    finally:
+        extractor = getattr(perplexity_requests, "extract_usage", None)
+        if api_response and callable(extractor):
+            try:
+                record.update(extractor(api_response))
+            except Exception:
+                pass
+        with _usage_lock:
+            record["latency_s"] = perf_counter() - start
+            late = record.get("outcome") == "cancelled"
+            record.setdefault("outcome", "ok" if api_response else "error")
+            if records is not None and not late:
+                records.append(record)
+        if records is not None and late:
+            records.save_late(record)
+
+
+async def _fetch_translation_candidate(
     patch_content: str,
     *,
     include_ping: bool,
     context_label: str,
+    strict_mode: bool,
     partial_mode: bool = False,
-) -> str:
-    fallback = patch_content
-
-    for strict_mode in (False, True):
-        translate_start = perf_counter()
+    model: str | None = None,
+    hedge: bool = False,
+) -> str | None:
+    translate_start = perf_counter()
+    record = {
+        "context": context_label,
+        "model": model or perplexity_requests.MODEL,
+        "strict": strict_mode,
+        "partial": partial_mode,
+        "hedge": hedge,
+    }
+    try:
         try:
-            try:
-                api_response = await asyncio.to_thread(
-                    perplexity_requests.fetch_answer,
+            if model:
+                api_response = await patch_executors.run(
+                    patch_executors.TRANSLATE,
+                    _fetch_answer_recorded,
+                    record,
                     patch_content,
                     include_ping,
                     strict_mode,
                     partial_mode,
+                    model,
                 )
-            except TypeError:
-                # Backward compatibility in case an older helper is still loaded.
-                api_response = await asyncio.to_thread(
-                    perplexity_requests.fetch_answer,
+            else:
+                api_response = await patch_executors.run(
+                    patch_executors.TRANSLATE,
+                    _fetch_answer_recorded,
+                    record,
                     patch_content,
                     include_ping,
+                    strict_mode,
+                    partial_mode,
                 )
-        except Exception as exc:
-            print(
-                f"Perplexity-Anfrage fehlgeschlagen ({context_label}, strict={strict_mode}): {exc}"
-            )
-            _timing_log(
-                "translate_request_error",
-                context=context_label,
-                strict=strict_mode,
-                duration_s=f"{(perf_counter() - translate_start):.2f}",
-                error=str(exc)[:180],
-            )
-            continue
-
-        candidate = _extract_model_response_text(api_response)
-        if not candidate:
-            print(
-                f"Perplexity lieferte leere Antwort ({context_label}, strict={strict_mode})."
-            )
-            _timing_log(
-                "translate_empty",
-                context=context_label,
-                strict=strict_mode,
-                duration_s=f"{(perf_counter() - translate_start):.2f}",
+        except TypeError:
+            # Backward compatibility in case an older helper is still loaded.
+            record = dict(record)
+            api_response = await patch_executors.run(
+                patch_executors.TRANSLATE,
+                _fetch_answer_recorded,
+                record,
+                patch_content,
+                include_ping,
             )
-            continue
+    except asyncio.CancelledError:
+        with _usage_lock:
+            record.setdefault("outcome", "cancelled")
+        if not strict_mode and not model:
+            # Abgebrochene Primaer-Anfrage (Hedge gewann): die echte Latenz ist mindestens so lang.
+            # Ohne diese zensierten Werte fehlen gerade die langsamen Anfragen im Perzentil.
+            _translate_latency_samples[partial_mode].append(perf_counter() - translate_start)
+        raise
+    except Exception as exc:
+        print(
+            f"Perplexity-Anfrage fehlgeschlagen ({context_label}, strict={strict_mode}): {exc}"
+        )
+        _timing_log(
+            "translate_request_error",
+            context=context_label,
+            strict=strict_mode,
+            model=model,
+            duration_s=f"{(perf_counter() - translate_start):.2f}",
+            error=str(exc)[:180],
+        )
+        return None
 
-        candidate = (
-            _cleanup_partial_translation(candidate)
-            if partial_mode
-            else _repair_known_hero_sections(_remove_links(_remove_inline_citations(candidate)))
+    candidate = _extract_model_response_text(api_response)
+    if not candidate:
+        record["outcome"] = "empty"
+        print(
+            f"Perplexity lieferte leere Antwort ({context_label}, strict={strict_mode})."
         )
-        if _looks_like_unusable_translation(candidate):
-            print(
-                f"Perplexity lieferte unbrauchbare Antwort ({context_label}, strict={strict_mode}) -> retry."
-            )
-            _timing_log(
-                "translate_unusable",
-                context=context_label,
-                strict=strict_mode,
-                duration_s=f"{(perf_counter() - translate_start):.2f}",
-                output_len=len(candidate),
-            )
-            continue
+        _timing_log(
+            "translate_empty",
+            context=context_label,
+            strict=strict_mode,
+            model=model,
+            duration_s=f"{(perf_counter() - translate_start):.2f}",
+        )
+        return None
 
+    # Alle Textpaesse ueber ganze Antworten laufen im cpu-Pool, nicht auf der Event-Loop.
+    if partial_mode:
+        candidate = await patch_executors.run_cpu(
+            _normalize_output,
+            candidate,
+            context_label,
+            strip_fences=True,
+            role_ping=_get_role_ping(),
+            partial=True,
+        )
+    else:
+        candidate = await patch_executors.run_cpu(_normalize_output, candidate, context_label)
+    if _looks_like_unusable_translation(candidate):
+        record["outcome"] = "unusable"
+        print(
+            f"Perplexity lieferte unbrauchbare Antwort ({context_label}, strict={strict_mode}) -> retry."
+        )
         _timing_log(
-            "translate_ok",
+            "translate_unusable",
             context=context_label,
             strict=strict_mode,
+            model=model,
             duration_s=f"{(perf_counter() - translate_start):.2f}",
             output_len=len(candidate),
         )
-        return candidate
+        return None
+
+    duration = perf_counter() - translate_start
+    if not strict_mode and not model:
+        _translate_latency_samples[partial_mode].append(duration)
+    _timing_log(
+        "translate_ok",
+        context=context_label,
+        strict=strict_mode,
+        model=model,
+        duration_s=f"{duration:.2f}",
+        output_len=len(candidate),
+        prompt_tokens=record.get("prompt_tokens"),
+        completion_tokens=record.get("completion_tokens"),
+    )
+    return candidate
+
+
+def _hedge_delay_seconds(partial_mode: bool = False) -> float:
+    samples = sorted(_translate_latency_samples[partial_mode])
+    if len(samples) < PATCH_TRANSLATE_HEDGE_MIN_SAMPLES:
+        delay = PATCH_TRANSLATE_HEDGE_INITIAL_DELAY
+    else:
+        index = min(len(samples) - 1, int(round(PATCH_TRANSLATE_HEDGE_PERCENTILE * (len(samples) - 1))))
+        delay = samples[index]
+    return min(PATCH_TRANSLATE_HEDGE_MAX_DELAY, max(PATCH_TRANSLATE_HEDGE_MIN_DELAY, delay))
+
+
+async def _hedged_translation_attempt(
+    patch_content: str,
+    *,
+    include_ping: bool,
+    context_label: str,
+    partial_mode: bool = False,
+) -> tuple[str | None, bool]:
+    """Primary request plus a delayed hedge; the first usable answer wins.
+
+    Also returns whether a strict request already ran (the hedge without a hedge model).
+    """
+    _hedge_stats["requests"] += 1
+    delay = _hedge_delay_seconds(partial_mode)
+    primary = asyncio.create_task(
+        _fetch_translation_candidate(
+            patch_content,
+            include_ping=include_ping,
+            context_label=context_label,
+            strict_mode=False,
+            partial_mode=partial_mode,
+        )
+    )
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result(), False
+
+    hedge_strict = PATCH_TRANSLATE_HEDGE_MODEL is None
+    _hedge_stats["hedged"] += 1
+    _timing_log(
+        "translate_hedge_start",
+        context=context_label,
+        delay_s=f"{delay:.2f}",
+        hedge_model=PATCH_TRANSLATE_HEDGE_MODEL,
+        hedge_strict=hedge_strict,
+    )
+    hedge = asyncio.create_task(
+        _fetch_translation_candidate(
+            patch_content,
+            include_ping=include_ping,
+            context_label=f"{context_label} hedge",
+            strict_mode=hedge_strict,
+            partial_mode=partial_mode,
+            model=PATCH_TRANSLATE_HEDGE_MODEL,
+            hedge=True,
+        )
+    )
+
+    hedge_start = perf_counter()
+    pending = {primary, hedge}
+    winner: asyncio.Task | None = None
+    result: str | None = None
+    while pending and winner is None:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        # Bei Gleichstand gewinnt die Primaer-Anfrage.
+        for task in sorted(done, key=lambda t: t is not primary):
+            candidate = task.result()
+            if candidate:
+                winner = task
+                result = candidate
+                break
+
+    # Der Thread der Verliereranfrage laeuft bis zum HTTP-Timeout weiter, das Ergebnis wird verworfen.
+    for task in pending:
+        task.cancel()
+
+    if winner is hedge:
+        _hedge_stats["hedge_wins"] += 1
+        winner_label = "hedge"
+    elif winner is primary:
+        _hedge_stats["primary_wins"] += 1
+        winner_label = "primary"
+    else:
+        winner_label = "none"
+
+    hedged = _hedge_stats["hedged"]
+    _timing_log(
+        "translate_hedge_done",
+        context=context_label,
+        winner=winner_label,
+        delay_s=f"{delay:.2f}",
+        after_hedge_s=f"{(perf_counter() - hedge_start):.2f}",
+        hedge_rate=f"{hedged / _hedge_stats['requests']:.2f}",
+        hedge_win_rate=f"{_hedge_stats['hedge_wins'] / hedged:.2f}",
+    )
+    return result, hedge_strict
+
+
+async def _request_patch_translation(
+    patch_content: str,
+    *,
+    include_ping: bool,
+    context_label: str,
+    partial_mode: bool = False,
+) -> str:
+    fallback = patch_content
+    strict_done = False
+
+    for strict_mode in (False, True):
+        if strict_mode and strict_done:
+            # Der Hedge war schon die strikte Anfrage; ein dritter, identischer Aufruf bringt nichts.
+            break
+        with patch_tracing.span("translate.attempt", context=context_label, strict=strict_mode):
+            if PATCH_TRANSLATE_HEDGE and not strict_mode:
+                candidate, strict_done = await _hedged_translation_attempt(
+                    patch_content,
+                    include_ping=include_ping,
+                    context_label=context_label,
+                    partial_mode=partial_mode,
+                )
+            else:
+                candidate = await _fetch_translation_candidate(
+                    patch_content,
+                    include_ping=include_ping,
+                    context_label=context_label,
+                    strict_mode=strict_mode,
+                    partial_mode=partial_mode,
+                )
+        if candidate:
+            return candidate
 
     print(
         f"Perplexity lieferte keine brauchbare Antwort ({context_label}); verwende Rohtext."
@@ -684,11 +966,101 @@ async def _request_patch_translation(
     return fallback
 
 
+def _load_translation_memory() -> None:
+    global _translation_memory_loaded
+    _ensure_changelog_tables()
+    rows = _db_query_all(
+        """
+        SELECT raw_content, raw_hash, translated_content, translated_hash
+        FROM changelog_posts
+        WHERE (raw_content IS NOT NULL OR raw_hash IS NOT NULL)
+          AND (translated_content IS NOT NULL OR translated_hash IS NOT NULL)
+        ORDER BY id ASC
+        """
+    )
+    learned = 0
+    for row in rows:
+        learned += _translation_memory.learn(
+            _stored_text(row["raw_content"], row["raw_hash"]),
+            _stored_text(row["translated_content"], row["translated_hash"]),
+        )
+    _translation_memory_loaded = True
+    _timing_log("translation_memory_loaded", rows=len(rows), pairs=learned, entries=len(_translation_memory))
+
+
+async def _translate_with_memory(
+    patch_content: str,
+    *,
+    include_ping: bool,
+    context_label: str,
+) -> str | None:
+    """Fill known bullets from the translation memory; None means translate normally."""
+    if not _translation_memory_loaded:
+        try:
+            await patch_executors.run_db(_load_translation_memory)
+        except Exception as exc:
+            print(f"Translation Memory konnte nicht geladen werden: {exc}")
+            return None
+
+    plan = await patch_executors.run_cpu(_translation_memory.plan, patch_content)
+    if plan is None:
+        return None
+
+    if plan.local_text is not None:
+        _timing_log(
+            "translate_memory_local",
+            context=context_label,
+            hits=plan.hits,
+            bullets=plan.bullets,
+        )
+        return await patch_executors.run_cpu(_repair_known_hero_sections, plan.local_text)
+
+    _timing_log(
+        "translate_memory_masked",
+        context=context_label,
+        hits=plan.hits,
+        bullets=plan.bullets,
+        input_len=len(patch_content),
+        masked_len=len(plan.masked_content or ""),
+    )
+    translated = await _translate_patch_content_uncached(
+        plan.masked_content or "",
+        include_ping=include_ping,
+        context_label=context_label,
+    )
+    spliced = await patch_executors.run_cpu(plan.splice, translated)
+    if spliced is None:
+        print(f"Translation-Memory-Platzhalter fehlen in der Antwort ({context_label}); uebersetze komplett.")
+        _timing_log("translate_memory_splice_failed", context=context_label, hits=plan.hits)
+    return spliced
+
+
 async def _translate_patch_content(
     patch_content: str,
     *,
     include_ping: bool,
     context_label: str,
+) -> str:
+    if PATCH_TRANSLATION_MEMORY:
+        translated = await _translate_with_memory(
+            patch_content,
+            include_ping=include_ping,
+            context_label=context_label,
+        )
+        if translated:
+            return translated
+    return await _translate_patch_content_uncached(
+        patch_content,
+        include_ping=include_ping,
+        context_label=context_label,
+    )
+
+
+async def _translate_patch_content_uncached(
+    patch_content: str,
+    *,
+    include_ping: bool,
+    context_label: str,
 ) -> str:
     if len(patch_content or "") <= PATCH_TRANSLATE_SPLIT_THRESHOLD:
         return await _request_patch_translation(
@@ -697,7 +1069,7 @@ async def _translate_patch_content(
             context_label=context_label,
         )
 
-    parts = _split_text_for_translation(patch_content, PATCH_TRANSLATE_CHUNK_TARGET)
+    parts = await patch_executors.run_cpu(_split_text_for_translation, patch_content)
     if len(parts) <= 1:
         return await _request_patch_translation(
             patch_content,
@@ -725,8 +1097,9 @@ async def _translate_patch_content(
         )
         translated_parts.append(translated.strip())
 
-    combined = _repair_known_hero_sections(
-        "\n\n".join(part for part in translated_parts if part).strip()
+    combined = await patch_executors.run_cpu(
+        _repair_known_hero_sections,
+        "\n\n".join(part for part in translated_parts if part).strip(),
     )
     _timing_log(
         "translate_split_done",
@@ -737,413 +1110,732 @@ async def _translate_patch_content(
     return combined or patch_content
 
 
-def _hard_wrap_words(text: str, limit: int) -> list[str]:
-    stripped = text.strip()
-    if not stripped:
+def _smart_chunks(text: str, limit: int = PATCH_CHUNK_LIMIT) -> list[str]:
+    if not text:
         return []
+    limit = min(max(int(limit), 1), DISCORD_MESSAGE_HARD_LIMIT)
+    return list(patch_chunking.iter_chunks(text, limit, lines=patch_document.parse(text).lines))
 
-    words = stripped.split()
-    if not words:
-        return [stripped[i : i + limit] for i in range(0, len(stripped), limit)]
 
-    wrapped: list[str] = []
-    current = ""
-    for word in words:
-        if not current:
-            if len(word) <= limit:
-                current = word
-            else:
-                wrapped.extend(word[i : i + limit] for i in range(0, len(word), limit))
-            continue
+def _embed_payloads(text: str) -> list[dict]:
+    """Pack cleaned patch text into messages with up to ten embeds each.
 
-        candidate = f"{current} {word}"
-        if len(candidate) <= limit:
-            current = candidate
+    Every '## ' section starts a new embed titled with the section name. Its
+    section blocks stay whole where possible and fill embed descriptions up to
+    4096 characters, bounded by Discord's 6000-character total per message.
+    """
+    lines = (text or "").strip().splitlines()
+    heading = None
+    if lines and lines[0].startswith("### "):
+        heading = lines[0]
+        lines = lines[1:]
+
+    sections: list[tuple[str | None, list[str]]] = [(None, [])]
+    for line in lines:
+        if line.startswith("## "):
+            sections.append((line[3:].strip()[:DISCORD_EMBED_TITLE_LIMIT], []))
             continue
+        sections[-1][1].append(line)
+
+    payloads: list[dict] = []
+    message_embeds: list[discord.Embed] = []
+    message_len = 0
+    embed_title: str | None = None
+    description = ""
+
+    def _close_embed() -> None:
+        nonlocal message_len, description
+        if description or embed_title:
+            message_embeds.append(discord.Embed(title=embed_title, description=description or None))
+            message_len += len(embed_title or "") + len(description)
+        description = ""
+
+    def _close_message() -> None:
+        nonlocal message_embeds, message_len
+        if message_embeds:
+            payloads.append({"content": heading if not payloads else None, "embeds": message_embeds})
+        message_embeds = []
+        message_len = 0
+
+    for title, section_lines in sections:
+        section_text = "\n".join(section_lines).strip()
+        if not section_text and not title:
+            continue
+        _close_embed()
+        if len(message_embeds) >= DISCORD_EMBEDS_PER_MESSAGE:
+            _close_message()
+        embed_title = title
+
+        for block in patch_chunking.parse_sections(section_text) if section_text else []:
+            block_text = "\n".join(block).strip()
+            pieces = patch_chunking.iter_chunks(block_text, DISCORD_EMBED_DESCRIPTION_LIMIT)
+            for piece in pieces:
+                candidate = f"{description}\n\n{piece}" if description else piece
+                budget = DISCORD_EMBED_TOTAL_LIMIT - message_len - len(embed_title or "")
+                if len(candidate) <= min(DISCORD_EMBED_DESCRIPTION_LIMIT, budget):
+                    description = candidate
+                    continue
+                if description:
+                    _close_embed()
+                    embed_title = f"{title} (Forts.)"[:DISCORD_EMBED_TITLE_LIMIT] if title else None
+                budget = DISCORD_EMBED_TOTAL_LIMIT - message_len - len(embed_title or "")
+                if len(piece) > budget or len(message_embeds) >= DISCORD_EMBEDS_PER_MESSAGE:
+                    _close_message()
+                description = piece
 
-        wrapped.append(current)
-        if len(word) <= limit:
-            current = word
-        else:
-            wrapped.extend(word[i : i + limit] for i in range(0, len(word), limit))
-            current = ""
-
-    if current:
-        wrapped.append(current)
-    return wrapped
-
-
-def _split_line_units(line: str, limit: int) -> list[str]:
-    if len(line) <= limit:
-        return [line]
-
-    match = _BULLET_PREFIX_RE.match(line)
-    prefix = ""
-    body = line.strip()
-    if match:
-        prefix = match.group(1)
-        body = match.group(2).strip()
-
-    sentences = [part.strip() for part in _SENTENCE_SPLIT_RE.split(body) if part.strip()]
-    if len(sentences) <= 1:
-        return _hard_wrap_words(line, limit)
-
-    units: list[str] = []
-    continuation_prefix = " " * len(prefix) if prefix else ""
-    for idx, sentence in enumerate(sentences):
-        line_part = f"{prefix if idx == 0 else continuation_prefix}{sentence}"
-        if len(line_part) <= limit:
-            units.append(line_part)
-        else:
-            units.extend(_hard_wrap_words(line_part, limit))
-    return units
+    _close_embed()
+    _close_message()
+    if not payloads and heading:
+        payloads.append({"content": heading})
+    return payloads
 
 
-def _is_section_header(line: str) -> bool:
-    """Returns True if line looks like a patchnote section header."""
-    stripped = line.strip()
-    if not stripped:
+def _write_patch_to_file(content: str, url: str | None):
+    if not PATCH_OUTPUT_DIR:
+        return False
+    try:
+        out_dir = Path(PATCH_OUTPUT_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = "patch"
+        if url:
+            m = re.search("(\\d+)", url)
+            if m:
+                base = f"patch_{m.group(1)}"
+        outfile = out_dir / f"{base}.txt"
+        outfile.write_text(content, encoding="utf-8")
+        print(f"[PATCH] Ergebnis in Datei geschrieben: {outfile}")
+        return True
+    except Exception as exc:
+        print(f"[PATCH] Schreiben in Datei fehlgeschlagen: {exc}")
         return False
-    return bool(_SECTION_HEADER_RE.match(stripped))
 
 
-def _extract_hero_prefix(line: str) -> str | None:
-    """Extract hero name from '- HeroName: ...' bullet, e.g. 'Yamato'."""
-    m = _HERO_BULLET_RE.match(line.strip())
-    return m.group(1) if m else None
+_changelog_tables_ready = False
 
 
-def _parse_sections(text: str) -> list[list[str]]:
-    """Split patchnote text into semantic blocks.
+def _ensure_changelog_tables() -> None:
+    global _changelog_tables_ready
+    if _changelog_tables_ready:
+        return
+    # Sicherstellen, dass benötigte Tabellen/Spalten vorhanden sind
+    deadlock_db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS changelog_posts(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          title TEXT NOT NULL,
+          url TEXT NOT NULL,
+          posted_at TEXT,
+          raw_content TEXT
+        )
+        """
+    )
+    for table, column in (
+        ("changelog_posts", "translated_content"),
+        ("changelog_posts", "raw_hash"),
+        ("changelog_posts", "translated_hash"),
+        ("changelog_posts", "fingerprint"),
+        ("changelog_posts", "duplicate_of"),
+    ):
+        _add_column(table, column)
 
-    Handles three section styles:
-    - Explicit headers: **Bold Text**, [ Bracket ], ## Markdown
-    - Implicit hero sections: consecutive '- HeroName: ...' bullets grouped by name
-    - Plain lines without prefix stay in the current block
-    """
-    lines = text.splitlines()
-    blocks: list[list[str]] = []
-    current: list[str] = []
-    current_hero: str | None = None
-
-    def _flush() -> None:
-        nonlocal current, current_hero
-        while current and not current[-1].strip():
-            current.pop()
-        if current:
-            blocks.append(current)
-        current = []
-        current_hero = None
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # Explicit section header → always starts a new block
-        if _is_section_header(line):
-            _flush()
-            current = [line]
-            current_hero = None
-            i += 1
-            continue
+    # Backfill in altem Legacy-Table (falls noch genutzt)
+    deadlock_db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deadlock_changelogs(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          title TEXT,
+          url TEXT,
+          posted_at TEXT,
+          content TEXT
+        )
+        """
+    )
+    _add_column("deadlock_changelogs", "content_hash")
+    deadlock_db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS changelog_translation_versions(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          url TEXT NOT NULL,
+          translated_hash TEXT NOT NULL,
+          created_at TEXT
+        )
+        """
+    )
+    _changelog_tables_ready = True
 
-        # Blank line: peek at next non-blank to decide if new section starts
-        if not stripped:
-            j = i + 1
-            while j < len(lines) and not lines[j].strip():
-                j += 1
-            if j < len(lines):
-                next_line = lines[j]
-                next_hero = _extract_hero_prefix(next_line)
-                next_is_header = _is_section_header(next_line)
-                # New section if: explicit header coming, or different hero prefix
-                if next_is_header or (
-                    next_hero is not None
-                    and current_hero is not None
-                    and next_hero != current_hero
-                ):
-                    _flush()
-                    i += 1
-                    continue
-            # Same section → keep blank as visual spacer
-            current.append(line)
-            i += 1
-            continue
 
-        # Bullet with hero prefix
-        hero = _extract_hero_prefix(line)
-        if hero is not None and current_hero is not None and hero != current_hero:
-            # Hero changed mid-block → split here
-            _flush()
+def _add_column(table: str, column: str) -> None:
+    try:
+        deadlock_db.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+    except Exception as exc:
+        if "duplicate column name" not in str(exc).lower():
+            raise
 
-        if hero is not None and current_hero is None:
-            current_hero = hero
 
-        current.append(line)
-        i += 1
+@patch_tracing.traced("db.save_changelog")
+def save_changelog_to_db(
+    *,
+    url: str,
+    title: str | None,
+    posted_at: str | None,
+    raw_content: str,
+    translated_content: str,
+    duplicate_of: str | None = None,
+) -> None:
+    url = _normalize_patch_link(url)
+    if not url:
+        raise ValueError("URL fehlt, kann Changelog nicht speichern.")
 
-    _flush()
-    return blocks
+    _ensure_changelog_tables()
+    # Alle Statements eines Patches in einer Transaktion (falls die DB das anbietet).
+    with _db_writer.transaction():
+        fingerprint = patch_fingerprint.fingerprint(raw_content).encode()
+        if PATCH_BLOB_STORE:
+            raw_hash = _blob_store.put(raw_content)
+            translated_hash = _blob_store.put(translated_content)
+            raw_text = translated_text = None
+            _record_translation_version(url, translated_hash)
+        else:
+            raw_hash = translated_hash = None
+            raw_text, translated_text = raw_content, translated_content
 
+        existing = _find_saved_changelog_row(url)
+        if existing:
+            deadlock_db.execute(
+                """
+                UPDATE changelog_posts
+                SET title=?,
+                    url=?,
+                    posted_at=COALESCE(?, posted_at),
+                    raw_content=?,
+                    translated_content=?,
+                    raw_hash=?,
+                    translated_hash=?,
+                    fingerprint=?,
+                    duplicate_of=?
+                WHERE id=?
+                """,
+                (
+                    title or url,
+                    url,
+                    posted_at,
+                    raw_text,
+                    translated_text,
+                    raw_hash,
+                    translated_hash,
+                    fingerprint,
+                    duplicate_of,
+                    existing["id"],
+                ),
+            )
+        else:
+            deadlock_db.execute(
+                """
+                INSERT INTO changelog_posts(
+                  title, url, posted_at, raw_content, translated_content, raw_hash, translated_hash,
+                  fingerprint, duplicate_of
+                )
+                VALUES(?,?,?,?,?,?,?,?,?)
+                """,
+                (
+                    title or url,
+                    url,
+                    posted_at,
+                    raw_text,
+                    translated_text,
+                    raw_hash,
+                    translated_hash,
+                    fingerprint,
+                    duplicate_of,
+                ),
+            )
 
-def _section_aware_chunks(text: str, limit: int) -> list[str]:
-    """Split patchnote text into Discord chunks, keeping sections together.
+        legacy = deadlock_db.query_one("SELECT id FROM deadlock_changelogs WHERE url=?", (url,))
+        if not legacy and _is_forum_link(url):
+            patch_id = _extract_patch_id(url)
+            if patch_id is not None:
+                legacy = deadlock_db.query_one(
+                    """
+                    SELECT id
+                    FROM deadlock_changelogs
+                    WHERE url LIKE ? OR url LIKE ?
+                    ORDER BY id DESC
+                    LIMIT 1
+                    """,
+                    (f"%/posts/{patch_id}/%", f"%#post-{patch_id}%"),
+                )
+        if legacy:
+            deadlock_db.execute(
+                """
+                UPDATE deadlock_changelogs
+                SET title=?,
+                    url=?,
+                    posted_at=COALESCE(?, posted_at),
+                    content=?,
+                    content_hash=?
+                WHERE id=?
+                """,
+                (title or url, url, posted_at, raw_text, raw_hash, legacy[0]),
+            )
+        else:
+            deadlock_db.execute(
+                """
+                INSERT INTO deadlock_changelogs(title, url, posted_at, content, content_hash)
+                VALUES(?,?,?,?,?)
+                """,
+                (title or url, url, posted_at, raw_text, raw_hash),
+            )
 
-    Splits happen *between* sections. Only if a single section exceeds
-    the limit is it split at bullet boundaries with a continuation marker.
-    Falls back to _smart_chunks_legacy when no headers are detected.
-    """
-    blocks = _parse_sections(text)
+    if _translation_memory_loaded:
+        _translation_memory.learn(raw_content, translated_content)
+    _learn_item_names(raw_content)
 
-    # Fallback: no sections detected → use legacy line-based splitting
-    if len(blocks) <= 1:
-        return None  # type: ignore[return-value]  # signals caller to use legacy
 
-    def _block_to_str(block_lines: list[str]) -> str:
-        return "\n".join(block_lines).strip()
+def _record_translation_version(url: str, translated_hash: str | None) -> None:
+    """Append a version row unless the latest version of url already has this text."""
+    if not translated_hash:
+        return
+    latest = deadlock_db.query_one(
+        "SELECT translated_hash FROM changelog_translation_versions WHERE url=? ORDER BY id DESC LIMIT 1",
+        (url,),
+    )
+    if latest and latest[0] == translated_hash:
+        return
+    deadlock_db.execute(
+        "INSERT INTO changelog_translation_versions(url, translated_hash, created_at) VALUES(?,?,?)",
+        (url, translated_hash, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
 
-    def _split_large_block(block_lines: list[str]) -> list[str]:
-        """Split a block that alone exceeds limit, at bullet boundaries."""
-        result: list[str] = []
-        header = block_lines[0] if _is_section_header(block_lines[0]) else ""
-        body_lines = block_lines[1:] if header else block_lines[:]
 
-        current_lines: list[str] = [header] if header else []
-        current_len = len(header) if header else 0
+def load_translation_versions(url: str | None) -> list[tuple[str, str | None]]:
+    """All stored translations of url, oldest first, as (created_at, text)."""
+    normalized = _normalize_patch_link(url)
+    if not normalized:
+        return []
+    _ensure_changelog_tables()
+    rows = _db_query_all(
+        "SELECT translated_hash, created_at FROM changelog_translation_versions WHERE url=? ORDER BY id ASC",
+        (normalized,),
+    )
+    return [(row["created_at"], _blob_store.get(row["translated_hash"])) for row in rows]
 
-        for line in body_lines:
-            add_len = len(line) + (1 if current_lines else 0)
-            if current_lines and current_len + add_len > limit:
-                result.append("\n".join(current_lines).strip())
-                current_lines = []
-                current_len = 0
-                add_len = len(line)
 
-            current_lines.append(line)
-            current_len += add_len
+def migrate_changelog_texts_to_blobs() -> int:
+    """Move plain raw/translated texts of both changelog tables into the blob store."""
+    _ensure_changelog_tables()
+    migrated = 0
+    rows = _db_query_all(
+        """
+        SELECT id, url, raw_content, translated_content
+        FROM changelog_posts
+        WHERE raw_content IS NOT NULL OR translated_content IS NOT NULL
+        """
+    )
+    for row in rows:
+        with _db_writer.transaction():
+            translated_hash = _blob_store.put(row["translated_content"])
+            _record_translation_version(row["url"], translated_hash)
+            deadlock_db.execute(
+                """
+                UPDATE changelog_posts
+                SET raw_hash=COALESCE(?, raw_hash),
+                    translated_hash=COALESCE(?, translated_hash),
+                    raw_content=NULL,
+                    translated_content=NULL
+                WHERE id=?
+                """,
+                (_blob_store.put(row["raw_content"]), translated_hash, row["id"]),
+            )
+        migrated += 1
+    for row in _db_query_all("SELECT id, content FROM deadlock_changelogs WHERE content IS NOT NULL"):
+        deadlock_db.execute(
+            "UPDATE deadlock_changelogs SET content_hash=?, content=NULL WHERE id=?",
+            (_blob_store.put(row["content"]), row["id"]),
+        )
+        migrated += 1
+    return migrated
 
-        if current_lines:
-            result.append("\n".join(current_lines).strip())
-        return [r for r in result if r]
 
-    chunks: list[str] = []
-    current_lines: list[str] = []
-    current_len = 0
+# "Mystic Burst: ..." -> Item-Name; hoechstens vier Woerter, beginnt mit Grossbuchstabe.
+_ITEM_PREFIX_RE = re.compile(r"^([A-Z][\w'&.-]*(?: [\w'&.-]+){0,3}):\s")
+# Item-Name -> zuletzt in einem Patch gesehen (ISO-Datum); so im KV-Store abgelegt.
+_item_names_seen: dict[str, str] = {}
+
 
-    def _flush() -> None:
-        nonlocal current_lines, current_len
-        if current_lines:
-            chunks.append("\n".join(current_lines).strip())
-        current_lines.clear()
-        current_len = 0
-
-    for block in blocks:
-        block_str = _block_to_str(block)
-        block_len = len(block_str)
-
-        if block_len > limit:
-            # Block is too large on its own — flush current, split block
-            _flush()
-            chunks.extend(_split_large_block(block))
+def _item_name_prefixes(raw_content: str | None) -> set[str]:
+    """Names used as '- Name: ...' bullet prefixes in the Items section."""
+    names: set[str] = set()
+    for section in patch_document.parse(raw_content).sections:
+        if section.kind != "items":
             continue
+        for group in section.groups:
+            for bullet in group.bullets:
+                match = _ITEM_PREFIX_RE.match(bullet.body) if bullet.hero is None else None
+                if match:
+                    names.add(match.group(1))
+    return names
 
-        # Would adding this block (with blank separator) exceed limit?
-        sep_len = 2 if current_lines else 0  # "\n\n"
-        if current_lines and current_len + sep_len + block_len > limit:
-            _flush()
 
-        if current_lines:
-            current_lines.append("")  # blank separator between sections
-            current_len += 1
-        current_lines.extend(block)
-        current_len = len("\n".join(current_lines))
+def _prune_item_names(seen: dict[str, str], today: datetime) -> dict[str, str]:
+    cutoff = (today - timedelta(days=PATCH_ITEM_NAMES_MAX_AGE_DAYS)).date().isoformat()
+    return {name: last_seen for name, last_seen in seen.items() if last_seen >= cutoff}
 
-    _flush()
-    return [c for c in chunks if c.strip()]
 
+def _store_item_names() -> None:
+    hero_index.set_item_names(_item_names_seen)
+    _db_writer.set_kv(
+        KV_NAMESPACE,
+        KV_ITEM_NAMES_KEY,
+        json.dumps(dict(sorted(_item_names_seen.items())), ensure_ascii=False),
+    )
 
-def _smart_chunks(text: str, limit: int = PATCH_CHUNK_LIMIT) -> list[str]:
-    if not text:
-        return []
 
-    limit = min(max(int(limit), 1), DISCORD_MESSAGE_HARD_LIMIT)
+def load_item_names() -> None:
+    """Load the item list for hero_index from the Deadlock DB ({name: last seen} JSON in the KV store)."""
+    global _item_names_seen
+    try:
+        saved = _db_writer.get_kv(KV_NAMESPACE, KV_ITEM_NAMES_KEY)
+    except Exception as exc:
+        print(f"Konnte Item-Liste nicht aus DB laden: {exc}")
+        return
+    try:
+        stored = json.loads(saved) if saved else {}
+    except ValueError:
+        print("Item-Liste in der DB ist kein gueltiges JSON.")
+        return
+    now = datetime.now(timezone.utc)
+    if isinstance(stored, list):
+        # Altes Format (nur Namen, auch fett gedruckte Ueberschriften): nur echte Praefix-Namen behalten.
+        stored = {
+            str(name): now.date().isoformat()
+            for name in stored
+            if _ITEM_PREFIX_RE.match(f"{name}: ")
+        }
+    if not isinstance(stored, dict):
+        return
+    seen = {str(name): str(last_seen) for name, last_seen in stored.items()}
+    _item_names_seen = _prune_item_names(seen, now)
+    if _item_names_seen != stored:
+        _store_item_names()
+    else:
+        hero_index.set_item_names(_item_names_seen)
+    _timing_log(
+        "item_names_loaded",
+        items=len(hero_index.item_names()),
+        pruned=len(seen) - len(_item_names_seen),
+    )
 
-    # Try section-aware splitting first (returns None when no headers found)
-    section_result = _section_aware_chunks(text, limit)
-    if section_result is not None:
-        return section_result
-    units: list[str] = []
-    for raw_line in text.splitlines():
-        if not raw_line.strip():
-            units.append("")
-            continue
-        units.extend(_split_line_units(raw_line.rstrip(), limit))
 
-    chunks: list[str] = []
-    current_lines: list[str] = []
-    current_len = 0
+def _learn_item_names(raw_content: str | None) -> None:
+    """Record '- Name:' prefixes from the raw patch's Items section as item names."""
+    names = _item_name_prefixes(raw_content)
+    if not names:
+        return
+    today = datetime.now(timezone.utc).date().isoformat()
+    _item_names_seen.update((name, today) for name in names)
+    _store_item_names()
 
-    def _flush() -> None:
-        nonlocal current_lines, current_len
-        while current_lines and not current_lines[-1].strip():
-            current_lines.pop()
-        if current_lines:
-            chunks.append("\n".join(current_lines).rstrip())
-        current_lines = []
-        current_len = 0
-
-    for unit in units:
-        if not current_lines and unit == "":
-            continue
+PATCH_JOB_STATES = ("detected", "fetched", "translated", "sending", "done")
+_patch_jobs_table_ready = False
 
-        add_len = len(unit) if not current_lines else len(unit) + 1
-        if current_lines and current_len + add_len > limit:
-            _flush()
-            if unit == "":
-                continue
-            add_len = len(unit)
-
-        if len(unit) > limit:
-            for piece in _hard_wrap_words(unit, limit):
-                piece_add_len = len(piece) if not current_lines else len(piece) + 1
-                if current_lines and current_len + piece_add_len > limit:
-                    _flush()
-                    piece_add_len = len(piece)
-                current_lines.append(piece)
-                current_len += piece_add_len
-            continue
 
-        current_lines.append(unit)
-        current_len += add_len
+def _ensure_patch_jobs_table() -> None:
+    global _patch_jobs_table_ready
+    if _patch_jobs_table_ready:
+        return
+    deadlock_db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS patchnotes_jobs(
+          url TEXT PRIMARY KEY,
+          state TEXT NOT NULL,
+          canonical_url TEXT,
+          title TEXT,
+          posted_at TEXT,
+          raw_content TEXT,
+          translated_content TEXT,
+          chunk_index INTEGER NOT NULL DEFAULT 0,
+          created_at TEXT,
+          updated_at TEXT
+        )
+        """
+    )
+    _patch_jobs_table_ready = True
 
-    _flush()
 
-    if not chunks and text.strip():
-        return _hard_wrap_words(text, limit)
-    return chunks
+@patch_tracing.traced("db.load_patch_job")
+def load_patch_job(url: str | None):
+    normalized = _normalize_patch_link(url)
+    if not normalized:
+        return None
+    try:
+        _ensure_patch_jobs_table()
+        return deadlock_db.query_one("SELECT * FROM patchnotes_jobs WHERE url=?", (normalized,))
+    except Exception as exc:
+        print(f"Konnte Patch-Job nicht laden ({normalized}): {exc}")
+        return None
 
 
-def _write_patch_to_file(content: str, url: str | None):
-    if not PATCH_OUTPUT_DIR:
-        return False
+@patch_tracing.traced("db.save_patch_job")
+def save_patch_job(url: str | None, state: str, **fields) -> None:
+    """Insert or advance a durable job row; fields are stored alongside the state."""
+    normalized = _normalize_patch_link(url)
+    if not normalized or state not in PATCH_JOB_STATES:
+        return
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    columns = {"state": state, "updated_at": now, **fields}
+    if state == "done":
+        # Artefakte liegen dann in changelog_posts, der Job braucht sie nicht mehr.
+        columns.update(raw_content=None, translated_content=None)
     try:
-        out_dir = Path(PATCH_OUTPUT_DIR)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        base = "patch"
-        if url:
-            m = re.search("(\\d+)", url)
-            if m:
-                base = f"patch_{m.group(1)}"
-        outfile = out_dir / f"{base}.txt"
-        outfile.write_text(content, encoding="utf-8")
-        print(f"[PATCH] Ergebnis in Datei geschrieben: {outfile}")
-        return True
+        _ensure_patch_jobs_table()
+        assignments = ", ".join(f"{column}=?" for column in columns)
+        with _db_writer.transaction():
+            deadlock_db.execute(
+                "INSERT OR IGNORE INTO patchnotes_jobs(url, state, created_at, updated_at) VALUES(?,?,?,?)",
+                (normalized, state, now, now),
+            )
+            deadlock_db.execute(
+                f"UPDATE patchnotes_jobs SET {assignments} WHERE url=?",
+                (*columns.values(), normalized),
+            )
     except Exception as exc:
-        print(f"[PATCH] Schreiben in Datei fehlgeschlagen: {exc}")
-        return False
+        print(f"Konnte Patch-Job nicht speichern ({normalized}, {state}): {exc}")
 
 
-def save_changelog_to_db(
-    *,
-    url: str,
-    title: str | None,
-    posted_at: str | None,
-    raw_content: str,
-    translated_content: str,
-) -> None:
-    url = _normalize_patch_link(url)
-    if not url:
-        raise ValueError("URL fehlt, kann Changelog nicht speichern.")
+def load_pending_patch_jobs() -> list[str]:
+    try:
+        _ensure_patch_jobs_table()
+        rows = _db_query_all(
+            "SELECT url FROM patchnotes_jobs WHERE state != 'done' ORDER BY created_at ASC, rowid ASC"
+        )
+    except Exception as exc:
+        print(f"Konnte offene Patch-Jobs nicht laden: {exc}")
+        return []
+    return [row["url"] for row in rows if row["url"]]
 
-    # Sicherstellen, dass benötigte Tabellen/Spalten vorhanden sind
+
+def _payload_digest(payload: dict) -> str:
+    serializable = {
+        key: [embed.to_dict() for embed in value] if key == "embeds" else value
+        for key, value in payload.items()
+    }
+    return hashlib.sha1(
+        json.dumps(serializable, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+_patch_messages_table_ready = False
+
+
+def _ensure_patch_messages_table() -> None:
+    global _patch_messages_table_ready
+    if _patch_messages_table_ready:
+        return
     deadlock_db.execute(
         """
-        CREATE TABLE IF NOT EXISTS changelog_posts(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          title TEXT NOT NULL,
+        CREATE TABLE IF NOT EXISTS patchnotes_messages(
           url TEXT NOT NULL,
-          posted_at TEXT,
-          raw_content TEXT
+          channel_id INTEGER NOT NULL,
+          chunk_index INTEGER NOT NULL,
+          message_id INTEGER NOT NULL,
+          content_hash TEXT NOT NULL,
+          updated_at TEXT,
+          PRIMARY KEY(url, channel_id, chunk_index)
         )
         """
     )
+    _patch_messages_table_ready = True
+
+
+def load_patch_messages(url: str | None, channel_key: int | None) -> dict[int, tuple[int, str]]:
+    normalized = _normalize_patch_link(url)
+    if not normalized or channel_key is None:
+        return {}
+    try:
+        _ensure_patch_messages_table()
+        rows = _db_query_all(
+            """
+            SELECT chunk_index, message_id, content_hash
+            FROM patchnotes_messages
+            WHERE url=? AND channel_id=?
+            """,
+            (normalized, int(channel_key)),
+        )
+    except Exception as exc:
+        print(f"Konnte gespeicherte Nachrichten nicht laden ({normalized}): {exc}")
+        return {}
+    return {int(row["chunk_index"]): (int(row["message_id"]), row["content_hash"]) for row in rows}
+
+
+@patch_tracing.traced("db.save_patch_message")
+def save_patch_message(
+    url: str | None,
+    channel_key: int,
+    chunk_index: int,
+    message_id: int | None,
+    content_hash: str,
+) -> None:
+    normalized = _normalize_patch_link(url)
+    if not normalized or message_id is None:
+        return
+    try:
+        _ensure_patch_messages_table()
+        deadlock_db.execute(
+            """
+            INSERT OR REPLACE INTO patchnotes_messages(
+              url, channel_id, chunk_index, message_id, content_hash, updated_at
+            )
+            VALUES(?,?,?,?,?,?)
+            """,
+            (
+                normalized,
+                int(channel_key),
+                chunk_index,
+                int(message_id),
+                content_hash,
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            ),
+        )
+    except Exception as exc:
+        print(f"Konnte Nachrichten-ID nicht speichern ({normalized}, chunk {chunk_index}): {exc}")
+
+
+def delete_patch_message(url: str | None, channel_key: int, chunk_index: int) -> None:
+    normalized = _normalize_patch_link(url)
+    if not normalized:
+        return
     try:
-        deadlock_db.execute("ALTER TABLE changelog_posts ADD COLUMN translated_content TEXT")
+        deadlock_db.execute(
+            "DELETE FROM patchnotes_messages WHERE url=? AND channel_id=? AND chunk_index=?",
+            (normalized, int(channel_key), chunk_index),
+        )
     except Exception as exc:
-        if "duplicate column name" not in str(exc).lower():
-            raise
+        print(f"Konnte Nachrichten-ID nicht loeschen ({normalized}, chunk {chunk_index}): {exc}")
 
-    # Backfill in altem Legacy-Table (falls noch genutzt)
+
+_translation_usage_table_ready = False
+
+
+def _ensure_translation_usage_table() -> None:
+    global _translation_usage_table_ready
+    if _translation_usage_table_ready:
+        return
     deadlock_db.execute(
         """
-        CREATE TABLE IF NOT EXISTS deadlock_changelogs(
+        CREATE TABLE IF NOT EXISTS changelog_translation_usage(
           id INTEGER PRIMARY KEY AUTOINCREMENT,
-          title TEXT,
           url TEXT,
-          posted_at TEXT,
-          content TEXT
+          context TEXT,
+          part TEXT,
+          model TEXT,
+          strict INTEGER,
+          partial INTEGER,
+          hedge INTEGER,
+          batch INTEGER,
+          outcome TEXT,
+          attempts INTEGER,
+          prompt_tokens INTEGER,
+          completion_tokens INTEGER,
+          cost REAL,
+          latency_s REAL,
+          created_at TEXT
         )
         """
     )
+    _translation_usage_table_ready = True
 
-    existing = _find_saved_changelog_row(url)
-    if existing:
-        deadlock_db.execute(
-            """
-            UPDATE changelog_posts
-            SET title=?,
-                url=?,
-                posted_at=COALESCE(?, posted_at),
-                raw_content=?,
-                translated_content=?
-            WHERE id=?
-            """,
-            (title or url, url, posted_at, raw_content, translated_content, existing["id"]),
-        )
-    else:
-        deadlock_db.execute(
-            """
-            INSERT INTO changelog_posts(title, url, posted_at, raw_content, translated_content)
-            VALUES(?,?,?,?,?)
-            """,
-            (title or url, url, posted_at, raw_content, translated_content),
-        )
 
-    legacy = deadlock_db.query_one("SELECT id FROM deadlock_changelogs WHERE url=?", (url,))
-    if not legacy and _is_forum_link(url):
-        patch_id = _extract_patch_id(url)
-        if patch_id is not None:
-            legacy = deadlock_db.query_one(
+@patch_tracing.traced("db.save_translation_usage")
+def save_translation_usage(url: str | None, records: list[dict], *, share: int = 1) -> None:
+    """Store per-call usage rows; share > 1 splits a batched call evenly across posts."""
+    if not records:
+        return
+    _ensure_translation_usage_table()
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    url = _normalize_patch_link(url)
+    with _db_writer.transaction():
+        for record in records:
+            context = str(record.get("context") or "")
+            part_match = re.search(r"part (\d+/\d+)", context)
+            cost = record.get("cost")
+            deadlock_db.execute(
                 """
-                SELECT id
-                FROM deadlock_changelogs
-                WHERE url LIKE ? OR url LIKE ?
-                ORDER BY id DESC
-                LIMIT 1
+                INSERT INTO changelog_translation_usage(
+                  url, context, part, model, strict, partial, hedge, batch, outcome, attempts,
+                  prompt_tokens, completion_tokens, cost, latency_s, created_at
+                )
+                VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
                 """,
-                (f"%/posts/{patch_id}/%", f"%#post-{patch_id}%"),
+                (
+                    url,
+                    context,
+                    part_match.group(1) if part_match else None,
+                    record.get("model"),
+                    int(bool(record.get("strict"))),
+                    int(bool(record.get("partial"))),
+                    int(bool(record.get("hedge"))),
+                    int(bool(record.get("batch"))),
+                    record.get("outcome"),
+                    int(record.get("attempts") or 1),
+                    int(record.get("prompt_tokens") or 0) // share,
+                    int(record.get("completion_tokens") or 0) // share,
+                    cost / share if cost is not None else None,
+                    float(record.get("latency_s") or 0.0),
+                    created_at,
+                ),
             )
-    if legacy:
-        deadlock_db.execute(
+
+
+def translation_usage_summary(days: int = PATCH_USAGE_SUMMARY_DAYS) -> str:
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec="seconds")
+    try:
+        rows = _db_query_all(
             """
-            UPDATE deadlock_changelogs
-            SET title=?,
-                url=?,
-                posted_at=COALESCE(?, posted_at),
-                content=?
-            WHERE id=?
+            SELECT
+              CASE
+                WHEN batch = 1 THEN 'batch'
+                WHEN hedge = 1 THEN 'hedge'
+                WHEN strict = 1 THEN 'strict'
+                WHEN partial = 1 THEN 'split'
+                ELSE 'single'
+              END AS path,
+              COUNT(*) AS calls,
+              COUNT(DISTINCT url) AS patches,
+              SUM(attempts) AS attempts,
+              SUM(prompt_tokens) AS prompt_tokens,
+              SUM(completion_tokens) AS completion_tokens,
+              SUM(cost) AS cost,
+              AVG(latency_s) AS latency_s,
+              SUM(CASE WHEN outcome = 'ok' THEN 0 ELSE 1 END) AS failed
+            FROM changelog_translation_usage
+            WHERE created_at >= ?
+            GROUP BY path
+            ORDER BY path
             """,
-            (title or url, url, posted_at, raw_content, legacy[0]),
+            (since,),
         )
-    else:
-        deadlock_db.execute(
-            """
-            INSERT INTO deadlock_changelogs(title, url, posted_at, content)
-            VALUES(?,?,?,?)
-            """,
-            (title or url, url, posted_at, raw_content),
+    except Exception as exc:
+        return f"Keine Usage-Daten verfuegbar: {exc}"
+    if not rows:
+        return f"Keine Perplexity-Aufrufe in den letzten {days} Tagen."
+
+    lines = [f"**Perplexity-Usage (letzte {days} Tage)**"]
+    total_tokens = 0
+    total_cost = 0.0
+    for row in rows:
+        tokens = int(row["prompt_tokens"] or 0) + int(row["completion_tokens"] or 0)
+        total_tokens += tokens
+        total_cost += float(row["cost"] or 0.0)
+        cost_label = f", ${float(row['cost']):.4f}" if row["cost"] is not None else ""
+        lines.append(
+            f"- {row['path']}: {row['calls']} Calls ({row['failed']} ohne Ergebnis, "
+            f"{row['attempts']} HTTP-Versuche), {row['patches']} Patches, "
+            f"{row['prompt_tokens']} in / {row['completion_tokens']} out Tokens{cost_label}, "
+            f"Ø {float(row['latency_s'] or 0.0):.1f}s"
         )
+    lines.append(f"Gesamt: {total_tokens} Tokens" + (f", ${total_cost:.4f}" if total_cost else ""))
+    return "\n".join(lines)
+
 
 def _normalize_patch_link(link: str | None) -> str | None:
     if not link:
@@ -1249,7 +1941,7 @@ def _select_candidate_urls(
 def load_last_patch_update() -> str | None:
     # 1) Primäre Quelle: zentrale Deadlock-DB
     try:
-        saved = deadlock_db.get_kv(KV_NAMESPACE, KV_LAST_PATCH_KEY)
+        saved = _db_writer.get_kv(KV_NAMESPACE, KV_LAST_PATCH_KEY)
         if saved:
             return _normalize_patch_link(saved)
     except Exception as exc:
@@ -1271,14 +1963,15 @@ def save_last_patch_update(latest_link: str) -> None:
         return
 
     try:
-        deadlock_db.set_kv(KV_NAMESPACE, KV_LAST_PATCH_KEY, normalized)
+        # Unveraenderter Checkpoint (jeder Scan ohne neue Posts) wird nicht erneut geschrieben.
+        _db_writer.set_kv(KV_NAMESPACE, KV_LAST_PATCH_KEY, normalized)
     except Exception as exc:
         print(f"Konnte letzten Patch-Link nicht in DB speichern: {exc}")
 
 
 def load_last_test_post() -> str | None:
     try:
-        saved = deadlock_db.get_kv(KV_NAMESPACE, KV_LAST_TEST_POST_KEY)
+        saved = _db_writer.get_kv(KV_NAMESPACE, KV_LAST_TEST_POST_KEY)
         if saved:
             return _normalize_patch_link(saved)
     except Exception as exc:
@@ -1291,7 +1984,7 @@ def save_last_test_post(latest_link: str) -> None:
     if not normalized:
         return
     try:
-        deadlock_db.set_kv(KV_NAMESPACE, KV_LAST_TEST_POST_KEY, normalized)
+        _db_writer.set_kv(KV_NAMESPACE, KV_LAST_TEST_POST_KEY, normalized)
     except Exception as exc:
         print(f"Konnte letzten Test-Post-Link nicht in DB speichern: {exc}")
 
@@ -1303,19 +1996,22 @@ def changelog_already_saved(url: str) -> bool:
         print(f"DB-Check fuer vorhandene Patchnotes fehlgeschlagen: {exc}")
         return False
 
-async def update_patch(url: str) -> bool:
-    patch_start = perf_counter()
-    channel = await _resolve_patch_channel()
-    if channel is None and not PATCH_OUTPUT_DIR and not BOT_DRY_RUN:
-        print(f"Konnte Channel {channel_id} nicht finden.")
-        return False
+async def _load_patch_page(url: str) -> dict | None:
+    """changelog_content_fetcher.process split over the parse (download) and html (parsing) executors."""
+    final_url, page_html = await patch_executors.run(
+        patch_executors.PARSE, changelog_content_fetcher.fetch_page, url
+    )
+    return await patch_executors.run(
+        patch_executors.HTML, changelog_content_fetcher.parse_page, final_url, page_html
+    )
+
 
-    patch_data = await asyncio.to_thread(changelog_content_fetcher.process, url)
+async def _fetch_patch_data(url: str) -> dict | None:
+    patch_data = await _load_patch_page(url)
     if not patch_data or not patch_data.get("content"):
         print(f"Keine Patchnotes unter {url} gefunden.")
-        return False
+        return None
     canonical_url = patch_data.get("url") or url
-    patch_content = patch_data["content"]
     posted_raw = patch_data.get("posted_at")
     posted_dt = _parse_posted_at_datetime(posted_raw)
     now_utc = datetime.now(timezone.utc)
@@ -1330,22 +2026,379 @@ async def update_patch(url: str) -> bool:
     _timing_log(
         "patch_fetch",
         url=canonical_url,
+        source="forum" if _is_forum_link(canonical_url) else "steam",
         posted_at_raw=posted_raw,
         posted_at_utc=posted_utc_label,
         posted_at_local=posted_local_label,
         lag_s=f"{lag_seconds:.1f}" if lag_seconds is not None else None,
-        raw_len=len(patch_content),
+        raw_len=len(patch_data["content"]),
     )
+    return patch_data
 
-    response = await _translate_patch_content(
-        patch_content,
-        include_ping=PATCH_AUTO_INCLUDE_PING,
-        context_label=canonical_url,
+
+async def _translate_patch_batch(
+    items: list[tuple[str, str]],
+    *,
+    context_label: str,
+) -> dict[str, str] | None:
+    """Translate several short posts in one request; None if the answer cannot be split."""
+    post_ids = [post_id for post_id, _ in items]
+    content = perplexity_requests.build_batch_content(items)
+
+    for strict_mode in (False, True):
+        translate_start = perf_counter()
+        record = {
+            "context": context_label,
+            "model": perplexity_requests.MODEL,
+            "strict": strict_mode,
+            "batch": True,
+        }
+        try:
+            api_response = await patch_executors.run(
+                patch_executors.TRANSLATE,
+                _fetch_answer_recorded,
+                record,
+                content,
+                False,
+                strict_mode,
+                False,
+                None,
+                True,
+            )
+        except Exception as exc:
+            print(f"Batch-Uebersetzung fehlgeschlagen ({context_label}, strict={strict_mode}): {exc}")
+            _timing_log(
+                "translate_batch_error",
+                context=context_label,
+                strict=strict_mode,
+                duration_s=f"{(perf_counter() - translate_start):.2f}",
+                error=str(exc)[:180],
+            )
+            continue
+
+        answer = _strip_code_fences(_extract_model_response_text(api_response))
+        parts = perplexity_requests.split_batch_answer(answer, post_ids)
+        if parts is not None:
+            parts = {
+                post_id: await patch_executors.run_cpu(_normalize_output, text, post_id)
+                for post_id, text in parts.items()
+            }
+        if parts is None or any(_looks_like_unusable_translation(text) for text in parts.values()):
+            record["outcome"] = "split_failed"
+            print(f"Batch-Antwort nicht aufteilbar ({context_label}, strict={strict_mode}).")
+            _timing_log(
+                "translate_batch_split_failed",
+                context=context_label,
+                strict=strict_mode,
+                duration_s=f"{(perf_counter() - translate_start):.2f}",
+                output_len=len(answer),
+            )
+            continue
+
+        _timing_log(
+            "translate_batch_ok",
+            context=context_label,
+            strict=strict_mode,
+            posts=len(items),
+            input_len=len(content),
+            duration_s=f"{(perf_counter() - translate_start):.2f}",
+        )
+        return parts
+    return None
+
+
+async def _prepare_batch_translations(urls: list[str]) -> dict[str, tuple[dict, str | None]]:
+    """Fetch pending posts and translate the short ones together.
+
+    Returns url -> (patch_data, translation). Posts that were not batched or
+    whose batch could not be split carry translation None and are translated
+    individually by update_patch.
+    """
+    prepared: dict[str, tuple[dict, str | None]] = {}
+    for url in urls:
+        try:
+            patch_data = await _fetch_patch_data(url)
+        except Exception as exc:
+            print(f"Fehler beim Laden von {url} fuer Batch-Uebersetzung: {exc}")
+            continue
+        if patch_data:
+            prepared[url] = (patch_data, None)
+
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_len = 0
+    for url, (patch_data, _) in prepared.items():
+        content_len = len(patch_data["content"])
+        if content_len > PATCH_BATCH_MAX_POST_CHARS:
+            continue
+        if current and (
+            current_len + content_len > PATCH_BATCH_MAX_CHARS or len(current) >= PATCH_BATCH_MAX_POSTS
+        ):
+            groups.append(current)
+            current = []
+            current_len = 0
+        current.append(url)
+        current_len += content_len
+    if current:
+        groups.append(current)
+
+    for group in groups:
+        if len(group) < 2:
+            continue
+        items = [(str(idx), prepared[url][0]["content"]) for idx, url in enumerate(group, start=1)]
+        usage_records = _UsageCollector(*group)
+        usage_token = _usage_records.set(usage_records)
+        try:
+            translations = await _translate_patch_batch(
+                items,
+                context_label=f"batch {len(group)} posts",
+            )
+        finally:
+            _usage_records.reset(usage_token)
+        for url in group:
+            _db_writer.submit(save_translation_usage, url, usage_records, share=len(group))
+        if translations is None:
+            print(f"Batch-Uebersetzung fuer {len(group)} Posts fehlgeschlagen; uebersetze einzeln.")
+            continue
+        for post_id, url in zip((post_id for post_id, _ in items), group):
+            prepared[url] = (prepared[url][0], translations[post_id])
+    return prepared
+
+
+def _check_translation_structure(url: str, raw_content: str, translated: str) -> None:
+    """Compare bullet counts of raw and translated patch to spot truncated translations."""
+    raw_document = patch_document.parse(raw_content)
+    translated_document = patch_document.parse(translated)
+    raw_bullets = len(raw_document.bullets)
+    translated_bullets = len(translated_document.bullets)
+    _timing_log(
+        "translate_structure",
+        url=url,
+        raw_sections=len(raw_document.sections),
+        raw_bullets=raw_bullets,
+        translated_sections=len(translated_document.sections),
+        translated_bullets=translated_bullets,
     )
-    response = _strip_role_ping(response)
+    if raw_bullets >= 10 and translated_bullets < raw_bullets // 2:
+        print(
+            f"[PATCH] Uebersetzung wirkt unvollstaendig ({translated_bullets}/{raw_bullets} Bullets): {url}"
+        )
+
+
+def _build_raw_preview(patch_data: dict, limit: int = PATCH_CHUNK_LIMIT) -> str:
+    date_str = _format_patch_date(patch_data.get("posted_at"))
+    heading = "### Neuer Deadlock Patch erkannt" + (f" ({date_str})" if date_str else "")
+    footer = "-# Deutsche Uebersetzung folgt, diese Nachricht wird gleich aktualisiert."
+    lines = [heading]
+    title = str(patch_data.get("title") or "").strip()
+    if title:
+        lines.append(f"**{title}**")
+
+    blocks = patch_document.parse(patch_data.get("content")).blocks
+    first_section = "\n".join(blocks[0]).strip() if blocks else ""
+    first_section = _repair_known_hero_sections(_remove_links(first_section))
+    budget = limit - len("\n".join(lines)) - len(footer) - 4
+    if first_section and budget > 0:
+        if len(first_section) > budget:
+            first_section = first_section[: max(0, budget - 1)].rsplit("\n", 1)[0].rstrip() + "\n…"
+        lines.append(first_section)
+    lines.append(footer)
+    return "\n".join(lines)
+
+
+async def _post_raw_preview(channel, url: str, patch_data: dict) -> None:
+    """Post the English first section right away; patch_response later edits it into chunk 0."""
+    if await patch_executors.run_db(load_patch_messages, url, getattr(channel, "id", None)):
+        # Bereits gepostet (Re-Processing) -> keine Vorschau ueber bestehende Nachrichten legen.
+        return
+    preview_start = perf_counter()
+    preview = await patch_executors.run_cpu(_build_raw_preview, patch_data)
+    await _sync_patch_messages(channel, url, [{"content": preview}])
+    _timing_log(
+        "patch_preview_sent",
+        url=url,
+        duration_s=f"{(perf_counter() - preview_start):.2f}",
+    )
+
+
+def _matching_claim(url: str, fingerprint: patch_fingerprint.Fingerprint) -> tuple[str, asyncio.Future] | None:
+    for other_url, (other_fingerprint, result) in _content_claims.items():
+        if other_url == url or _is_forum_link(other_url) == _is_forum_link(url):
+            continue
+        if patch_fingerprint.is_near_duplicate(fingerprint, other_fingerprint):
+            return other_url, result
+    return None
+
+
+async def _claim_patch_content(
+    url: str, fingerprint: patch_fingerprint.Fingerprint
+) -> tuple[tuple[str, str] | None, asyncio.Future | None]:
+    """(original URL, translation) of the same patch from the other source, or a claim to translate it.
+
+    The in-flight check and our own claim happen without an await in between,
+    so two sources processed at the same time cannot both miss each other.
+    """
+    while (match := _matching_claim(url, fingerprint)) is not None:
+        # Die andere Quelle uebersetzt schon -> auf deren Ergebnis warten statt doppelt zu zahlen.
+        _timing_log("patch_duplicate_wait", url=url, duplicate_of=match[0])
+        duplicate = await asyncio.shield(match[1])
+        if duplicate is not None:
+            return duplicate, None
+        # Fehlgeschlagen: Claim ist freigegeben, erneut pruefen.
+    claim = asyncio.get_running_loop().create_future()
+    _content_claims[url] = (fingerprint, claim)
+    try:
+        duplicate = await patch_executors.run_db(_find_duplicate_row, url, fingerprint)
+    except BaseException:
+        _release_patch_content(url, claim, None)
+        raise
+    if duplicate is not None:
+        _release_patch_content(url, claim, duplicate)
+        return duplicate, None
+    return None, claim
+
+
+def _release_patch_content(url: str, claim: asyncio.Future, duplicate: tuple[str, str] | None) -> None:
+    """Hand (original URL, translation) to waiting duplicates; None lets them translate themselves."""
+    if not claim.done():
+        claim.set_result(duplicate)
+    if url in _content_claims and _content_claims[url][1] is claim:
+        del _content_claims[url]
+
+
+async def _link_duplicate_patch(
+    url: str,
+    canonical_url: str,
+    patch_data: dict,
+    original_url: str,
+    translated: str,
+    patch_start: float,
+) -> bool:
+    print(f"Patch {canonical_url} entspricht {original_url}; verknuepft statt erneut uebersetzt/gepostet.")
+    try:
+        await _db_writer.submit(
+            save_changelog_to_db,
+            url=canonical_url,
+            title=patch_data.get("title"),
+            posted_at=patch_data.get("posted_at"),
+            raw_content=patch_data["content"],
+            translated_content=translated,
+            duplicate_of=original_url,
+        )
+    except Exception as exc:
+        print(f"Konnte Patch nicht in Deadlock-DB speichern: {exc}")
+    await _db_writer.submit(save_patch_job, url, "done")
+    _timing_log(
+        "patch_duplicate_linked",
+        url=canonical_url,
+        source="forum" if _is_forum_link(canonical_url) else "steam",
+        duplicate_of=original_url,
+        total_duration_s=f"{(perf_counter() - patch_start):.2f}",
+    )
+    return True
+
+
+async def update_patch(
+    url: str,
+    *,
+    prepared: tuple[dict, str | None] | None = None,
+    send_seq: int | None = None,
+) -> bool:
+    patch_start = perf_counter()
+    channel = await _resolve_patch_channel()
+    if channel is None and not PATCH_OUTPUT_DIR and not BOT_DRY_RUN:
+        print(f"Konnte Channel {channel_id} nicht finden.")
+        return False
+
+    patch_data, response = prepared if prepared else (None, None)
+    job = await patch_executors.run_db(load_patch_job, url)
+    resume_chunk = 0
+    if job is not None and job["state"] == "done":
+        # Erneut verarbeitet (z.B. falsch zugeordneter Beitrag): Job neu starten, sonst geht er bei einem Absturz verloren.
+        print(f"Verarbeite abgeschlossenen Patch-Job erneut: {url}")
+        job = None
+    if job is None:
+        await _db_writer.submit(save_patch_job, url, "detected", chunk_index=0)
+    elif job["state"] != "detected" and job["raw_content"]:
+        # Nach Absturz/Neustart: ab der letzten abgeschlossenen Stufe weitermachen.
+        patch_data = {
+            "url": job["canonical_url"] or url,
+            "title": job["title"],
+            "posted_at": job["posted_at"],
+            "content": job["raw_content"],
+        }
+        if job["state"] in {"translated", "sending"} and job["translated_content"]:
+            response = job["translated_content"]
+        if job["state"] == "sending":
+            resume_chunk = int(job["chunk_index"] or 0)
+        print(f"Setze Patch-Job fort: {url} (state={job['state']}, chunk={resume_chunk})")
+        _timing_log("patch_job_resume", url=url, state=job["state"], chunk_index=resume_chunk)
+
+    if patch_data is None:
+        with patch_tracing.span("fetch"):
+            patch_data = await _fetch_patch_data(url)
+        if patch_data is None:
+            return False
+    canonical_url = patch_data.get("url") or url
+    patch_content = patch_data["content"]
+    if job is None or job["state"] == "detected":
+        await _db_writer.submit(
+            save_patch_job,
+            url,
+            "fetched",
+            canonical_url=canonical_url,
+            title=patch_data.get("title"),
+            posted_at=patch_data.get("posted_at"),
+            raw_content=patch_content,
+        )
+
+    content_claim: asyncio.Future | None = None
+    if PATCH_CROSS_SOURCE_DEDUPE and (job is None or job["state"] in {"detected", "fetched"}):
+        fingerprint = await patch_executors.run_cpu(patch_fingerprint.fingerprint, patch_content)
+        duplicate, content_claim = await _claim_patch_content(canonical_url, fingerprint)
+        if duplicate is not None:
+            return await _link_duplicate_patch(url, canonical_url, patch_data, *duplicate, patch_start)
+
+    usage_records = _UsageCollector(canonical_url)
+    shared: tuple[str, str] | None = None
+    try:
+        # Vorschau nur, wenn dieser Patch gerade mit Senden dran ist, sonst wuerde die Reihenfolge brechen.
+        if (
+            PATCH_RAW_PREVIEW
+            and response is None
+            and channel is not None
+            and not PATCH_OUTPUT_DIR
+            and not BOT_DRY_RUN
+            and (send_seq is None or _patch_send_sequencer.is_current(send_seq))
+        ):
+            try:
+                await _post_raw_preview(channel, canonical_url, patch_data)
+            except Exception as exc:
+                print(f"[PATCH] Vorschau konnte nicht gesendet werden: {exc}")
+
+        if response is None:
+            usage_token = _usage_records.set(usage_records)
+            try:
+                with patch_tracing.span("translate", input_len=len(patch_content)):
+                    response = await _translate_patch_content(
+                        patch_content,
+                        include_ping=PATCH_AUTO_INCLUDE_PING,
+                        context_label=canonical_url,
+                    )
+            finally:
+                _usage_records.reset(usage_token)
+        response = _strip_role_ping(response)
+        shared = (canonical_url, response)
+    finally:
+        if content_claim is not None:
+            _release_patch_content(canonical_url, content_claim, shared)
+    await patch_executors.run_cpu(_check_translation_structure, canonical_url, patch_content, response)
+    if not resume_chunk:
+        await _db_writer.submit(save_patch_job, url, "translated", translated_content=response, chunk_index=0)
 
     try:
-        save_changelog_to_db(
+        await _db_writer.submit(
+            save_changelog_to_db,
             url=canonical_url,
             title=patch_data.get("title"),
             posted_at=patch_data.get("posted_at"),
@@ -1354,22 +2407,52 @@ async def update_patch(url: str) -> bool:
         )
     except Exception as exc:
         print(f"Konnte Patch nicht in Deadlock-DB speichern: {exc}")
+    _db_writer.submit(save_translation_usage, canonical_url, usage_records)
 
-    await patch_response(
-        channel,
-        response,
-        url=canonical_url,
-        posted_at=patch_data.get("posted_at"),
-        include_ping=PATCH_AUTO_INCLUDE_PING,
+    send_turn = (
+        _patch_send_sequencer.turn(send_seq) if send_seq is not None else nullcontext()
     )
+    turn_wait_start = perf_counter()
+    async with send_turn:
+        if send_seq is not None:
+            patch_tracing.record("send.turn_wait", turn_wait_start, perf_counter(), seq=send_seq)
+            _timing_log(
+                "patch_send_turn",
+                url=canonical_url,
+                seq=send_seq,
+                wait_s=f"{(perf_counter() - turn_wait_start):.2f}",
+            )
+        with patch_tracing.span("send"):
+            await patch_response(
+                channel,
+                response,
+                url=canonical_url,
+                posted_at=patch_data.get("posted_at"),
+                include_ping=PATCH_AUTO_INCLUDE_PING,
+                resume_from_chunk=resume_chunk,
+                on_chunk_sent=lambda index: save_patch_job(url, "sending", chunk_index=index + 1),
+            )
+    await _db_writer.submit(save_patch_job, url, "done")
+    posted_dt = _parse_posted_at_datetime(patch_data.get("posted_at"))
+    post_lag = (datetime.now(timezone.utc) - posted_dt).total_seconds() if posted_dt else None
     _timing_log(
         "patch_pipeline_done",
         url=canonical_url,
         total_duration_s=f"{(perf_counter() - patch_start):.2f}",
+        post_lag_s=f"{max(0.0, post_lag):.1f}" if post_lag is not None else None,
     )
     return True
 
 
+def _cleanup_for_discord(text: str, posted_at: str | None) -> str:
+    return _normalize_output(
+        text,
+        strip_fences=True,
+        role_ping=_get_role_ping(),
+        heading=_patch_heading(posted_at),
+    )
+
+
 async def patch_response(
     channel,
     response_content,
@@ -1377,15 +2460,12 @@ async def patch_response(
     posted_at: str | None = None,
     *,
     include_ping: bool = False,
+    resume_from_chunk: int = 0,
+    on_chunk_sent: Callable[[int], None] | None = None,
 ):
     send_start = perf_counter()
-    cleaned = _strip_code_fences(response_content)
-    cleaned = _remove_inline_citations(cleaned)
-    cleaned = _remove_links(cleaned)
-    cleaned = _strip_role_ping(cleaned)
-    cleaned = _repair_known_hero_sections(cleaned)
-    cleaned = _inject_patch_heading(cleaned, posted_at)
-    if _write_patch_to_file(cleaned, url):
+    cleaned = await patch_executors.run_cpu(_cleanup_for_discord, response_content, posted_at)
+    if PATCH_OUTPUT_DIR and await patch_executors.run_io(_write_patch_to_file, cleaned, url):
         _timing_log(
             "patch_written_to_file",
             url=url,
@@ -1411,45 +2491,148 @@ async def patch_response(
             chars=len(cleaned),
         )
         return
-    chunks = _smart_chunks(cleaned, limit=PATCH_CHUNK_LIMIT)
+    if PATCH_SEND_MODE == "embeds":
+        payloads = await patch_executors.run_cpu(_embed_payloads, cleaned)
+    else:
+        chunks = await patch_executors.run_cpu(_smart_chunks, cleaned, PATCH_CHUNK_LIMIT)
+        payloads = [{"content": chunk} for chunk in chunks]
     _timing_log(
         "discord_send_start",
         url=url,
-        chunks=len(chunks),
+        mode=PATCH_SEND_MODE,
+        chunks=len(payloads),
         chars=len(cleaned),
     )
-    for chunk in chunks:
-        await channel.send(chunk)
-    role_ping = _get_role_ping() if include_ping and chunks else None
-    if role_ping:
-        await channel.send(role_ping)
+    stats = await _sync_patch_messages(
+        channel,
+        url,
+        payloads,
+        ping=_get_role_ping() if include_ping and payloads else None,
+        resume_from_chunk=resume_from_chunk,
+        on_chunk_sent=on_chunk_sent,
+    )
     _timing_log(
         "discord_send_done",
         url=url,
-        chunks=len(chunks) + (1 if role_ping else 0),
+        chunks=len(payloads),
         duration_s=f"{(perf_counter() - send_start):.2f}",
+        **stats,
     )
 
 
+# chunk_index der Rollen-Ping-Nachricht: bleibt beim Neuverarbeiten fest, Inhalte werden nur bearbeitet/angehaengt.
+PING_MESSAGE_INDEX = -1
+
+
+async def _put_patch_message(
+    channel,
+    previous: tuple[int, str] | None,
+    payload: dict,
+    index: int,
+    stats: dict[str, int],
+):
+    """Edit the tracked message if its content changed, else send a new one; None if unchanged."""
+    if previous and previous[1] == _payload_digest(payload):
+        stats["unchanged"] += 1
+        return None
+    if previous:
+        try:
+            with patch_tracing.span("discord.edit", index=index):
+                message = await channel.get_partial_message(previous[0]).edit(**payload)
+            stats["edited"] += 1
+            return message
+        except (discord.NotFound, AttributeError):
+            pass
+        except discord.HTTPException as exc:
+            print(f"[PATCH] Nachricht {previous[0]} konnte nicht bearbeitet werden: {exc}")
+    with patch_tracing.span("discord.send", index=index):
+        message = await channel.send(**payload)
+    stats["sent"] += 1
+    return message
+
+
+async def _sync_patch_messages(
+    channel,
+    url: str | None,
+    payloads: list[dict],
+    *,
+    ping: str | None = None,
+    resume_from_chunk: int = 0,
+    on_chunk_sent: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    """Bring the channel in line with payloads: edit changed messages, send or delete the rest.
+
+    The role ping is tracked apart from the content chunks, so a changed chunk
+    count never turns the old ping into content or pings again.
+    """
+    stats = {"sent": 0, "edited": 0, "unchanged": 0, "deleted": 0}
+    channel_key = getattr(channel, "id", None)
+    tracked = url is not None and channel_key is not None
+    existing = await patch_executors.run_db(load_patch_messages, url, channel_key) if tracked else {}
+
+    for index, payload in enumerate(payloads):
+        if index < resume_from_chunk:
+            continue
+        message = await _put_patch_message(channel, existing.get(index), payload, index, stats)
+        if message is not None and tracked:
+            _db_writer.submit(
+                save_patch_message, url, channel_key, index, getattr(message, "id", None), _payload_digest(payload)
+            )
+        if on_chunk_sent is not None:
+            _db_writer.submit(on_chunk_sent, index)
+        # Fortschritt muss stehen, bevor der naechste Chunk rausgeht (Resume nach Absturz).
+        await _db_writer.flush()
+
+    if ping:
+        payload = {"content": ping}
+        previous = existing.get(PING_MESSAGE_INDEX)
+        message = await _put_patch_message(channel, previous, payload, PING_MESSAGE_INDEX, stats)
+        if message is not None and tracked:
+            _db_writer.submit(
+                save_patch_message,
+                url,
+                channel_key,
+                PING_MESSAGE_INDEX,
+                getattr(message, "id", None),
+                _payload_digest(payload),
+            )
+
+    for index in sorted(existing):
+        if index == PING_MESSAGE_INDEX or index < len(payloads):
+            continue
+        try:
+            await channel.get_partial_message(existing[index][0]).delete()
+        except (discord.NotFound, AttributeError):
+            pass
+        except discord.HTTPException as exc:
+            print(f"[PATCH] Nachricht {existing[index][0]} konnte nicht geloescht werden: {exc}")
+            continue
+        _db_writer.submit(delete_patch_message, url, channel_key, index)
+        stats["deleted"] += 1
+    return stats
+
+
 def _load_latest_patch_from_db() -> tuple[str | None, str | None, str | None, str | None]:
     try:
+        _ensure_changelog_tables()
         row = deadlock_db.query_one(
-            "SELECT url, title, posted_at, raw_content FROM changelog_posts ORDER BY id DESC LIMIT 1"
+            "SELECT url, title, posted_at, raw_content, raw_hash FROM changelog_posts ORDER BY id DESC LIMIT 1"
         )
     except Exception as exc:
         print(f"Konnte letzten Patch nicht aus DB laden: {exc}")
         return None, None, None, None
     if not row:
         return None, None, None, None
-    return _normalize_patch_link(row["url"]), row["title"], row["posted_at"], row["raw_content"]
+    raw_content = _stored_text(row["raw_content"], row["raw_hash"])
+    return _normalize_patch_link(row["url"]), row["title"], row["posted_at"], raw_content
 
 
 async def retranslate_latest_patch(channel, *, include_ping: bool):
-    url, title, posted_at, raw_content = _load_latest_patch_from_db()
+    url, title, posted_at, raw_content = await patch_executors.run_db(_load_latest_patch_from_db)
 
     if not raw_content and url:
         try:
-            patch_data = await asyncio.to_thread(changelog_content_fetcher.process, url)
+            patch_data = await _load_patch_page(url)
         except Exception as exc:
             await channel.send(f"Letzten Patch gefunden ({url}), aber konnte Inhalt nicht laden: {exc}")
             return
@@ -1464,17 +2647,24 @@ async def retranslate_latest_patch(channel, *, include_ping: bool):
         await channel.send("Keine gespeicherten Patchnotes gefunden.")
         return
 
-    response = await _translate_patch_content(
-        raw_content,
-        include_ping=include_ping,
-        context_label=url or "retranslate_latest",
-    )
+    usage_records = _UsageCollector(url)
+    usage_token = _usage_records.set(usage_records)
+    try:
+        response = await _translate_patch_content(
+            raw_content,
+            include_ping=include_ping,
+            context_label=url or "retranslate_latest",
+        )
+    finally:
+        _usage_records.reset(usage_token)
 
     response = _strip_role_ping(response)
+    _db_writer.submit(save_translation_usage, url, usage_records)
 
     if url:
         try:
-            save_changelog_to_db(
+            await _db_writer.submit(
+                save_changelog_to_db,
                 url=url,
                 title=title,
                 posted_at=posted_at,
@@ -1523,7 +2713,7 @@ async def maybe_post_latest_patch_for_test(saved_last_patch):
         return saved_last_patch
 
     try:
-        latest_info = await asyncio.to_thread(changelog_latest_fetcher.check_latest)
+        latest_info = await patch_executors.run(patch_executors.POLL, changelog_latest_fetcher.check_latest)
     except Exception as exc:
         print(f"Fehler beim Abrufen des neuesten Patches fuer Test-Post: {exc}")
         return saved_last_patch
@@ -1532,17 +2722,23 @@ async def maybe_post_latest_patch_for_test(saved_last_patch):
     if not latest_post_url:
         return saved_last_patch
 
-    last_test_post = load_last_test_post()
+    last_test_post = await patch_executors.run_db(load_last_test_post)
     saved_norm = _normalize_patch_link(saved_last_patch)
-    if last_test_post == latest_post_url or saved_norm == latest_post_url or changelog_already_saved(latest_post_url):
+    if (
+        last_test_post == latest_post_url
+        or saved_norm == latest_post_url
+        or await patch_executors.run_db(changelog_already_saved, latest_post_url)
+    ):
         print(f"Testmodus uebersprungen, Patch bereits verarbeitet: {latest_post_url}")
-        save_last_patch_update(latest_post_url)
-        save_last_test_post(latest_post_url)
+        await _db_writer.submit(save_last_patch_update, latest_post_url)
+        await _db_writer.submit(save_last_test_post, latest_post_url)
         return latest_post_url
 
     print(f"Testmodus aktiv: Poste neuesten Patch einmalig in Kanal {channel_id}: {latest_post_url}")
     try:
-        posted = await update_patch(latest_post_url)
+        with patch_eventlog.correlate(latest_post_url) as cid, patch_tracing.trace(latest_post_url):
+            async with patch_profiling.profile(f"update_patch_{cid}"):
+                posted = await update_patch(latest_post_url)
     except Exception as exc:
         print(f"Fehler beim Test-Post des neuesten Patches: {exc}")
         return saved_last_patch
@@ -1550,11 +2746,71 @@ async def maybe_post_latest_patch_for_test(saved_last_patch):
     if not posted:
         return saved_last_patch
 
-    save_last_patch_update(latest_post_url)
-    save_last_test_post(latest_post_url)
+    await _db_writer.submit(save_last_patch_update, latest_post_url)
+    await _db_writer.submit(save_last_test_post, latest_post_url)
     return latest_post_url
 
 
+@dataclass
+class _PatchJob:
+    urls: list[str]
+    seqs: list[int]
+    enqueued_at: float = field(default_factory=perf_counter)
+
+
+class _SendSequencer:
+    """Hands out send turns in detection order, so parallel workers post in sequence."""
+
+    def __init__(self) -> None:
+        self._issued = 0
+        self._next = 0
+        self._released: set[int] = set()
+        self._cond = asyncio.Condition()
+
+    def reserve(self) -> int:
+        seq = self._issued
+        self._issued += 1
+        return seq
+
+    def is_current(self, seq: int) -> bool:
+        return self._next >= seq
+
+    @asynccontextmanager
+    async def turn(self, seq: int):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._next >= seq)
+        try:
+            yield
+        finally:
+            await self.release(seq)
+
+    async def release(self, seq: int) -> None:
+        async with self._cond:
+            if seq >= self._next:
+                self._released.add(seq)
+            while self._next in self._released:
+                self._released.discard(self._next)
+                self._next += 1
+            self._cond.notify_all()
+
+
+# Alle Pipeline-Posts gehen in PATCH_CHANNEL_ID, daher genau ein Sequencer.
+_patch_send_sequencer = _SendSequencer()
+_patch_queue: asyncio.Queue[_PatchJob] = asyncio.Queue()
+_inflight_urls: set[str] = set()
+_failed_urls: list[str] = []
+_checkpoint_seq = -1
+
+
+def _advance_checkpoint(url: str, seq: int) -> None:
+    """Persist the checkpoint only forward, even if workers finish out of order."""
+    global _checkpoint_seq
+    if seq <= _checkpoint_seq:
+        return
+    _checkpoint_seq = seq
+    _db_writer.submit(save_last_patch_update, url)
+
+
 async def fetch_and_maybe_post(saved_last_patch, force: bool = False):
     scan_start = perf_counter()
     _timing_log(
@@ -1564,7 +2820,7 @@ async def fetch_and_maybe_post(saved_last_patch, force: bool = False):
     )
 
     try:
-        latest_info = await asyncio.to_thread(changelog_latest_fetcher.check_latest)
+        latest_info = await patch_executors.run(patch_executors.POLL, changelog_latest_fetcher.check_latest)
     except Exception as exc:
         print(f"Fehler beim Abrufen der neuesten Patchnotes: {exc}")
         _timing_log(
@@ -1590,25 +2846,26 @@ async def fetch_and_maybe_post(saved_last_patch, force: bool = False):
         latest_post_url=latest_post_url,
         saved_norm=saved_norm,
     )
-    main_raw = _get_db_raw_content(latest_thread_url or (post_urls[0] if post_urls else None))
-    new_posts: list[str] = []
+    main_fingerprint = await _get_db_fingerprint(latest_thread_url or (post_urls[0] if post_urls else None))
+    # Fehlgeschlagene Posts beim naechsten Scan erneut einreihen (wie zuvor im seriellen Ablauf).
+    new_posts: list[str] = [url for url in _failed_urls if url not in _inflight_urls]
+    _failed_urls.clear()
     for url in to_check:
-        if not url:
+        if not url or url in _inflight_urls or url in new_posts:
             continue
-        if not changelog_already_saved(url):
+        if not await patch_executors.run_db(changelog_already_saved, url):
             new_posts.append(url)
             continue
         # Reprocess if the stored content looks identical zum Haupt-Patch (falsche Zuordnung)
-        saved_raw = _get_db_raw_content(url)
         if (
-            saved_raw
-            and main_raw
+            main_fingerprint is not None
             and url != latest_thread_url
             and _is_forum_link(url)
             and _is_forum_link(latest_thread_url)
         ):
-            # gleiche/fast gleiche Laenge -> vermutlich Hauptpatch kopiert statt Kommentar
-            if abs(len(saved_raw) - len(main_raw)) < 500 and len(saved_raw) > 2000:
+            # Fast gleicher Fingerprint -> vermutlich Hauptpatch kopiert statt Kommentar
+            saved_fingerprint = await _get_db_fingerprint(url)
+            if patch_fingerprint.is_near_duplicate(saved_fingerprint, main_fingerprint):
                 new_posts.append(url)
 
     should_log_scan = PATCH_SCAN_VERBOSE or bool(new_posts)
@@ -1628,7 +2885,9 @@ async def fetch_and_maybe_post(saved_last_patch, force: bool = False):
         )
 
     if not new_posts:
-        save_last_patch_update(latest_post_url)
+        # Checkpoint nicht an laufenden Jobs vorbeischieben.
+        if not _inflight_urls:
+            _db_writer.submit(save_last_patch_update, latest_post_url)
         _timing_log(
             "scan_no_new_posts",
             latest_post=latest_post_url,
@@ -1637,44 +2896,112 @@ async def fetch_and_maybe_post(saved_last_patch, force: bool = False):
         )
         return latest_post_url
 
-    last_processed = saved_norm
+    job = _PatchJob(urls=new_posts, seqs=[_patch_send_sequencer.reserve() for _ in new_posts])
     for url in new_posts:
         print(f"Neuer Patch gefunden: {url}")
-        post_start = perf_counter()
+        _inflight_urls.add(url)
+        if await patch_executors.run_db(load_patch_job, url) is None:
+            await _db_writer.submit(save_patch_job, url, "detected")
         _timing_log("new_patch_detected", url=url)
-        try:
-            posted = await update_patch(url)
-            if not posted:
-                continue
-            save_last_patch_update(url)
-            last_processed = url
-            _timing_log(
-                "new_patch_processed",
-                url=url,
-                duration_s=f"{(perf_counter() - post_start):.2f}",
-            )
-        except Exception as exc:
-            print(f"Fehler beim Posten der Patchnotes: {exc}")
-            _timing_log(
-                "new_patch_error",
-                url=url,
-                duration_s=f"{(perf_counter() - post_start):.2f}",
-                error=str(exc)[:200],
-            )
+    await _patch_queue.put(job)
 
     _timing_log(
         "scan_done",
         duration_s=f"{(perf_counter() - scan_start):.2f}",
-        last_processed=last_processed,
+        enqueued=len(new_posts),
+        queue_depth=_patch_queue.qsize(),
+    )
+    return to_check[-1] if to_check else saved_last_patch
+
+
+async def _process_patch_job(job: _PatchJob) -> None:
+    prepared: dict[str, tuple[dict, str | None]] = {}
+    # Fortgesetzte Jobs haben ihre Artefakte schon und werden nicht neu gebatcht; abgeschlossene starten neu.
+    fresh_urls = [
+        url
+        for url in job.urls
+        if (row := await patch_executors.run_db(load_patch_job, url)) is None or row["state"] in {"detected", "done"}
+    ]
+    if PATCH_BATCH_TRANSLATE and len(fresh_urls) > 1:
+        try:
+            prepared = await _prepare_batch_translations(fresh_urls)
+        except Exception as exc:
+            print(f"Batch-Vorbereitung fehlgeschlagen, verarbeite Posts einzeln: {exc}")
+
+    for url, seq in zip(job.urls, job.seqs):
+        post_start = perf_counter()
+        with patch_eventlog.correlate(url) as cid, patch_tracing.trace(url):
+            patch_tracing.record("queue_wait", job.enqueued_at, post_start)
+            try:
+                async with patch_profiling.profile(f"update_patch_{cid}"):
+                    posted = await update_patch(url, prepared=prepared.get(url), send_seq=seq)
+                if not posted:
+                    _failed_urls.append(url)
+                    continue
+                _advance_checkpoint(url, seq)
+                _timing_log(
+                    "new_patch_processed",
+                    url=url,
+                    queue_wait_s=f"{(post_start - job.enqueued_at):.2f}",
+                    duration_s=f"{(perf_counter() - post_start):.2f}",
+                )
+            except Exception as exc:
+                _failed_urls.append(url)
+                print(f"Fehler beim Posten der Patchnotes: {exc}")
+                _timing_log(
+                    "new_patch_error",
+                    url=url,
+                    duration_s=f"{(perf_counter() - post_start):.2f}",
+                    error=str(exc)[:200],
+                )
+            finally:
+                # Auch fehlgeschlagene Posts geben ihren Platz in der Sende-Reihenfolge frei.
+                await _patch_send_sequencer.release(seq)
+                _inflight_urls.discard(url)
+
+
+async def _resume_pending_jobs() -> None:
+    pending = [url for url in await patch_executors.run_db(load_pending_patch_jobs) if url not in _inflight_urls]
+    if not pending:
+        return
+    print(f"Setze {len(pending)} offene Patch-Jobs fort: {pending}")
+    _timing_log("patch_jobs_resume", jobs=len(pending))
+    _inflight_urls.update(pending)
+    await _patch_queue.put(
+        _PatchJob(urls=pending, seqs=[_patch_send_sequencer.reserve() for _ in pending])
     )
-    return last_processed or saved_last_patch
+
+
+async def _patch_worker(worker_id: int) -> None:
+    while True:
+        job = await _patch_queue.get()
+        try:
+            await _process_patch_job(job)
+        except Exception as exc:
+            print(f"Unerwarteter Fehler in Patch-Worker {worker_id}: {exc}")
+            _timing_log("patch_worker_error", worker=worker_id, error=str(exc)[:200])
+        finally:
+            _patch_queue.task_done()
 
 
 async def _scan_loop():
-    saved_last_patch = load_last_patch_update()
+    saved_last_patch = await patch_executors.run_db(load_last_patch_update)
+    await patch_executors.run_db(load_item_names)
+    if PATCH_BLOB_STORE:
+        try:
+            migrated = await _db_writer.submit(migrate_changelog_texts_to_blobs)
+            if migrated:
+                _timing_log("blob_migration_done", rows=migrated)
+        except Exception as exc:
+            print(f"Migration in den Blob-Speicher fehlgeschlagen: {exc}")
     _timing_log("scan_loop_start", saved_last_patch=saved_last_patch, interval_s=CHECK_INTERVAL_SECONDS)
 
+    workers = [
+        asyncio.create_task(_patch_worker(worker_id))
+        for worker_id in range(1, PATCH_PIPELINE_WORKERS + 1)
+    ]
     try:
+        await _resume_pending_jobs()
         saved_last_patch = await maybe_post_latest_patch_for_test(saved_last_patch)
         saved_last_patch = await fetch_and_maybe_post(saved_last_patch, force=True)
         while not stop_event.is_set():
@@ -1693,14 +3020,36 @@ async def _scan_loop():
         print(f"Unerwarteter Fehler im Scan-Loop: {exc}")
         _timing_log("scan_loop_error", error=str(exc)[:200])
         raise
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+def _report_loop_stall(duration: float, stack: str) -> None:
+    # Laeuft im Watchdog-Thread, nachdem die Loop wieder frei ist.
+    frames = [line for line in stack.splitlines() if line.strip()][-12:]
+    print(f"[LOOP] Event-Loop {duration * 1000:.0f} ms blockiert:\n" + "\n".join(frames))
+    _timing_log("loop_stall", lag_s=f"{duration:.3f}", stack=" | ".join(line.strip() for line in frames[-6:]))
 
 
 @client.event
 async def on_ready():
-    global _scan_task
+    global _scan_task, _metrics_runner, _loop_monitor
     print("Bot ist ready!")
     _timing_log("bot_ready")
 
+    if PATCH_LOOP_STALL_MS and _loop_monitor is None:
+        _loop_monitor = patch_loop_monitor.LoopMonitor(PATCH_LOOP_STALL_MS / 1000, _report_loop_stall)
+        _loop_monitor.start()
+        patch_profiling.use_monitor(_loop_monitor)
+
+    if PATCH_METRICS_PORT and _metrics_runner is None:
+        try:
+            _metrics_runner = await patch_metrics.start_server(PATCH_METRICS_HOST, PATCH_METRICS_PORT)
+            print(f"Metriken unter http://{PATCH_METRICS_HOST}:{PATCH_METRICS_PORT}/metrics")
+        except OSError as exc:
+            print(f"Metrik-Server konnte nicht starten: {exc}")
+
     if _scan_task and not _scan_task.done():
         print("Scan-Task laeuft bereits, kein Neustart erforderlich.")
         return
@@ -1712,12 +3061,31 @@ async def on_ready():
 async def on_message(message):
     if message.author.bot:
         return
+    if (message.content or "").strip().lower() == "!tusage":
+        summary = await patch_executors.run_db(translation_usage_summary)
+        await message.channel.send(summary)
+        return
+    if (message.content or "").strip().lower() in {"!tprofile", "!tprofile off"}:
+        patch_profiling.arm(0 if message.content.strip().lower().endswith("off") else 1)
+        await message.channel.send(f"Profiling: {patch_profiling.status()} (Ausgabe in {PATCH_PROFILE_DIR})")
+        return
     mode = _get_retranslate_mode(message.content)
     if mode is None:
         return
-    async with message.channel.typing():
+    async with message.channel.typing(), patch_profiling.profile("retranslate_latest_patch"):
         await retranslate_latest_patch(message.channel, include_ping=mode)
 
 
 if __name__ == "__main__" and os.getenv("BOT_SKIP_RUN") != "1" and not BOT_DRY_RUN:
-    client.run(token)
+    # Zusammengehoerige Writes (Changelog + Blobs + Versionen) brauchen echte Transaktionen.
+    _db_writer.check_transactions()
+    if PATCH_EVENT_LOG:
+        patch_eventlog.start(
+            PATCH_EVENT_LOG, max_bytes=PATCH_EVENT_LOG_MAX_BYTES, backups=PATCH_EVENT_LOG_BACKUPS
+        )
+    try:
+        client.run(token)
+    finally:
+        # Eingereihte DB-Schreibvorgaenge hat client.close() schon abgewartet; hier nur laufende Arbeit.
+        patch_executors.shutdown()
+        patch_eventlog.stop()
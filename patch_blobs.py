@@ -0,0 +1,92 @@
+"""Content-addressed, zlib-compressed text storage in the Deadlock DB.
+
+Texts are keyed by their SHA-256, so identical raw or translated content
+across URL variants, tables and translation versions is stored once.
+Reads decompress transparently and keep a small LRU of recent texts.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+CODEC = "zlib"
+CACHE_SIZE = 128
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decompress(data: bytes, codec: str = CODEC) -> str:
+    if codec != CODEC:
+        raise ValueError(f"Unbekannter Blob-Codec: {codec}")
+    return zlib.decompress(bytes(data)).decode("utf-8")
+
+
+class BlobStore:
+    def __init__(self, db) -> None:
+        self._db = db
+        self._ready = False
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        if self._ready:
+            return
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS patchnotes_blobs(
+              hash TEXT PRIMARY KEY,
+              codec TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              data BLOB NOT NULL,
+              created_at TEXT
+            )
+            """
+        )
+        self._ready = True
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def put(self, text: str | None) -> str | None:
+        """Store text (once) and return its hash; None stays None."""
+        if text is None:
+            return None
+        key = digest(text)
+        self.ensure_table()
+        # Immer schreiben: ein "schon gespeichert"-Cache waere nach einem Rollback der
+        # umgebenden Transaktion falsch. INSERT OR IGNORE macht Duplikate billig.
+        self._db.execute(
+            "INSERT OR IGNORE INTO patchnotes_blobs(hash, codec, size, data, created_at) VALUES(?,?,?,?,?)",
+            (key, CODEC, len(text), compress(text), datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        )
+        self._remember(key, text)
+        return key
+
+    def get(self, key: str | None) -> str | None:
+        if not key:
+            return None
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                return text
+        self.ensure_table()
+        row = self._db.query_one("SELECT codec, data FROM patchnotes_blobs WHERE hash=?", (key,))
+        if not row:
+            return None
+        text = decompress(row[1], row[0])
+        self._remember(key, text)
+        return text
@@ -0,0 +1,387 @@
+"""Shared chunking engine for translation splitting and Discord messages.
+
+Lines are classified once, grouped into section blocks in a single pass and
+packed lazily. The size metric is pluggable: characters for Discord, an
+estimated token count for translation requests.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+import hero_index
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?…])\s+")
+_BULLET_PREFIX_RE = re.compile(r"^(\s*(?:[-*]|•|\d+[.)])\s+)(.+)$")
+_SECTION_HEADER_RE = re.compile(r"^\*\*[^*]+\*\*\s*$|^#{1,3}\s+\S|^\[\s*.+\s*\]\s*$")
+# Fallback for names hero_index does not know yet: "- Name: ..." with a single capitalized word
+_HERO_BULLET_RE = re.compile(r"^-\s+([A-ZÄÖÜ][a-zA-ZäöüÄÖÜß]*):\s+")
+# Ein Treffer je angefangene 4 Wortzeichen bzw. je Satzzeichen.
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+BLANK = "blank"
+HEADER = "header"
+TEXT = "text"
+
+
+@dataclass(frozen=True, slots=True)
+class ClassifiedLine:
+    text: str
+    kind: str
+    # Hero- oder Item-Name eines "- Name: ..."-Bullets; gleiche Namen bilden einen Block.
+    group: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SizeMetric:
+    name: str
+    measure: Callable[[str], int]
+    # Grobe Zeichen pro Einheit, fuer das Umbrechen einzelner zu langer Zeilen.
+    chars_per_unit: int
+    newline_size: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: one token per punctuation mark, ~4 characters per word piece."""
+    return len(_TOKEN_RE.findall(text or ""))
+
+
+CHARS = SizeMetric("chars", len, 1, 1)
+TOKENS = SizeMetric("tokens", estimate_tokens, 4, 0)
+
+
+def is_section_header(line: str) -> bool:
+    """Returns True if line looks like a patchnote section header."""
+    stripped = line.strip()
+    if not stripped:
+        return False
+    return bool(_SECTION_HEADER_RE.match(stripped))
+
+
+def extract_hero_prefix(line: str) -> str | None:
+    """Extract the hero/item name from a '- Name: ...' bullet, e.g. 'Lady Geist'."""
+    stripped = line.strip()
+    if not stripped.startswith("-") or not stripped[1:2].isspace():
+        return None
+    prefix = hero_index.name_prefix(stripped[1:].lstrip())
+    if prefix is not None:
+        return prefix[0].name
+    m = _HERO_BULLET_RE.match(stripped)
+    return m.group(1) if m else None
+
+
+def classify_line(line: str) -> ClassifiedLine:
+    stripped = line.strip()
+    if not stripped:
+        return ClassifiedLine(line, BLANK)
+    if _SECTION_HEADER_RE.match(stripped):
+        return ClassifiedLine(line, HEADER)
+    return ClassifiedLine(line, TEXT, extract_hero_prefix(stripped))
+
+
+def classify_lines(text: str) -> list[ClassifiedLine]:
+    return [classify_line(line) for line in (text or "").splitlines()]
+
+
+def iter_blocks(lines: list[ClassifiedLine]) -> Iterator[list[ClassifiedLine]]:
+    """Group classified lines into semantic blocks.
+
+    Handles three section styles:
+    - Explicit headers: **Bold Text**, [ Bracket ], ## Markdown
+    - Implicit hero sections: consecutive '- HeroName: ...' bullets grouped by name
+    - Plain lines without prefix stay in the current block
+    """
+    # Index der naechsten nicht-leeren Zeile, damit Leerzeilen-Laeufe nur einmal gescannt werden.
+    next_content: list[int] = [len(lines)] * len(lines)
+    following = len(lines)
+    for index in range(len(lines) - 1, -1, -1):
+        next_content[index] = following
+        if lines[index].kind != BLANK:
+            following = index
+
+    current: list[ClassifiedLine] = []
+    current_hero: str | None = None
+
+    def _take() -> list[ClassifiedLine] | None:
+        nonlocal current, current_hero
+        while current and current[-1].kind == BLANK:
+            current.pop()
+        block = current or None
+        current = []
+        current_hero = None
+        return block
+
+    for index, line in enumerate(lines):
+        if line.kind == HEADER:
+            block = _take()
+            if block:
+                yield block
+            current = [line]
+            continue
+
+        if line.kind == BLANK:
+            upcoming = next_content[index]
+            if upcoming < len(lines):
+                next_line = lines[upcoming]
+                if next_line.kind == HEADER or (
+                    next_line.group is not None
+                    and current_hero is not None
+                    and next_line.group != current_hero
+                ):
+                    block = _take()
+                    if block:
+                        yield block
+                    continue
+            current.append(line)
+            continue
+
+        if line.group is not None and current_hero is not None and line.group != current_hero:
+            block = _take()
+            if block:
+                yield block
+        if line.group is not None and current_hero is None:
+            current_hero = line.group
+        current.append(line)
+
+    block = _take()
+    if block:
+        yield block
+
+
+def parse_sections(text: str) -> list[list[str]]:
+    return [[line.text for line in block] for block in iter_blocks(classify_lines(text))]
+
+
+def hard_wrap_words(text: str, limit: int) -> list[str]:
+    stripped = text.strip()
+    if not stripped:
+        return []
+
+    words = stripped.split()
+    if not words:
+        return [stripped[i : i + limit] for i in range(0, len(stripped), limit)]
+
+    wrapped: list[str] = []
+    current = ""
+    for word in words:
+        if not current:
+            if len(word) <= limit:
+                current = word
+            else:
+                wrapped.extend(word[i : i + limit] for i in range(0, len(word), limit))
+            continue
+
+        candidate = f"{current} {word}"
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+
+        wrapped.append(current)
+        if len(word) <= limit:
+            current = word
+        else:
+            wrapped.extend(word[i : i + limit] for i in range(0, len(word), limit))
+            current = ""
+
+    if current:
+        wrapped.append(current)
+    return wrapped
+
+
+def split_line_units(line: str, limit: int) -> list[str]:
+    if len(line) <= limit:
+        return [line]
+
+    match = _BULLET_PREFIX_RE.match(line)
+    prefix = ""
+    body = line.strip()
+    if match:
+        prefix = match.group(1)
+        body = match.group(2).strip()
+
+    sentences = [part.strip() for part in _SENTENCE_SPLIT_RE.split(body) if part.strip()]
+    if len(sentences) <= 1:
+        return hard_wrap_words(line, limit)
+
+    units: list[str] = []
+    continuation_prefix = " " * len(prefix) if prefix else ""
+    for idx, sentence in enumerate(sentences):
+        line_part = f"{prefix if idx == 0 else continuation_prefix}{sentence}"
+        if len(line_part) <= limit:
+            units.append(line_part)
+        else:
+            units.extend(hard_wrap_words(line_part, limit))
+    return units
+
+
+def pack_blocks_balanced(
+    blocks: list[str],
+    limit: int,
+    sizes: list[int] | None = None,
+    separator: str = "\n\n",
+    separator_size: int | None = None,
+) -> list[str]:
+    """Group consecutive blocks into as few chunks as possible, then as evenly as possible.
+
+    Dynamic programming over block boundaries: best[j] is the (chunk count,
+    sum of squared chunk sizes) for packing blocks[:j]. Chunk sizes come
+    from prefix sums, and since every block fits on its own, the feasible
+    start positions for each end form a sliding window.
+    """
+    if not blocks:
+        return []
+    if sizes is None:
+        sizes = [len(block) for block in blocks]
+    sep_size = len(separator) if separator_size is None else separator_size
+    prefix = [0]
+    for size in sizes:
+        prefix.append(prefix[-1] + size)
+
+    def _chunk_size(start: int, end: int) -> int:
+        return prefix[end] - prefix[start] + sep_size * (end - start - 1)
+
+    count = len(blocks)
+    best: list[tuple[int, int]] = [(0, 0)] + [(count + 1, 0)] * count
+    split_at = [0] * (count + 1)
+    window_start = 0
+    for end in range(1, count + 1):
+        while window_start < end - 1 and _chunk_size(window_start, end) > limit:
+            window_start += 1
+        for start in range(window_start, end):
+            chunk_size = _chunk_size(start, end)
+            candidate = (best[start][0] + 1, best[start][1] + chunk_size * chunk_size)
+            if candidate < best[end]:
+                best[end] = candidate
+                split_at[end] = start
+
+    chunks: list[str] = []
+    end = count
+    while end > 0:
+        start = split_at[end]
+        chunks.append(separator.join(blocks[start:end]))
+        end = start
+    chunks.reverse()
+    return chunks
+
+
+def _wrap_to_metric(text: str, limit: int, metric: SizeMetric) -> Iterator[tuple[str, int]]:
+    size = metric.measure(text)
+    if size <= limit:
+        yield text, size
+        return
+    # Zeichenlimit am tatsaechlichen Verhaeltnis der Zeile ausrichten, nicht am Durchschnitt.
+    char_limit = max(1, min(len(text) - 1, len(text) * limit // size))
+    for piece in hard_wrap_words(text, char_limit):
+        yield from _wrap_to_metric(piece, limit, metric)
+
+
+def _line_units(lines: Iterable[str], limit: int, metric: SizeMetric) -> Iterator[tuple[str, int]]:
+    char_limit = max(1, limit * metric.chars_per_unit)
+    for line in lines:
+        if not line.strip():
+            yield "", 0
+            continue
+        size = metric.measure(line)
+        if size <= limit:
+            yield line.rstrip(), size
+            continue
+        for unit in split_line_units(line.rstrip(), char_limit):
+            yield from _wrap_to_metric(unit, limit, metric)
+
+
+def _pack_lines(lines: Iterable[str], limit: int, metric: SizeMetric) -> Iterator[str]:
+    """Greedy line packing that drops blank lines at chunk edges."""
+    current: list[str] = []
+    current_size = 0
+    for unit, size in _line_units(lines, limit, metric):
+        if not current and unit == "":
+            continue
+        add_size = size + (metric.newline_size if current else 0)
+        if current and current_size + add_size > limit:
+            while current and not current[-1].strip():
+                current.pop()
+            if current:
+                yield "\n".join(current).rstrip()
+            current = []
+            current_size = 0
+            if unit == "":
+                continue
+            add_size = size
+        current.append(unit)
+        current_size += add_size
+    while current and not current[-1].strip():
+        current.pop()
+    if current:
+        yield "\n".join(current).rstrip()
+
+
+def iter_chunks(
+    text: str,
+    limit: int,
+    metric: SizeMetric = CHARS,
+    lines: list[ClassifiedLine] | None = None,
+) -> Iterator[str]:
+    """Yield chunks of at most limit (in metric units), keeping sections together.
+
+    Splits happen between section blocks, chosen by pack_blocks_balanced for
+    the fewest and most even chunks. A block that exceeds the limit on its
+    own is split at line boundaries. Text without detectable sections falls
+    back to line packing. Pass pre-classified lines to skip classification.
+    """
+    if not text or not text.strip():
+        return
+    limit = max(1, int(limit))
+    if metric.measure(text) <= limit:
+        yield text.strip()
+        return
+
+    classified = lines if lines is not None else classify_lines(text)
+    blocks = iter_blocks(classified)
+    first = next(blocks, None)
+    second = next(blocks, None)
+    emitted = False
+
+    if second is None:
+        for chunk in _pack_lines((line.text for line in classified), limit, metric):
+            emitted = True
+            yield chunk
+    else:
+        run: list[str] = []
+        run_sizes: list[int] = []
+        separator_size = 2 * metric.newline_size
+        for block in _chain_blocks(first, second, blocks):
+            block_text = "\n".join(line.text for line in block).strip()
+            if not block_text:
+                continue
+            size = metric.measure(block_text)
+            if size <= limit:
+                run.append(block_text)
+                run_sizes.append(size)
+                continue
+            for chunk in pack_blocks_balanced(run, limit, run_sizes, separator_size=separator_size):
+                emitted = True
+                yield chunk
+            run, run_sizes = [], []
+            for chunk in _pack_lines((line.text for line in block), limit, metric):
+                emitted = True
+                yield chunk
+        for chunk in pack_blocks_balanced(run, limit, run_sizes, separator_size=separator_size):
+            emitted = True
+            yield chunk
+
+    if not emitted:
+        for piece, _size in _wrap_to_metric(text.strip(), limit, metric):
+            yield piece
+
+
+def _chain_blocks(
+    first: list[ClassifiedLine] | None,
+    second: list[ClassifiedLine] | None,
+    rest: Iterator[list[ClassifiedLine]],
+) -> Iterator[list[ClassifiedLine]]:
+    if first is not None:
+        yield first
+    if second is not None:
+        yield second
+    yield from rest
@@ -0,0 +1,117 @@
+"""Write-behind layer for the shared Deadlock DB.
+
+All calls run on the single "db" executor thread in the order they reach
+it. submit() only schedules a task, so a run_db() awaited in the same step
+can reach the pool first; await the returned future when a later read
+depends on the write. KV writes whose value matches the last value read or
+written are skipped, related statements are grouped into one transaction
+(the DB module's own, else explicit BEGIN/COMMIT; check_transactions()
+fails at startup if neither works), and flush() waits for every submitted
+write (the client calls it on close).
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import patch_executors
+
+_MISSING = object()
+
+
+class DbWriter:
+    def __init__(self, db) -> None:
+        self._db = db
+        self._kv: dict[tuple[str, str], object] = {}
+        self._local = threading.local()
+        self._pending: set[asyncio.Future] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = {"kv_writes": 0, "kv_skipped": 0, "transactions": 0, "writes_submitted": 0}
+
+    def get_kv(self, namespace: str, key: str):
+        value = self._db.get_kv(namespace, key)
+        self._kv[(namespace, key)] = value
+        return value
+
+    def set_kv(self, namespace: str, key: str, value) -> bool:
+        """Write unless the value is unchanged; returns True if it was written."""
+        if self._kv.get((namespace, key), _MISSING) == value:
+            self.stats["kv_skipped"] += 1
+            return False
+        self._db.set_kv(namespace, key, value)
+        self._kv[(namespace, key)] = value
+        self.stats["kv_writes"] += 1
+        return True
+
+    def check_transactions(self) -> None:
+        """Raise if the DB can neither open a transaction itself nor take BEGIN/COMMIT."""
+        if callable(getattr(self._db, "transaction", None)):
+            return
+        try:
+            self._db.execute("BEGIN")
+            self._db.execute("COMMIT")
+        except Exception as exc:
+            # z.B. ein execute(), das nach jedem Statement selbst committet.
+            raise RuntimeError(f"Deadlock-DB unterstuetzt keine Transaktionen (BEGIN/COMMIT): {exc}") from exc
+
+    @contextmanager
+    def _explicit_transaction(self) -> Iterator[None]:
+        self._db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """One commit for the enclosed statements; nests flat. Use on the DB thread only."""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+        begin = getattr(self._db, "transaction", None)
+        self._local.depth = 1
+        try:
+            with begin() if callable(begin) else self._explicit_transaction():
+                yield
+            self.stats["transactions"] += 1
+        finally:
+            self._local.depth = 0
+
+    def submit(self, func: Callable, /, *args, **kwargs) -> asyncio.Future:
+        """Queue a write on the DB thread without waiting; await the result for completion."""
+        self._loop = asyncio.get_running_loop()
+        future = asyncio.ensure_future(patch_executors.run_db(func, *args, **kwargs))
+        self.stats["writes_submitted"] += 1
+        self._pending.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def submit_threadsafe(self, func: Callable, /, *args, **kwargs) -> None:
+        """submit() from a worker thread; once the loop is gone the write goes to the DB pool directly."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(lambda: self.submit(func, *args, **kwargs))
+                return
+            except RuntimeError:
+                pass
+        patch_executors.submit(patch_executors.DB, func, *args, **kwargs)
+
+    def _finished(self, future: asyncio.Future) -> None:
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"DB-Schreibvorgang fehlgeschlagen: {future.exception()}")
+
+    async def flush(self) -> None:
+        """Wait until every submitted write has finished."""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
@@ -0,0 +1,203 @@
+"""Structured view of one patch text: sections, hero/item groups and bullets.
+
+Documents are cached by text, so the raw patch and the translated output are
+each classified once and shared by splitting, repair, validation and
+chunking. Derived texts (e.g. header repair) are memoized on the document, and
+idempotent steps mark their output so running them again is a no-op.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable
+
+import hero_index
+import patch_chunking
+import perplexity_requests
+
+_BULLET_RE = re.compile(r"^(\s*)(?:[-*]|•)\s+(.+?)\s*$")
+_HEADER_TITLE_RE = re.compile(r"^(?:\*\*\[\s*(.+?)\s*\]\*\*|\[\s*(.+?)\s*\]|#{1,3}\s+(.+?)|\*\*(.+?)\*\*)\s*$")
+SECTION_KINDS = ("general", "items", "heroes")
+
+CACHE_SIZE = 64
+
+
+@dataclass(slots=True)
+class Bullet:
+    line: int
+    start: int
+    end: int
+    indent: str
+    hero: str | None
+    body: str
+    # Naechste Ueberschrift ueber dem Bullet (Abschnitt oder Gruppe), roh.
+    header: str | None
+
+
+@dataclass(slots=True)
+class Group:
+    title: str | None
+    hero: str | None
+    line: int
+    bullets: list[Bullet] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Section:
+    title: str | None
+    kind: str | None
+    line: int
+    groups: list[Group] = field(default_factory=list)
+
+    @property
+    def bullet_count(self) -> int:
+        return sum(len(group.bullets) for group in self.groups)
+
+
+def split_hero_prefix(body: str) -> tuple[str | None, str]:
+    prefix = hero_index.name_prefix(body, kinds=(hero_index.HERO,))
+    if prefix is None:
+        return None, body
+    return prefix[0].name, prefix[1]
+
+
+def _header_title(stripped: str) -> str:
+    match = _HEADER_TITLE_RE.match(stripped)
+    if not match:
+        return stripped
+    return next((group for group in match.groups() if group), stripped).strip()
+
+
+def _is_section_level(stripped: str, title: str) -> bool:
+    if stripped.startswith("#") or stripped.startswith("["):
+        return True
+    return stripped.startswith("**[") or title.casefold() in SECTION_KINDS
+
+
+class PatchDocument:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._derived: dict[str, str] = {}
+        # Transformationen, die auf diesem Text nachweislich nichts mehr aendern.
+        self._fixed: set[str] = set()
+
+    @cached_property
+    def _split(self) -> tuple[list[patch_chunking.ClassifiedLine], list[int]]:
+        lines: list[patch_chunking.ClassifiedLine] = []
+        offsets: list[int] = []
+        position = 0
+        for raw in self.text.splitlines(keepends=True):
+            offsets.append(position)
+            lines.append(patch_chunking.classify_line((raw.splitlines() or [""])[0]))
+            position += len(raw)
+        return lines, offsets
+
+    @property
+    def lines(self) -> list[patch_chunking.ClassifiedLine]:
+        return self._split[0]
+
+    @property
+    def offsets(self) -> list[int]:
+        """Character offset of every line start in text."""
+        return self._split[1]
+
+    @cached_property
+    def blocks(self) -> list[list[str]]:
+        return [[line.text for line in block] for block in patch_chunking.iter_blocks(self.lines)]
+
+    @cached_property
+    def sections(self) -> list[Section]:
+        sections = [Section(title=None, kind=None, line=0)]
+        header: str | None = None
+        for index, line in enumerate(self.lines):
+            if line.kind == patch_chunking.BLANK:
+                continue
+            stripped = line.text.strip()
+            if line.kind == patch_chunking.HEADER:
+                title = _header_title(stripped)
+                header = stripped
+                if _is_section_level(stripped, title):
+                    kind = title.casefold() if title.casefold() in SECTION_KINDS else None
+                    sections.append(Section(title=title, kind=kind, line=index))
+                else:
+                    hero = perplexity_requests.canonical_hero_name(title)
+                    sections[-1].groups.append(Group(title=title, hero=hero, line=index))
+                continue
+
+            match = _BULLET_RE.match(line.text)
+            if not match:
+                continue
+            hero, body = split_hero_prefix(match.group(2))
+            groups = sections[-1].groups
+            if hero is not None and (not groups or groups[-1].hero != hero):
+                groups.append(Group(title=None, hero=hero, line=index))
+            elif hero is None and (not groups or (groups[-1].title is None and groups[-1].hero is not None)):
+                # Bullet ohne Helden-Praefix nach einer "- Hero: ..."-Gruppe gehoert nicht mehr dazu.
+                groups.append(Group(title=None, hero=None, line=index))
+            start = self.offsets[index]
+            groups[-1].bullets.append(
+                Bullet(
+                    line=index,
+                    start=start,
+                    end=start + len(line.text),
+                    indent=match.group(1),
+                    hero=hero,
+                    body=body,
+                    header=header,
+                )
+            )
+        if not sections[0].groups:
+            sections.pop(0)
+        return sections
+
+    @property
+    def bullets(self) -> list[Bullet]:
+        return [bullet for section in self.sections for group in section.groups for bullet in group.bullets]
+
+    def derive(
+        self,
+        name: str,
+        transform: Callable[[str], str],
+    ) -> str:
+        """Apply an idempotent text transform once per document.
+
+        The output document is marked as already transformed, so the same
+        step on the result is skipped.
+        """
+        if name in self._fixed:
+            return self.text
+        if name not in self._derived:
+            result = transform(self.text)
+            self._derived[name] = result
+            output = parse(result)
+            output._fixed.add(name)
+        return self._derived[name]
+
+
+_documents: OrderedDict[str, PatchDocument] = OrderedDict()
+# parse() laeuft auch in den Executor-Threads (Cleanup/Chunking fuer Discord).
+_documents_lock = threading.Lock()
+# hero_index.version() beim Fuellen des Caches; Gruppen/Bullets haengen von der Item-Liste ab.
+_documents_version = -1
+
+
+def parse(text: str | None) -> PatchDocument:
+    """Cached document for text; lines and the section tree are built lazily."""
+    global _documents_version
+    text = text or ""
+    with _documents_lock:
+        if _documents_version != hero_index.version():
+            _documents.clear()
+            _documents_version = hero_index.version()
+        document = _documents.get(text)
+        if document is not None:
+            _documents.move_to_end(text)
+            return document
+        document = PatchDocument(text)
+        _documents[text] = document
+        while len(_documents) > CACHE_SIZE:
+            _documents.popitem(last=False)
+        return document
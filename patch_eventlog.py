@@ -0,0 +1,98 @@
+"""Structured JSON-lines event log with a background writer.
+
+_timing_log hands each event to a queue; a listener thread formats it (UTC
+timestamp, correlation id, fields) and writes it to a size-rotated file, so
+the event loop never formats timestamps or touches the disk for logging.
+Every line is one JSON object with the stable keys ts, event and cid.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import queue
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Iterator
+
+# Per Patch gesetzt; asyncio.to_thread und neue Tasks erben den Wert.
+correlation_id: ContextVar[str | None] = ContextVar("patch_correlation_id", default=None)
+
+_logger = logging.getLogger("patchnotes.events")
+_logger.propagate = False
+_listener: QueueListener | None = None
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "event": record.msg,
+            "cid": getattr(record, "cid", None),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _RawQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatieren passiert erst im Listener-Thread.
+        return record
+
+
+def patch_correlation_id(url: str) -> str:
+    """Stable short id for one patch, identical across retries and restarts."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+
+
+@contextmanager
+def correlate(url: str) -> Iterator[str]:
+    cid = patch_correlation_id(url)
+    token = correlation_id.set(cid)
+    try:
+        yield cid
+    finally:
+        correlation_id.reset(token)
+
+
+def enabled() -> bool:
+    return _listener is not None
+
+
+def start(path: str, *, max_bytes: int, backups: int) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    file_handler.setFormatter(_JsonFormatter())
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _logger.addHandler(_RawQueueHandler(records))
+    _logger.setLevel(logging.INFO)
+    _listener = QueueListener(records, file_handler)
+    _listener.start()
+
+
+def stop() -> None:
+    """Flush queued events and close the file."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in list(_listener.handlers):
+        handler.close()
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+    _listener = None
+
+
+def emit(event: str, fields: dict) -> None:
+    if _listener is None:
+        return
+    _logger.info(
+        event,
+        extra={"cid": correlation_id.get(), "fields": {key: value for key, value in fields.items() if value is not None}},
+    )
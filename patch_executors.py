@@ -0,0 +1,188 @@
+"""Named, bounded executors per workload class.
+
+Each class of blocking work gets its own pool, so slow translation reads
+cannot starve the detector or the DB:
+
+  poll       source polling (check_latest)
+  parse      patch page downloads
+  translate  Perplexity requests incl. their retry sleeps
+  db         Deadlock-DB calls; one worker keeps their order
+  cpu        text cleanup and chunking for Discord
+  html       BeautifulSoup parsing of downloaded pages
+  io         local file writes (output files, profile reports)
+
+Thread pools carry the caller's contextvars (correlation id, trace) like
+asyncio.to_thread. A pool can instead be a process pool (meant for html,
+to get around the GIL); those take picklable module-level functions only
+and start their workers via forkserver, since forking a process that
+already runs the loop, pools and log threads can inherit held locks.
+Every pool reports queue depth, wait and run time to patch_metrics and its
+calls show up as trace spans.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable
+
+import patch_metrics
+import patch_tracing
+
+POLL = "poll"
+PARSE = "parse"
+TRANSLATE = "translate"
+DB = "db"
+CPU = "cpu"
+HTML = "html"
+IO = "io"
+
+_DEFAULT_WORKERS = {POLL: 2, PARSE: 2, TRANSLATE: 4, DB: 1, CPU: 2, HTML: 2, IO: 1}
+
+
+@dataclass
+class _Pool:
+    name: str
+    workers: int
+    processes: bool = False
+    executor: Executor | None = None
+    queued: int = 0
+    running: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self) -> Executor:
+        if self.executor is None:
+            if self.processes:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"patch-{self.name}")
+        return self.executor
+
+    def _publish(self) -> None:
+        labels = (("executor", self.name),)
+        patch_metrics.registry.set_gauge("patchnotes_executor_queue_depth", self.queued, labels)
+        patch_metrics.registry.set_gauge("patchnotes_executor_running", self.running, labels)
+
+    def submitted(self) -> None:
+        with self.lock:
+            self.queued += 1
+            self._publish()
+
+    def started(self, waited: float) -> None:
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+            self._publish()
+        patch_metrics.registry.observe("patchnotes_executor_wait_seconds", waited, (("executor", self.name),))
+
+    def abandoned(self) -> None:
+        # Abgebrochen, bevor ein Worker frei war (z.B. verlorene Hedge-Anfrage).
+        with self.lock:
+            self.queued -= 1
+            self._publish()
+
+    def finished(self, ran: float) -> None:
+        with self.lock:
+            self.running -= 1
+            self._publish()
+        patch_metrics.registry.observe("patchnotes_executor_run_seconds", ran, (("executor", self.name),))
+
+
+_pools: dict[str, _Pool] = {name: _Pool(name, workers) for name, workers in _DEFAULT_WORKERS.items()}
+# Von patch_profiling gesetzt, solange ein Profil laeuft: umschliesst jeden Aufruf in Thread-Pools.
+_call_wrapper: Callable[[Callable[[], object]], object] | None = None
+
+
+def set_call_wrapper(wrapper: Callable[[Callable[[], object]], object] | None) -> None:
+    global _call_wrapper
+    _call_wrapper = wrapper
+
+
+def configure(name: str, workers: int, *, processes: bool = False) -> None:
+    """Resize or switch a pool; only before its first use."""
+    pool = _pools[name]
+    if pool.executor is not None:
+        raise RuntimeError(f"Executor {name} laeuft bereits")
+    pool.workers = max(1, workers)
+    pool.processes = processes
+
+
+def _call(pool: _Pool, span_name: str, submitted: float, func: Callable, args: tuple, kwargs: dict):
+    started = perf_counter()
+    pool.started(started - submitted)
+    patch_tracing.record(f"{span_name}.queued", submitted, started)
+    try:
+        with patch_tracing.span(span_name):
+            wrapper = _call_wrapper
+            if wrapper is not None:
+                return wrapper(functools.partial(func, *args, **kwargs))
+            return func(*args, **kwargs)
+    finally:
+        pool.finished(perf_counter() - started)
+
+
+async def run(name: str, func: Callable, /, *args, **kwargs):
+    pool = _pools[name]
+    loop = asyncio.get_running_loop()
+    span_name = f"{name}.{getattr(func, '__name__', 'call')}"
+    submitted = perf_counter()
+    pool.submitted()
+
+    if pool.processes:
+        # Start im Prozess ist von hier nicht sichtbar: Wartezeit = 0, Laufzeit inkl. Queue.
+        pool.started(0.0)
+        try:
+            with patch_tracing.span(span_name, processes=True):
+                return await loop.run_in_executor(pool.get(), functools.partial(func, *args, **kwargs))
+        finally:
+            pool.finished(perf_counter() - submitted)
+
+    future = pool.get().submit(contextvars.copy_context().run, _call, pool, span_name, submitted, func, args, kwargs)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        if future.cancelled():
+            pool.abandoned()
+
+
+def submit(name: str, func: Callable, /, *args, **kwargs) -> Future:
+    """Fire-and-forget from any thread, e.g. a worker that finishes after its caller gave up."""
+    pool = _pools[name]
+    span_name = f"{name}.{getattr(func, '__name__', 'call')}"
+    submitted = perf_counter()
+    pool.submitted()
+    future = pool.get().submit(contextvars.copy_context().run, _call, pool, span_name, submitted, func, args, kwargs)
+    future.add_done_callback(_report_failure)
+    return future
+
+
+def _report_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Executor-Aufgabe fehlgeschlagen: {future.exception()}")
+
+
+async def run_db(func: Callable, /, *args, **kwargs):
+    return await run(DB, func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, /, *args, **kwargs):
+    return await run(CPU, func, *args, **kwargs)
+
+
+async def run_io(func: Callable, /, *args, **kwargs):
+    return await run(IO, func, *args, **kwargs)
+
+
+def shutdown() -> None:
+    # DB zuletzt: auslaufende Worker anderer Pools reichen dort noch Schreibvorgaenge ein.
+    for pool in sorted(_pools.values(), key=lambda pool: pool.name == DB):
+        if pool.executor is not None:
+            pool.executor.shutdown(wait=True)
+            pool.executor = None
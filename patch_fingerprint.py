@@ -0,0 +1,104 @@
+"""MinHash fingerprints of patch texts for near-duplicate checks.
+
+Features are word 3-shingles of the normalized bullet lines (or all content
+lines if the text has no bullets), so formatting, link and whitespace
+differences between sources do not matter. One-permutation MinHash keeps
+the smallest hash per bucket; the share of equal buckets estimates the
+Jaccard similarity of two texts in constant time. Fingerprints are stored
+per row as "<features>:<hex buckets>".
+
+A 64-bit SimHash was tried first, but large patches share so much
+vocabulary that distinct patches landed as close as copies with a few
+edited lines.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+import patch_chunking
+import patch_document
+
+BUCKETS = 128
+SHINGLE = 3
+# Geschaetzte Jaccard-Aehnlichkeit, ab der zwei Texte als derselbe Patch gelten.
+# Ein Patch mit ~10 von 67 ersetzten Bullets liegt noch darueber, ein anderer Patch
+# mit denselben Helden/Items bei ~0.1 (siehe tests/test_patch_fingerprint.py).
+THRESHOLD = 0.7
+# Kurze Texte (z.B. einzelne Forenkommentare) sind zu unscharf fuer den Vergleich.
+MIN_FEATURES = 40
+
+_EMPTY = 0xFFFFFFFF
+_WORD_RE = re.compile(r"\w+")
+_LINK_RE = re.compile(r"https?://\S+")
+
+
+@dataclass(frozen=True, slots=True)
+class Fingerprint:
+    buckets: tuple[int, ...]
+    features: int
+
+    def encode(self) -> str:
+        return f"{self.features}:" + "".join(f"{value:08x}" for value in self.buckets)
+
+    def similarity(self, other: Fingerprint) -> float:
+        used = equal = 0
+        for mine, theirs in zip(self.buckets, other.buckets):
+            if mine == _EMPTY and theirs == _EMPTY:
+                continue
+            used += 1
+            equal += mine == theirs
+        return equal / used if used else 0.0
+
+
+def decode(encoded: str | None) -> Fingerprint | None:
+    if not encoded:
+        return None
+    features, _, digits = encoded.partition(":")
+    if len(digits) != BUCKETS * 8:
+        return None
+    try:
+        buckets = tuple(int(digits[index : index + 8], 16) for index in range(0, len(digits), 8))
+        return Fingerprint(buckets, int(features))
+    except ValueError:
+        return None
+
+
+def _feature_lines(text: str) -> list[str]:
+    document = patch_document.parse(text)
+    if document.bullets:
+        return [f"{bullet.hero or ''} {bullet.body}" for bullet in document.bullets]
+    return [line.text for line in document.lines if line.kind == patch_chunking.TEXT]
+
+
+def _shingles(text: str) -> set[str]:
+    shingles: set[str] = set()
+    for line in _feature_lines(text):
+        words = _WORD_RE.findall(_LINK_RE.sub(" ", line).lower())
+        if len(words) < SHINGLE:
+            if words:
+                shingles.add(" ".join(words))
+            continue
+        shingles.update(" ".join(words[index : index + SHINGLE]) for index in range(len(words) - SHINGLE + 1))
+    return shingles
+
+
+def fingerprint(text: str | None) -> Fingerprint:
+    buckets = [_EMPTY] * BUCKETS
+    shingles = _shingles(text or "")
+    for shingle in shingles:
+        hashed = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        bucket = hashed % BUCKETS
+        value = min(hashed >> 32, _EMPTY - 1)
+        if value < buckets[bucket]:
+            buckets[bucket] = value
+    return Fingerprint(tuple(buckets), len(shingles))
+
+
+def is_near_duplicate(first: Fingerprint | None, second: Fingerprint | None) -> bool:
+    if first is None or second is None:
+        return False
+    if min(first.features, second.features) < MIN_FEATURES:
+        return False
+    return first.similarity(second) >= THRESHOLD
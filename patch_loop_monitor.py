@@ -0,0 +1,86 @@
+"""Event-loop lag monitor.
+
+A heartbeat task stamps the time on every loop turn; a watchdog thread
+checks the stamp and, when the loop has not come back for longer than the
+threshold, captures the loop thread's current stack. Each stall is
+reported once when it ends, with its duration and the stack seen while
+the loop was blocked. Further listeners (e.g. a running profile) can
+subscribe to the same reports.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import traceback
+from time import perf_counter
+from typing import Callable
+
+Reporter = Callable[[float, str], None]
+
+
+class LoopMonitor:
+    def __init__(self, threshold_s: float, report: Reporter) -> None:
+        self.threshold_s = threshold_s
+        self._report = report
+        self._listeners: list[Reporter] = []
+        self._beat = perf_counter()
+        self._loop_thread_id: int | None = None
+        self._stack: str | None = None
+        self._stop = threading.Event()
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self.stalls = 0
+        self.worst_s = 0.0
+
+    async def _heartbeat(self) -> None:
+        interval = self.threshold_s / 4
+        while True:
+            self._beat = perf_counter()
+            await asyncio.sleep(interval)
+
+    def _watch(self) -> None:
+        interval = self.threshold_s / 2
+        stalled_since: float | None = None
+        while not self._stop.wait(interval):
+            beat = self._beat
+            lag = perf_counter() - beat
+            if lag >= self.threshold_s:
+                if stalled_since != beat:
+                    # Neuer Stall: Stack jetzt sichern, solange die Loop noch blockiert ist.
+                    stalled_since = beat
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    self._stack = "".join(traceback.format_stack(frame)) if frame else ""
+                continue
+            if stalled_since is not None:
+                duration = beat - stalled_since
+                stalled_since = None
+                self.stalls += 1
+                self.worst_s = max(self.worst_s, duration)
+                for report in (self._report, *self._listeners):
+                    try:
+                        report(duration, self._stack or "")
+                    except Exception:
+                        pass
+
+    def add_listener(self, listener: Reporter) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Reporter) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,168 @@
+"""Single-pass cleanup of model output.
+
+Fuses code-fence stripping, citation and link removal, whitespace cleanup,
+role-ping removal, header repair and heading injection. Lines are processed
+once and the result records what was changed. bench_normalizer.py checks it
+against the step-by-step chain on stored patches.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+import patch_chunking
+
+CITATION_RE = re.compile(r"\[(?:\d+(?:,\s*\d+)*)\]")
+MASKED_LINK_RE = re.compile(r"\[([^\]\n]+)\]\((?:https?://[^)\s]+)\)")
+ANGLE_URL_RE = re.compile(r"<https?://[^>\s]+>")
+RAW_URL_RE = re.compile(r"(?<!\()https?://[^\s)>]+")
+_EMPTY_PARENS_RE = re.compile(r"\(\s*\)")
+_SPACE_RUN_RE = re.compile(r"[ \t]{2,}")
+_PARTIAL_HEADING_RE = re.compile(r"(?i)###\s*deadlock patch notes")
+_SEPARATOR_RE = re.compile(r"_{3,}\s*")
+_SUMMARY_RE = re.compile(r"(?i)\*\*kurzzusammenfassung\*\*")
+
+
+@dataclass
+class NormalizeResult:
+    text: str
+    changes: dict[str, int] = field(default_factory=dict)
+
+
+def _strip_fences(text: str, changes: dict[str, int]) -> str:
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        changes["fences"] += 1
+        stripped = stripped[3:]
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+    if stripped.endswith("```"):
+        changes["fences"] += 1
+        stripped = stripped[:-3].rstrip()
+    return stripped
+
+
+def inject_heading(text: str, heading: str) -> str:
+    stripped = text.lstrip()
+    lines = stripped.splitlines()
+    if not lines:
+        return heading
+    if lines[0].strip().lower().startswith("### deadlock patch notes"):
+        rest = "\n".join(lines[1:]).lstrip("\n")
+        return heading + ("\n" + rest if rest else "")
+    return heading + "\n" + stripped
+
+
+def _count_repaired_headers(before: str, after: str) -> int:
+    if before == after:
+        return 0
+    known = {line.strip() for line in before.split("\n")}
+    return sum(
+        1 for line in after.split("\n") if patch_chunking.is_section_header(line) and line.strip() not in known
+    )
+
+
+def normalize(
+    text: str,
+    *,
+    strip_fences: bool = False,
+    role_ping: str | None = None,
+    partial: bool = False,
+    repair: Callable[[str], str] | None = None,
+    heading: str | None = None,
+) -> NormalizeResult:
+    """Clean model output in one pass over its lines.
+
+    Matches the step-by-step chain in bench_normalizer.py (fences, citations,
+    links, role ping, repair, heading); partial=True adds the extra cuts of
+    the split-translation cleanup (repeated heading, '___' separator,
+    Kurzzusammenfassung).
+    """
+    changes = {
+        "fences": 0,
+        "citations": 0,
+        "links": 0,
+        "role_ping_lines": 0,
+        "blank_lines_collapsed": 0,
+        "truncated_lines": 0,
+        "headers_repaired": 0,
+    }
+    if not text:
+        return NormalizeResult(text, changes)
+    if strip_fences:
+        text = _strip_fences(text, changes)
+
+    output: list[str] = []
+    previous_blank = False
+    source = text.split("\n")
+    for index, line in enumerate(source):
+        # Billige Vorpruefungen, damit die meisten Zeilen ohne Regex durchlaufen.
+        if "[" in line:
+            line, count = CITATION_RE.subn("", line)
+            changes["citations"] += count
+            line, count = MASKED_LINK_RE.subn(r"\1", line)
+            changes["links"] += count
+        if "http" in line:
+            line, count = ANGLE_URL_RE.subn("", line)
+            changes["links"] += count
+            line, count = RAW_URL_RE.subn("", line)
+            changes["links"] += count
+        if "(" in line:
+            line = _EMPTY_PARENS_RE.sub("", line)
+        if "  " in line or "\t" in line:
+            line = _SPACE_RUN_RE.sub(" ", line)
+        line = line.rstrip(" \t")
+        if not output:
+            # Entspricht dem strip() nach jedem Schritt der alten Kette.
+            line = line.lstrip()
+            if not line:
+                continue
+
+        if not partial:
+            # Leerzeilen werden vor dem Entfernen des Pings zusammengefasst.
+            if not line:
+                if previous_blank:
+                    changes["blank_lines_collapsed"] += 1
+                    continue
+                previous_blank = True
+                output.append(line)
+                continue
+            previous_blank = False
+
+        if not role_ping:
+            pieces = [line]
+        else:
+            # _strip_role_ping trennt mit splitlines(), also auch an \r und Co.
+            pieces = line.splitlines() or [""]
+        for piece in pieces:
+            if role_ping and role_ping in piece:
+                changes["role_ping_lines"] += 1
+                continue
+            if not partial:
+                output.append(piece)
+                continue
+            if _SEPARATOR_RE.fullmatch(piece) or _SUMMARY_RE.match(piece):
+                changes["truncated_lines"] += len(source) - index
+                break
+            if _PARTIAL_HEADING_RE.match(piece):
+                piece = ""
+            if not piece:
+                if previous_blank:
+                    changes["blank_lines_collapsed"] += 1
+                    continue
+                previous_blank = True
+            else:
+                previous_blank = False
+            output.append(piece)
+        else:
+            continue
+        break
+
+    cleaned = "\n".join(output).strip()
+    if repair is not None and cleaned:
+        repaired = repair(cleaned)
+        changes["headers_repaired"] = _count_repaired_headers(cleaned, repaired)
+        cleaned = repaired
+    if heading and cleaned:
+        cleaned = inject_heading(cleaned, heading)
+    return NormalizeResult(cleaned, changes)
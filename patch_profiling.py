@@ -0,0 +1,229 @@
+"""On-demand CPU/memory profiling of single patch runs.
+
+Profiling is armed (env flag or !tprofile) and then applies to the next
+update_patch/retranslate run only, so leaving it armed costs nothing until
+a patch arrives. A profiled run records cProfile stats of the event-loop
+thread and of every thread-pool call (process pools are not covered), a
+tracemalloc diff between start and end, and the loop stalls the shared
+LoopMonitor reported meanwhile. Snapshots and reports are taken off the
+loop; reports go to timestamped files in the profile dir.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import AsyncIterator
+
+import patch_executors
+import patch_loop_monitor
+
+OFF = "off"
+NEXT = "next"
+ALWAYS = "always"
+
+_profile_dir = Path("profiles")
+_mode = OFF
+_armed = 0
+_active = False
+_monitor: patch_loop_monitor.LoopMonitor | None = None
+_TOP_FUNCTIONS = 40
+_TOP_ALLOCATIONS = 25
+
+
+@dataclass
+class _Stalls:
+    count: int = 0
+    worst_s: float = 0.0
+    samples: list[tuple[float, float, str]] = field(default_factory=list)
+    started: float = field(default_factory=perf_counter)
+
+    def add(self, duration: float, stack: str) -> None:
+        # Aufruf aus dem Watchdog-Thread des LoopMonitors, nach Ende des Stalls.
+        self.count += 1
+        self.worst_s = max(self.worst_s, duration)
+        if len(self.samples) < 50:
+            frames = [line.strip() for line in stack.splitlines() if line.strip()]
+            offset = perf_counter() - duration - self.started
+            self.samples.append((offset, duration, frames[-2] if len(frames) >= 2 else ""))
+
+
+def configure(mode: str, directory: str) -> None:
+    global _mode, _profile_dir, _armed
+    _mode = mode if mode in (NEXT, ALWAYS) else OFF
+    _profile_dir = Path(directory)
+    _armed = 1 if _mode == NEXT else 0
+
+
+def use_monitor(monitor: patch_loop_monitor.LoopMonitor | None) -> None:
+    """Take loop stalls from this monitor instead of running a second heartbeat."""
+    global _monitor
+    _monitor = monitor
+
+
+def arm(count: int = 1) -> None:
+    global _armed
+    _armed = max(0, count)
+
+
+def status() -> str:
+    if _mode == ALWAYS:
+        return "immer aktiv"
+    if _active:
+        return "laeuft gerade"
+    return f"scharf fuer {_armed} Lauf/Laeufe" if _armed else "aus"
+
+
+def _take_slot() -> bool:
+    global _armed
+    if _active:
+        return False
+    if _mode == ALWAYS:
+        return True
+    if _armed > 0:
+        _armed -= 1
+        return True
+    return False
+
+
+class _WorkerProfiles:
+    """cProfile per thread-pool call, installed via patch_executors.set_call_wrapper."""
+
+    def __init__(self) -> None:
+        self.profiles: list[cProfile.Profile] = []
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, call):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Ab Python 3.12 ist nur ein Profiler gleichzeitig erlaubt; der Loop-Profiler sieht dann alle Threads.
+            with self._lock:
+                self.skipped += 1
+            return call()
+        try:
+            return call()
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.profiles.append(profiler)
+
+
+def _start_tracemalloc() -> tuple[bool, tracemalloc.Snapshot]:
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    return started, tracemalloc.take_snapshot()
+
+
+def _stop_tracemalloc(started: bool) -> tracemalloc.Snapshot:
+    snapshot = tracemalloc.take_snapshot()
+    if started:
+        tracemalloc.stop()
+    return snapshot
+
+
+def _write_report(
+    base: Path,
+    label: str,
+    duration: float,
+    profiler: cProfile.Profile,
+    workers: _WorkerProfiles,
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    stalls: _Stalls,
+    stall_threshold_s: float | None,
+) -> Path:
+    base.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(base.with_suffix(".prof"))
+
+    lines = [f"{label}: {duration:.2f}s", ""]
+    if stall_threshold_s is None:
+        lines.append("Loop-Stalls: nicht gemessen (Loop-Monitor aus)")
+    else:
+        lines.append(
+            f"Loop-Stalls >= {stall_threshold_s * 1000:.0f} ms: {stalls.count}, max {stalls.worst_s * 1000:.0f} ms"
+        )
+        lines.extend(f"  t+{offset:.2f}s: {lag * 1000:.0f} ms  {frame}" for offset, lag, frame in stalls.samples)
+
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    if workers.profiles:
+        stats.add(*workers.profiles)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_TOP_FUNCTIONS)
+    title = f"CPU (cProfile, Event-Loop-Thread + {len(workers.profiles)} Pool-Aufrufe, kumulativ):"
+    if workers.skipped:
+        title += f" {workers.skipped} Pool-Aufrufe ueber den Loop-Profiler erfasst."
+    lines.extend(["", title, buffer.getvalue()])
+
+    diff = after.compare_to(before, "lineno")
+    current = sum(stat.size for stat in after.statistics("filename"))
+    lines.append(f"Speicher (tracemalloc): {current / 1024:.0f} KiB belegt am Ende")
+    lines.extend(f"  {stat}" for stat in diff[:_TOP_ALLOCATIONS])
+
+    report = base.with_suffix(".txt")
+    report.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return report
+
+
+@asynccontextmanager
+async def profile(label: str) -> AsyncIterator[None]:
+    """Profile the wrapped run if profiling is armed; otherwise a no-op."""
+    global _active
+    if not _take_slot():
+        yield
+        return
+
+    _active = True
+    # Snapshots koennen nach einem grossen Patch gross sein -> nicht auf der Event-Loop.
+    started_tracing, before = await patch_executors.run_io(_start_tracemalloc)
+    stalls = _Stalls()
+    start = stalls.started
+    monitor = _monitor
+    if monitor is not None:
+        monitor.add_listener(stalls.add)
+    # cProfile misst den Event-Loop-Thread (also auch parallel laufende Tasks) und jeden Pool-Aufruf.
+    workers = _WorkerProfiles()
+    patch_executors.set_call_wrapper(workers)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        patch_executors.set_call_wrapper(None)
+        if monitor is not None:
+            monitor.remove_listener(stalls.add)
+        duration = perf_counter() - start
+        try:
+            after = await patch_executors.run_io(_stop_tracemalloc, started_tracing)
+        finally:
+            _active = False
+        safe_label = re.sub(r"[^\w.-]+", "_", label)[:80]
+        base = _profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_label}"
+        try:
+            report = await patch_executors.run_io(
+                _write_report,
+                base,
+                label,
+                duration,
+                profiler,
+                workers,
+                before,
+                after,
+                stalls,
+                monitor.threshold_s if monitor is not None else None,
+            )
+            print(f"Profil gespeichert: {report}")
+        except Exception as exc:
+            print(f"Profil konnte nicht gespeichert werden ({base}): {exc}")
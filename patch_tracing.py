@@ -0,0 +1,144 @@
+"""Per-patch trace spans exported in the Chrome trace event format.
+
+trace(url) opens a trace for one patch; span()/traced() add nested spans
+for stages and sub-calls. The active trace lives in a ContextVar, so spans
+inside asyncio.to_thread workers and child tasks land in the same trace.
+When the patch finishes, its events are written as one JSON file that
+chrome://tracing, Perfetto or speedscope can open.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterator
+
+import patch_eventlog
+
+_EPOCH = perf_counter()
+_trace_dir: Path | None = None
+
+
+@dataclass(slots=True)
+class _Trace:
+    trace_id: str
+    url: str
+    events: list[dict] = field(default_factory=list)
+    threads: dict[int, str] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, name: str, start: float, end: float, args: dict) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "ph": "X",
+            "pid": 1,
+            "tid": thread.ident,
+            "ts": round((start - _EPOCH) * 1_000_000, 1),
+            "dur": round(max(0.0, end - start) * 1_000_000, 1),
+            "args": {key: value for key, value in args.items() if value is not None},
+        }
+        with self.lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+
+
+_current_trace: ContextVar[_Trace | None] = ContextVar("patch_trace", default=None)
+_current_span: ContextVar[str | None] = ContextVar("patch_trace_span", default=None)
+
+
+def configure(directory: str | None) -> None:
+    global _trace_dir
+    _trace_dir = Path(directory) if directory else None
+
+
+def enabled() -> bool:
+    return _trace_dir is not None
+
+
+def _write(path: Path, trace: _Trace) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with trace.lock:
+            events = list(trace.events)
+            threads = dict(trace.threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": trace.url}})
+        payload = {"traceEvents": metadata + events, "otherData": {"trace_id": trace.trace_id, "url": trace.url}}
+        path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+    except Exception as exc:
+        print(f"Trace konnte nicht geschrieben werden ({path}): {exc}")
+
+
+@contextmanager
+def trace(url: str) -> Iterator[None]:
+    """Root span for one patch; nested calls for a patch already traced are no-ops."""
+    if _trace_dir is None or _current_trace.get() is not None:
+        yield
+        return
+    current = _Trace(trace_id=patch_eventlog.patch_correlation_id(url), url=url)
+    token = _current_trace.set(current)
+    try:
+        with span("patch", url=url):
+            yield
+    finally:
+        _current_trace.reset(token)
+        path = _trace_dir / f"{time.strftime('%Y%m%d-%H%M%S')}_{current.trace_id}.json"
+        # Schreiben im Hintergrund, der Event-Loop wartet nicht auf die Platte.
+        threading.Thread(target=_write, args=(path, current), name="trace-writer", daemon=True).start()
+
+
+@contextmanager
+def span(name: str, **args) -> Iterator[None]:
+    current = _current_trace.get()
+    if current is None:
+        yield
+        return
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        current.add(name, start, perf_counter(), {"trace_id": current.trace_id, "parent": parent, **args})
+
+
+def record(name: str, start: float, end: float, **args) -> None:
+    """Add an already-measured interval (perf_counter values), e.g. queue wait."""
+    current = _current_trace.get()
+    if current is not None:
+        current.add(name, start, end, {"trace_id": current.trace_id, "parent": _current_span.get(), **args})
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run the (sync or async) function inside span(name)."""
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
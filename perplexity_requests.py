@@ -2,17 +2,23 @@ import json
 import os
 import re
 import time
+from functools import lru_cache
 
 import dotenv
 import requests
 from requests import exceptions as req_exc
 
+import hero_index
+
 dotenv.load_dotenv()
 
 api_key = os.getenv("PERPLEXITY_API_KEY")
 ROLE_PING = "<@&1330994309524357140>"
 MODEL = os.getenv("PERPLEXITY_MODEL", "sonar-pro")
 DEFAULT_MAX_TOKENS = int(os.getenv("PERPLEXITY_MAX_TOKENS", "4000"))
+# Optionale Preise (USD pro 1M Tokens), falls die API keinen cost-Block liefert.
+PRICE_INPUT_PER_MTOK = float(os.getenv("PERPLEXITY_PRICE_INPUT_PER_MTOK", "0") or 0)
+PRICE_OUTPUT_PER_MTOK = float(os.getenv("PERPLEXITY_PRICE_OUTPUT_PER_MTOK", "0") or 0)
 
 url = "https://api.perplexity.ai/chat/completions"
 
@@ -79,6 +85,7 @@ DISCORD_MARKDOWN_FORMATTING = """
 """
 
 
+@lru_cache(maxsize=4096)
 def _normalize_hero_name(name: str) -> str:
     normalized = (name or "").casefold()
     normalized = normalized.replace("&", " and ")
@@ -93,6 +100,10 @@ _CANONICAL_HERO_NAME_BY_KEY = {
 }
 
 
+def hero_name_aliases() -> dict[str, str]:
+    return dict(_HERO_NAME_ALIASES)
+
+
 def is_known_hero_name(name: str) -> bool:
     return _normalize_hero_name(name) in _KNOWN_HERO_NAME_KEYS
 
@@ -105,48 +116,38 @@ def _format_section_header(section_kind: str) -> str:
     return f"## {section_kind.title()}"
 
 
-def _extract_section_kind(line: str) -> str | None:
-    match = _SECTION_HEADER_RE.match((line or "").strip())
-    if not match:
-        return None
-    raw = next((group for group in match.groups() if group), "").strip().casefold()
-    if raw == "heroes":
-        return "heroes"
-    if raw == "items":
-        return "items"
-    if raw == "general":
-        return "general"
-    return None
+_SECTION_KINDS = {"heroes": "heroes", "items": "items", "general": "general"}
 
 
-def _extract_bold_subheader(line: str) -> str | None:
+def _classify_header_line(line: str) -> tuple[str | None, str | None]:
+    """(section_kind, bold_subheader) of one line; at most one of both is set."""
     stripped = (line or "").strip()
-    if not stripped:
-        return None
-    if _extract_section_kind(stripped):
-        return None
+    if not stripped or stripped[0] not in "*[#":
+        return None, None
+    match = _SECTION_HEADER_RE.match(stripped)
+    if match:
+        raw = next((group for group in match.groups() if group), "").strip().casefold()
+        kind = _SECTION_KINDS.get(raw)
+        if kind is not None:
+            return kind, None
     match = _BOLD_SUBHEADER_RE.match(stripped)
-    if not match:
-        return None
-    return match.group(1).strip()
+    return None, (match.group(1).strip() if match else None)
 
 
-def _collect_section_block(lines: list[str], start: int) -> tuple[list[str], int]:
-    first_line = lines[start]
-    heading = _extract_bold_subheader(first_line)
-    block = [first_line]
-    index = start + 1
+def _extract_section_kind(line: str) -> str | None:
+    return _classify_header_line(line)[0]
 
-    if heading is None:
-        return block, index
 
-    while index < len(lines):
-        line = lines[index]
-        if _extract_section_kind(line) is not None or _extract_bold_subheader(line) is not None:
-            break
-        block.append(line)
-        index += 1
-    return block, index
+def _extract_bold_subheader(line: str) -> str | None:
+    return _classify_header_line(line)[1]
+
+
+def _indexed_hero_heading(heading: str) -> str | None:
+    """Hero named by a decorated header such as 'Lady Geist:' that the exact lookup misses."""
+    match = hero_index.heading_name(heading)
+    if match is None or match.kind != hero_index.HERO:
+        return None
+    return match.name
 
 
 def repair_known_hero_sections(text: str) -> str:
@@ -157,6 +158,15 @@ def repair_known_hero_sections(text: str) -> str:
     if not lines:
         return text
 
+    # Jede Zeile genau einmal klassifizieren; block_end[i] ist die naechste Kopfzeile nach i.
+    classified = [_classify_header_line(line) for line in lines]
+    block_end = [len(lines)] * len(lines)
+    following = len(lines)
+    for position in range(len(lines) - 1, -1, -1):
+        block_end[position] = following
+        if classified[position] != (None, None):
+            following = position
+
     output: list[str] = []
     current_section_kind: str | None = None
     active_section_kind: str | None = None
@@ -166,7 +176,7 @@ def repair_known_hero_sections(text: str) -> str:
 
     while index < len(lines):
         line = lines[index]
-        section_kind = _extract_section_kind(line)
+        section_kind, heading = classified[index]
         if section_kind is not None:
             output.append(_format_section_header(section_kind))
             current_section_kind = section_kind
@@ -181,16 +191,17 @@ def repair_known_hero_sections(text: str) -> str:
             index += 1
             continue
 
-        block, next_index = _collect_section_block(lines, index)
-        heading = _extract_bold_subheader(block[0]) if block else None
+        # Ein Block ist eine Bold-Ueberschrift bis zur naechsten Kopfzeile, sonst eine einzelne Zeile.
+        next_index = block_end[index] if heading is not None else index + 1
+        block = lines[index:next_index]
         if heading is None:
             canonical_heading = None
             block_kind = active_section_kind or current_section_kind
         else:
-            canonical_heading = canonical_hero_name(heading)
+            canonical_heading = canonical_hero_name(heading) or _indexed_hero_heading(heading)
             block_kind = "heroes" if canonical_heading else "items"
 
-        if canonical_heading and block:
+        if canonical_heading:
             leading = block[0][: len(block[0]) - len(block[0].lstrip())]
             block[0] = f"{leading}**{canonical_heading}**"
 
@@ -205,7 +216,7 @@ def repair_known_hero_sections(text: str) -> str:
             else:
                 output.append(replacement)
                 last_section_header_index = len(output) - 1
-                if block and block[0].strip():
+                if block[0].strip():
                     output.append("")
             active_section_kind = block_kind
 
@@ -320,6 +331,32 @@ WICHTIG:
 """
 )
 
+batch_system_prompt = (
+    system_prompt_base
+    + """
+
+MEHRERE POSTS:
+- Der Input enthaelt mehrere voneinander unabhaengige Patchnotes-Posts, jeder in einem eigenen Block '<PATCHNOTES id=N>' ... '</PATCHNOTES>'.
+- Uebersetze und formatiere jeden Block einzeln nach den obigen Regeln.
+- Gib fuer jeden Block genau einen Block im selben Format zurueck: '<PATCHNOTES id=N>', die Uebersetzung, '</PATCHNOTES>'.
+- Die ids unveraendert uebernehmen, keine Bloecke zusammenfassen, weglassen oder hinzufuegen.
+- Ausserhalb der Bloecke nichts ausgeben.
+"""
+)
+
+translation_memory_note = """
+
+PLATZHALTER:
+- Zeilen mit Platzhaltern der Form '{{TM1}}', '{{TM2}}', ... sind bereits uebersetzt.
+- Uebernimm jeden Platzhalter exakt und unveraendert an die passende Stelle der Struktur, auch unter Hero- oder Item-Ueberschriften.
+- Platzhalter nicht uebersetzen, nicht weglassen und nicht verdoppeln.
+"""
+
+_BATCH_BLOCK_RE = re.compile(
+    r"<PATCHNOTES\s+id\s*=\s*[\"']?([\w-]+)[\"']?\s*>(.*?)</PATCHNOTES>",
+    re.IGNORECASE | re.DOTALL,
+)
+
 _BAD_RESPONSE_MARKERS = (
     "ich kann diese anfrage nicht erfuellen",
     "ich kann diese anfrage nicht erfüllen",
@@ -353,16 +390,76 @@ def extract_answer_text(api_response: dict) -> str:
         return ""
 
 
+def build_batch_content(posts: list[tuple[str, str]]) -> str:
+    return "\n\n".join(
+        f"<PATCHNOTES id={post_id}>\n{str(content or '').strip()}\n</PATCHNOTES>"
+        for post_id, content in posts
+    )
+
+
+def split_batch_answer(text: str, post_ids: list[str]) -> dict[str, str] | None:
+    """Map a batched answer back to its post ids; None if any block is missing or duplicated."""
+    found: dict[str, str] = {}
+    for match in _BATCH_BLOCK_RE.finditer(text or ""):
+        post_id = match.group(1)
+        if post_id in found:
+            return None
+        found[post_id] = match.group(2).strip()
+    if set(found) != set(post_ids):
+        return None
+    if any(not found[post_id] for post_id in post_ids):
+        return None
+    return found
+
+
+def extract_usage(api_response: dict | None) -> dict:
+    """Token usage, cost and HTTP attempt count of a fetch_answer response."""
+    usage = (api_response or {}).get("usage") or {}
+    prompt_tokens = int(usage.get("prompt_tokens") or 0)
+    completion_tokens = int(usage.get("completion_tokens") or 0)
+    cost = None
+    cost_block = usage.get("cost")
+    if isinstance(cost_block, dict) and cost_block.get("total_cost") is not None:
+        cost = float(cost_block["total_cost"])
+    elif PRICE_INPUT_PER_MTOK or PRICE_OUTPUT_PER_MTOK:
+        cost = (
+            prompt_tokens * PRICE_INPUT_PER_MTOK + completion_tokens * PRICE_OUTPUT_PER_MTOK
+        ) / 1_000_000
+    return {
+        "model": (api_response or {}).get("model"),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": int(usage.get("total_tokens") or prompt_tokens + completion_tokens),
+        "cost": cost,
+        "attempts": int((api_response or {}).get("_request_attempts") or 1),
+    }
+
+
 def _build_messages(
     content: str,
     include_ping: bool,
     strict_mode: bool,
     partial_mode: bool = False,
+    batch_mode: bool = False,
 ) -> list[dict]:
+    if batch_mode:
+        system_prompt = batch_system_prompt
+        user_prompt = (
+            "Hier sind mehrere Patchnotes-Posts. Nutze nur die folgenden Bloecke:\n"
+            f"{content}"
+        )
+        if strict_mode:
+            system_prompt += "\nGib ausschliesslich die Bloecke aus, keine Meta-Texte oder Rueckfragen.\n"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
     if partial_mode:
         system_prompt = partial_strict_system_prompt if strict_mode else partial_system_prompt
     else:
         system_prompt = strict_system_prompt if strict_mode else system_prompt_base
+    if "{{TM" in content:
+        system_prompt += translation_memory_note
     user_prompt = (
         "Hier sind die Patchnotes. Nutze nur den folgenden Block:\n"
         "<PATCHNOTES>\n"
@@ -380,6 +477,8 @@ def fetch_answer(
     include_ping: bool = True,
     strict_mode: bool = False,
     partial_mode: bool = False,
+    model: str | None = None,
+    batch_mode: bool = False,
 ):
     if not api_key:
         raise RuntimeError("PERPLEXITY_API_KEY fehlt in der Umgebung.")
@@ -389,8 +488,10 @@ def fetch_answer(
     last_error = None
 
     payload = {
-        "model": MODEL,
-        "messages": _build_messages(str(content or ""), include_ping, strict_mode, partial_mode),
+        "model": model or MODEL,
+        "messages": _build_messages(
+            str(content or ""), include_ping, strict_mode, partial_mode, batch_mode
+        ),
         "temperature": 0.0 if strict_mode else 0.2,
         "max_tokens": DEFAULT_MAX_TOKENS,
     }
@@ -422,8 +523,11 @@ def fetch_answer(
         raise RuntimeError(f"Perplexity API Fehler {response.status_code}: {response.text}")
 
     try:
-        return response.json()
+        data = response.json()
     except json.JSONDecodeError as exc:
         raise RuntimeError(
             f"Perplexity Antwort konnte nicht geparst werden: {exc} / Raw: {response.text[:500]}"
         )
+    if isinstance(data, dict):
+        data["_request_attempts"] = attempt
+    return data
@@ -0,0 +1,48 @@
+"""Setup for tests that import main.
+
+main.py loads the Deadlock service package (service.db) from DEADLOCK_HOME at
+import time. Tests get an in-memory SQLite database with the same functions
+instead, so they never touch a real Deadlock DB.
+"""
+import os
+import sqlite3
+import sys
+import threading
+import types
+
+os.environ.setdefault("PATCH_CHANNEL_ID", "1")
+os.environ["BOT_SKIP_RUN"] = "1"
+
+
+def _memory_db() -> types.ModuleType:
+    # Autocommit wie die Deadlock-DB; DbWriter.transaction() setzt BEGIN/COMMIT selbst.
+    connection = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    lock = threading.RLock()
+    kv: dict[tuple[str, str], object] = {}
+
+    def execute(sql, params=()):
+        with lock:
+            return connection.execute(sql, params)
+
+    def query_one(sql, params=()):
+        with lock:
+            return connection.execute(sql, params).fetchone()
+
+    def query_all(sql, params=()):
+        with lock:
+            return connection.execute(sql, params).fetchall()
+
+    module = types.ModuleType("service.db")
+    module.execute = execute
+    module.query_one = query_one
+    module.query_all = query_all
+    module.get_kv = lambda namespace, key: kv.get((namespace, key))
+    module.set_kv = lambda namespace, key, value: kv.__setitem__((namespace, key), value)
+    return module
+
+
+_service = types.ModuleType("service")
+_service.db = _memory_db()
+sys.modules["service"] = _service
+sys.modules["service.db"] = _service.db
@@ -0,0 +1,99 @@
+"""Batching of short catch-up posts into one translation request."""
+import asyncio
+import re
+
+import pytest
+
+import main
+import perplexity_requests
+
+POSTS = {
+    "https://forums.playdeadlock.com/posts/27001/": "- Mid Boss health increased from 7000 to 7500",
+    "https://forums.playdeadlock.com/posts/27002/": "- Troopers now spawn 5s earlier",
+    "https://forums.playdeadlock.com/posts/27003/": "- Haze: Bullet Dance duration reduced from 6s to 5s",
+}
+_BLOCK_RE = re.compile(r"<PATCHNOTES id=(\w+)>\n(.*?)\n</PATCHNOTES>", re.DOTALL)
+
+
+def test_build_and_split_batch_roundtrip():
+    content = perplexity_requests.build_batch_content([("1", "- a"), ("2", "- b")])
+    assert perplexity_requests.split_batch_answer(content, ["1", "2"]) == {"1": "- a", "2": "- b"}
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        "<PATCHNOTES id=1>- a</PATCHNOTES>",
+        "<PATCHNOTES id=1>- a</PATCHNOTES><PATCHNOTES id=1>- b</PATCHNOTES><PATCHNOTES id=2>- c</PATCHNOTES>",
+        "<PATCHNOTES id=1>- a</PATCHNOTES><PATCHNOTES id=2> </PATCHNOTES>",
+        "<PATCHNOTES id=1>- a</PATCHNOTES><PATCHNOTES id=3>- c</PATCHNOTES>",
+    ],
+)
+def test_split_rejects_incomplete_answers(answer):
+    assert perplexity_requests.split_batch_answer(answer, ["1", "2"]) is None
+
+
+@pytest.fixture
+def posts(monkeypatch):
+    async def fetch_patch_data(url):
+        return {"url": url, "title": None, "posted_at": None, "content": POSTS[url]}
+
+    monkeypatch.setattr(main, "_fetch_patch_data", fetch_patch_data)
+    monkeypatch.setattr(main, "PATCH_BATCH_MAX_POST_CHARS", 200)
+    monkeypatch.setattr(main, "PATCH_BATCH_MAX_CHARS", 8000)
+    monkeypatch.setattr(main, "PATCH_BATCH_MAX_POSTS", 6)
+    return POSTS
+
+
+def _fake_fetch(monkeypatch, answer, calls: list):
+    def fetch_answer(content, include_ping=True, strict_mode=False, partial_mode=False, model=None, batch_mode=False):
+        calls.append((batch_mode, strict_mode, content))
+        return {"choices": [{"message": {"content": answer(content)}}]}
+
+    monkeypatch.setattr(perplexity_requests, "fetch_answer", fetch_answer)
+
+
+def _translated_blocks(content: str) -> str:
+    blocks = _BLOCK_RE.findall(content)
+    return "\n\n".join(f"<PATCHNOTES id={post_id}>\n{body} (uebersetzt)\n</PATCHNOTES>" for post_id, body in blocks)
+
+
+def test_short_posts_share_one_request(monkeypatch, posts):
+    calls: list = []
+    _fake_fetch(monkeypatch, _translated_blocks, calls)
+    prepared = asyncio.run(main._prepare_batch_translations(list(posts)))
+    assert len(calls) == 1 and calls[0][0] is True
+    assert {url: translation for url, (_, translation) in prepared.items()} == {
+        url: f"{content} (uebersetzt)" for url, content in posts.items()
+    }
+
+
+def test_long_post_is_left_for_single_translation(monkeypatch, posts):
+    long_url = "https://forums.playdeadlock.com/posts/27003/"
+    monkeypatch.setitem(posts, long_url, "- Haze: " + "Bullet Dance duration reduced. " * 20)
+    calls: list = []
+    _fake_fetch(monkeypatch, _translated_blocks, calls)
+    prepared = asyncio.run(main._prepare_batch_translations(list(posts)))
+    assert len(calls) == 1
+    assert "Haze" not in calls[0][2]
+    assert prepared[long_url][1] is None
+    assert prepared[long_url][0]["content"] == posts[long_url]
+    assert all(translation for url, (_, translation) in prepared.items() if url != long_url)
+
+
+def test_groups_respect_post_limit(monkeypatch, posts):
+    monkeypatch.setattr(main, "PATCH_BATCH_MAX_POSTS", 2)
+    calls: list = []
+    _fake_fetch(monkeypatch, _translated_blocks, calls)
+    prepared = asyncio.run(main._prepare_batch_translations(list(posts)))
+    # Drei Posts -> Gruppe aus zwei plus ein einzelner, der nicht gebatcht wird.
+    assert len(calls) == 1
+    assert [translation is not None for _, translation in prepared.values()] == [True, True, False]
+
+
+def test_unsplittable_answer_falls_back_to_single_posts(monkeypatch, posts):
+    calls: list = []
+    _fake_fetch(monkeypatch, lambda content: "Hier sind die Patchnotes: - Mid Boss Leben erhoeht", calls)
+    prepared = asyncio.run(main._prepare_batch_translations(list(posts)))
+    assert [strict for _, strict, _ in calls] == [False, True]
+    assert all(translation is None for _, translation in prepared.values())
@@ -0,0 +1,108 @@
+"""Hedged translation requests: delay percentile, winner selection and censored samples."""
+import asyncio
+import threading
+import time
+from collections import deque
+
+import pytest
+
+import main
+import perplexity_requests
+
+RAW = "- Mid Boss health increased from 7000 to 7500"
+PRIMARY = "- Mid Boss Leben von 7000 auf 7500 erhoeht (primaer)"
+HEDGE = "- Mid Boss Leben von 7000 auf 7500 erhoeht (hedge)"
+
+
+def _answer(text: str) -> dict:
+    return {"choices": [{"message": {"content": text}}], "usage": {"prompt_tokens": 10, "completion_tokens": 5}}
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE", True)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_MODEL", None)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_INITIAL_DELAY", 0.05)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_MIN_DELAY", 0.05)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_MAX_DELAY", 1.0)
+    monkeypatch.setattr(main, "_translate_latency_samples", {False: deque(maxlen=50), True: deque(maxlen=50)})
+    monkeypatch.setattr(main, "_hedge_stats", dict.fromkeys(main._hedge_stats, 0))
+    release = threading.Event()
+    yield release
+    # Verlierer-Threads nicht bis zu ihrem Timeout weiterlaufen lassen.
+    release.set()
+
+
+def _fake_fetch(monkeypatch, primary, hedge, calls: list | None = None):
+    """fetch_answer that returns primary() for normal and hedge() for strict requests."""
+
+    def fetch_answer(content, include_ping=True, strict_mode=False, partial_mode=False, model=None, batch_mode=False):
+        if calls is not None:
+            calls.append(strict_mode)
+        return hedge() if strict_mode else primary()
+
+    monkeypatch.setattr(perplexity_requests, "fetch_answer", fetch_answer)
+
+
+def _translate() -> str:
+    return asyncio.run(main._request_patch_translation(RAW, include_ping=False, context_label="test"))
+
+
+def test_delay_uses_initial_value_until_enough_samples(monkeypatch):
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_INITIAL_DELAY", 30.0)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_MIN_DELAY", 1.0)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_MAX_DELAY", 60.0)
+    monkeypatch.setattr(main, "PATCH_TRANSLATE_HEDGE_PERCENTILE", 0.9)
+    samples = {False: deque([5.0] * (main.PATCH_TRANSLATE_HEDGE_MIN_SAMPLES - 1)), True: deque()}
+    monkeypatch.setattr(main, "_translate_latency_samples", samples)
+    assert main._hedge_delay_seconds() == 30.0
+
+    samples[False] = deque(float(value) for value in range(10, 0, -1))
+    assert main._hedge_delay_seconds() == 9.0
+
+    samples[False] = deque([0.2] * 10)
+    assert main._hedge_delay_seconds() == 1.0
+    samples[False] = deque([120.0] * 10)
+    assert main._hedge_delay_seconds() == 60.0
+
+
+def test_fast_primary_is_not_hedged(monkeypatch, hedging):
+    calls: list[bool] = []
+    _fake_fetch(monkeypatch, lambda: _answer(PRIMARY), lambda: _answer(HEDGE), calls)
+    assert _translate() == PRIMARY
+    assert calls == [False]
+    assert main._hedge_stats["hedged"] == 0
+    assert len(main._translate_latency_samples[False]) == 1
+
+
+def test_slow_primary_loses_to_hedge_and_leaves_censored_sample(monkeypatch, hedging):
+    def slow_primary():
+        hedging.wait(5)
+        return _answer(PRIMARY)
+
+    calls: list[bool] = []
+    _fake_fetch(monkeypatch, slow_primary, lambda: _answer(HEDGE), calls)
+    start = time.perf_counter()
+    assert _translate() == HEDGE
+    assert time.perf_counter() - start < 2
+    assert calls == [False, True]
+    assert main._hedge_stats["hedged"] == 1
+    assert main._hedge_stats["hedge_wins"] == 1
+
+    # Die abgebrochene Primaer-Anfrage zaehlt mit ihrer Mindestdauer, die strikte Hedge-Anfrage gar nicht.
+    samples = list(main._translate_latency_samples[False])
+    assert len(samples) == 1
+    assert samples[0] >= 0.05
+
+
+def test_failed_hedge_does_not_repeat_strict_request(monkeypatch, hedging):
+    def slow_empty():
+        time.sleep(0.2)
+        return _answer("")
+
+    calls: list[bool] = []
+    _fake_fetch(monkeypatch, slow_empty, lambda: _answer(""), calls)
+    assert _translate() == RAW
+    assert sorted(calls) == [False, True]
+    assert main._hedge_stats["hedged"] == 1
+    assert main._hedge_stats["hedge_wins"] == 0
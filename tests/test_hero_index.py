@@ -0,0 +1,92 @@
+"""Aho-Corasick name index and the shared hero/item lookup."""
+import random
+import re
+
+import pytest
+
+import hero_index
+
+ENTRIES = [
+    ("Geist", "Geist", hero_index.HERO),
+    ("Lady Geist", "Lady Geist", hero_index.HERO),
+    ("Grey Talon", "Grey Talon", hero_index.HERO),
+    ("Mo and Krill", "Mo & Krill", hero_index.HERO),
+    ("Healing Rite", "Healing Rite", hero_index.ITEM),
+    ("Rite", "Rite", hero_index.ITEM),
+]
+
+
+@pytest.fixture
+def index() -> hero_index.NameIndex:
+    return hero_index.NameIndex(ENTRIES)
+
+
+@pytest.fixture
+def items():
+    """Restore the global item list after a test changed it."""
+    original = hero_index.item_names()
+    yield
+    hero_index.set_item_names(original)
+
+
+def test_find_all_whole_words_case_and_punctuation(index):
+    text = "grey-talon and GREY TALON, but not Greyhound or Talons; Mo and Krill."
+    matches = index.find_all(text)
+    assert [(match.name, text[match.start : match.end]) for match in matches] == [
+        ("Grey Talon", "grey-talon"),
+        ("Grey Talon", "GREY TALON"),
+        ("Mo & Krill", "Mo and Krill"),
+    ]
+    assert index.find_all("Geistlich Rites") == []
+
+
+def test_find_all_prefers_leftmost_longest(index):
+    text = "Lady Geist buys Healing Rite"
+    assert [(match.name, text[match.start : match.end]) for match in index.find_all(text)] == [
+        ("Lady Geist", "Lady Geist"),
+        ("Healing Rite", "Healing Rite"),
+    ]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_all_matches_naive_scan(index, seed):
+    rng = random.Random(seed)
+    words = ["lady", "geist", "grey", "talon", "mo", "and", "krill", "healing", "rite", "x", "rites"]
+    text = " ".join(rng.choice(words) for _ in range(60))
+    patterns = sorted((pattern.lower() for pattern, _, _ in ENTRIES), key=len, reverse=True)
+    expected = [
+        (match.start(), match.end())
+        for match in re.finditer(r"\b(?:" + "|".join(map(re.escape, patterns)) + r")\b", text)
+    ]
+    assert [(match.start, match.end) for match in index.find_all(text)] == expected
+
+
+def test_leading_and_exact(index):
+    assert index.leading("Lady Geist: Essence Bomb").name == "Lady Geist"
+    assert index.leading("Geistlich") is None
+    assert index.leading("Grey-Talon: x").end == len("Grey-Talon")
+    assert index.exact("  Healing Rite ").name == "Healing Rite"
+    assert index.exact("Healing Rite bonus") is None
+
+
+def test_default_index_prefix_and_heading(items):
+    match, rest = hero_index.name_prefix("Lady Geist: Essence Bomb damage increased")
+    assert (match.name, match.kind, rest) == ("Lady Geist", hero_index.HERO, "Essence Bomb damage increased")
+    assert hero_index.name_prefix("Lady Geist:x") is None
+    assert hero_index.name_prefix("Haze ist stark") is None
+    assert hero_index.heading_name("Lady Geist:").name == "Lady Geist"
+    assert hero_index.heading_name("Lady Geist and Haze") is None
+
+    hero_index.set_item_names(["Healing Rite"])
+    assert hero_index.name_prefix("Healing Rite: Cooldown reduced", kinds=(hero_index.HERO,)) is None
+    assert hero_index.name_prefix("Healing Rite: Cooldown reduced")[0].kind == hero_index.ITEM
+
+
+def test_set_item_names_bumps_version_only_on_change(items):
+    hero_index.set_item_names(["Healing Rite"])
+    version = hero_index.version()
+    assert not hero_index.set_item_names([" Healing   Rite ", ""])
+    assert hero_index.version() == version
+    assert hero_index.set_item_names(["Healing Rite", "Spirit Shredder Bullets"])
+    assert hero_index.version() == version + 1
+    assert hero_index.item_names() == ("Healing Rite", "Spirit Shredder Bullets")
@@ -0,0 +1,82 @@
+"""Content-addressed, compressed text storage."""
+import sqlite3
+
+import pytest
+
+import patch_blobs
+
+TEXT = "### Deadlock Patch Notes\n" + "\n".join(f"- Aenderung {index}: Schaden erhöht" for index in range(200))
+
+
+class _Db:
+    """execute/query_one like the Deadlock DB, on one SQLite connection."""
+
+    def __init__(self) -> None:
+        self.connection = sqlite3.connect(":memory:", isolation_level=None)
+
+    def execute(self, sql, params=()):
+        return self.connection.execute(sql, params)
+
+    def query_one(self, sql, params=()):
+        return self.connection.execute(sql, params).fetchone()
+
+    def rows(self) -> list[tuple]:
+        return self.connection.execute("SELECT hash, codec, size, length(data) FROM patchnotes_blobs").fetchall()
+
+
+@pytest.fixture
+def db() -> _Db:
+    return _Db()
+
+
+def test_put_get_roundtrip_from_db(db):
+    key = patch_blobs.BlobStore(db).put(TEXT)
+    assert key == patch_blobs.digest(TEXT)
+    # Neuer Store ohne Cache -> liest und entpackt aus der DB.
+    assert patch_blobs.BlobStore(db).get(key) == TEXT
+    [(stored_key, codec, size, data_size)] = db.rows()
+    assert (stored_key, codec, size) == (key, patch_blobs.CODEC, len(TEXT))
+    assert data_size < len(TEXT.encode("utf-8")) // 4
+
+
+def test_identical_text_is_stored_once(db):
+    store = patch_blobs.BlobStore(db)
+    assert store.put(TEXT) == store.put(TEXT) == patch_blobs.BlobStore(db).put(TEXT)
+    store.put(TEXT + "\n- noch eine")
+    assert len(db.rows()) == 2
+
+
+def test_missing_and_none(db):
+    store = patch_blobs.BlobStore(db)
+    assert store.put(None) is None
+    assert store.get(None) is None
+    assert store.get("") is None
+    assert store.get(patch_blobs.digest("nie gespeichert")) is None
+    assert store.put("") == patch_blobs.digest("")
+    assert store.get(patch_blobs.digest("")) == ""
+
+
+def test_put_after_rollback_writes_again(db):
+    store = patch_blobs.BlobStore(db)
+    store.ensure_table()
+    db.execute("BEGIN")
+    key = store.put(TEXT)
+    db.execute("ROLLBACK")
+    assert patch_blobs.BlobStore(db).get(key) is None
+    store.put(TEXT)
+    assert patch_blobs.BlobStore(db).get(key) == TEXT
+
+
+def test_cache_is_bounded(db, monkeypatch):
+    monkeypatch.setattr(patch_blobs, "CACHE_SIZE", 2)
+    store = patch_blobs.BlobStore(db)
+    keys = [store.put(f"- Text {index}") for index in range(3)]
+    db.execute("DELETE FROM patchnotes_blobs")
+    # Nur die zwei zuletzt benutzten Texte kommen noch aus dem Cache.
+    assert [store.get(key) for key in keys] == [None, "- Text 1", "- Text 2"]
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        patch_blobs.decompress(patch_blobs.compress(TEXT), "lzma")
+    assert patch_blobs.decompress(patch_blobs.compress(TEXT)) == TEXT
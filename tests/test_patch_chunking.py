@@ -0,0 +1,90 @@
+"""Balanced block packing and the chunking engine built on it."""
+import itertools
+import random
+
+import pytest
+
+import patch_chunking
+
+
+def _cost(chunks: list[str]) -> tuple[int, int]:
+    return len(chunks), sum(len(chunk) ** 2 for chunk in chunks)
+
+
+def _brute_force(blocks: list[str], limit: int, separator: str = "\n\n") -> tuple[int, int]:
+    best = None
+    for cuts in itertools.product((False, True), repeat=len(blocks) - 1):
+        chunks: list[str] = []
+        start = 0
+        for index, cut in enumerate(cuts, start=1):
+            if cut:
+                chunks.append(separator.join(blocks[start:index]))
+                start = index
+        chunks.append(separator.join(blocks[start:]))
+        if all(len(chunk) <= limit for chunk in chunks):
+            cost = _cost(chunks)
+            best = cost if best is None or cost < best else best
+    return best
+
+
+def test_balanced_packing_beats_greedy_split():
+    blocks = ["a" * 10, "b", "c", "d" * 10]
+    chunks = patch_chunking.pack_blocks_balanced(blocks, 16)
+    # Greedy waere [10+1+1] + [10]; gleich viele, aber gleichmaessigere Chunks:
+    assert chunks == ["a" * 10 + "\n\nb", "c\n\n" + "d" * 10]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_balanced_packing_matches_brute_force(seed):
+    rng = random.Random(seed)
+    limit = rng.randint(20, 60)
+    blocks = [chr(97 + index) * rng.randint(1, limit) for index in range(rng.randint(1, 9))]
+    chunks = patch_chunking.pack_blocks_balanced(blocks, limit)
+    assert "\n\n".join(chunks) == "\n\n".join(blocks)
+    assert all(len(chunk) <= limit for chunk in chunks)
+    assert _cost(chunks) == _brute_force(blocks, limit)
+
+
+def test_custom_sizes_and_separator_size():
+    blocks = ["x", "y", "z"]
+    chunks = patch_chunking.pack_blocks_balanced(blocks, 10, sizes=[5, 5, 5], separator_size=0)
+    assert len(chunks) == 2
+
+
+def _patch_text(sections: int, bullets: int) -> str:
+    parts = []
+    for section in range(sections):
+        lines = [f"**Section {section}**"]
+        lines.extend(f"- Bullet {section}.{index} changed from {index} to {index + 1}" for index in range(bullets))
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def test_iter_chunks_keeps_sections_whole():
+    text = _patch_text(sections=12, bullets=8)
+    sections = text.split("\n\n")
+    chunks = list(patch_chunking.iter_chunks(text, 1000))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert [section for chunk in chunks for section in chunk.split("\n\n")] == sections
+
+
+def test_iter_chunks_splits_oversized_section_and_line():
+    long_line = "- " + " ".join(f"word{index}." for index in range(400))
+    text = "**Huge**\n" + long_line + "\n\n" + _patch_text(sections=2, bullets=3)
+    chunks = list(patch_chunking.iter_chunks(text, 300))
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    words = [word for chunk in chunks for word in chunk.split() if word.startswith("word")]
+    assert words == [f"word{index}." for index in range(400)]
+
+
+def test_iter_chunks_with_token_metric():
+    text = _patch_text(sections=10, bullets=10)
+    chunks = list(patch_chunking.iter_chunks(text, 200, metric=patch_chunking.TOKENS))
+    assert len(chunks) > 1
+    assert all(patch_chunking.estimate_tokens(chunk) <= 200 for chunk in chunks)
+
+
+def test_short_text_is_one_chunk():
+    assert list(patch_chunking.iter_chunks("  - kurz  \n", 100)) == ["- kurz"]
+    assert list(patch_chunking.iter_chunks("   ", 100)) == []
@@ -0,0 +1,63 @@
+"""Pins the near-duplicate threshold on a Steam/forum pair of the same patch.
+
+patch_forum.txt and patch_steam.txt hold one update in the shape the fetchers
+return it from each source (different intro, heading style, a link and
+whitespace); other_patch_forum.txt is a different update touching the
+same heroes and items.
+"""
+from pathlib import Path
+
+import patch_fingerprint
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _load(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def _edited(text: str, replacements: list[str], every: int) -> str:
+    """Replace every n-th bullet with a bullet from another patch (a later edit of the post)."""
+    lines = text.splitlines()
+    bullets = [index for index, line in enumerate(lines) if line.startswith("- ")]
+    for index, replacement in zip(bullets[::every], replacements):
+        lines[index] = replacement
+    return "\n".join(lines)
+
+
+def test_steam_and_forum_post_of_same_patch_match():
+    forum = patch_fingerprint.fingerprint(_load("patch_forum.txt"))
+    steam = patch_fingerprint.fingerprint(_load("patch_steam.txt"))
+    assert patch_fingerprint.is_near_duplicate(forum, steam)
+
+
+def test_different_patch_does_not_match():
+    forum = patch_fingerprint.fingerprint(_load("patch_forum.txt"))
+    steam = patch_fingerprint.fingerprint(_load("patch_steam.txt"))
+    other = patch_fingerprint.fingerprint(_load("other_patch_forum.txt"))
+    assert not patch_fingerprint.is_near_duplicate(forum, other)
+    assert not patch_fingerprint.is_near_duplicate(steam, other)
+    assert forum.similarity(other) < patch_fingerprint.THRESHOLD / 2
+
+
+def test_edited_copy_still_matches():
+    text = _load("patch_forum.txt")
+    other_bullets = [line for line in _load("other_patch_forum.txt").splitlines() if line.startswith("- ")]
+    original = patch_fingerprint.fingerprint(text)
+    # 5 bzw. 8 von 67 Bullets ersetzt.
+    for count, every in ((5, 13), (8, 8)):
+        edited = patch_fingerprint.fingerprint(_edited(text, other_bullets[:count], every))
+        assert patch_fingerprint.is_near_duplicate(original, edited), (count, original.similarity(edited))
+
+
+def test_short_texts_never_match():
+    short = "- Mid Boss health increased from 7000 to 7500\n- Curse: Duration reduced from 3.25s to 3s"
+    fingerprint = patch_fingerprint.fingerprint(short)
+    assert fingerprint.features < patch_fingerprint.MIN_FEATURES
+    assert not patch_fingerprint.is_near_duplicate(fingerprint, fingerprint)
+
+
+def test_encode_roundtrip():
+    fingerprint = patch_fingerprint.fingerprint(_load("patch_forum.txt"))
+    assert patch_fingerprint.decode(fingerprint.encode()) == fingerprint
+    assert patch_fingerprint.decode("12:abc") is None
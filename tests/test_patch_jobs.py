@@ -0,0 +1,138 @@
+"""Durable patch jobs: state transitions and resume after a crash."""
+import asyncio
+import itertools
+
+import pytest
+
+import main
+
+RAW = "[ General ]\n" + "\n".join(
+    f"- Change {index}: value increased from {index} to {index + 1}" for index in range(120)
+)
+TRANSLATED = "## General\n" + "\n".join(
+    f"- Aenderung {index}: Wert von {index} auf {index + 1} erhoeht" for index in range(120)
+)
+_message_ids = itertools.count(1000)
+
+
+class _Message:
+    def __init__(self, message_id: int) -> None:
+        self.id = message_id
+
+
+class _Channel:
+    id = 31
+
+    def __init__(self, fail_on_send: int | None = None) -> None:
+        self.sent: list[str] = []
+        self._fail_on_send = fail_on_send
+
+    async def send(self, content=None, **kwargs):
+        if self._fail_on_send is not None and len(self.sent) == self._fail_on_send:
+            raise RuntimeError("Verbindung verloren")
+        self.sent.append(content)
+        return _Message(next(_message_ids))
+
+    def get_partial_message(self, message_id: int):
+        # Resume darf bereits gesendete Chunks nicht mehr anfassen.
+        raise AssertionError(f"Nachricht {message_id} unerwartet bearbeitet")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """update_patch against a fake channel; fetch and translate count their calls."""
+    calls = {"fetch": 0, "translate": 0}
+
+    async def fetch_patch_data(url):
+        calls["fetch"] += 1
+        return {"url": url, "title": "Update", "posted_at": None, "content": RAW}
+
+    async def translate_patch_content(content, *, include_ping, context_label):
+        calls["translate"] += 1
+        return TRANSLATED
+
+    monkeypatch.setattr(main, "_fetch_patch_data", fetch_patch_data)
+    monkeypatch.setattr(main, "_translate_patch_content", translate_patch_content)
+    for name, value in (
+        ("PATCH_OUTPUT_DIR", None),
+        ("BOT_DRY_RUN", False),
+        ("PATCH_RAW_PREVIEW", False),
+        ("PATCH_CROSS_SOURCE_DEDUPE", False),
+        ("PATCH_AUTO_INCLUDE_PING", False),
+        ("PATCH_SEND_MODE", "text"),
+    ):
+        monkeypatch.setattr(main, name, value)
+    return calls
+
+
+def _run(channel, monkeypatch, url: str) -> bool:
+    async def resolve_channel():
+        return channel
+
+    monkeypatch.setattr(main, "_resolve_patch_channel", resolve_channel)
+
+    async def run() -> bool:
+        try:
+            return await main.update_patch(url)
+        finally:
+            await main._db_writer.flush()
+
+    return asyncio.run(run())
+
+
+def _chunks() -> list[str]:
+    return main._smart_chunks(main._cleanup_for_discord(TRANSLATED, None))
+
+
+def test_job_states_and_pending_list():
+    url = "https://forums.playdeadlock.com/posts/31001/"
+    main.save_patch_job(url, "fetched", raw_content=RAW, title="Update")
+    main.save_patch_job(url, "translated", translated_content=TRANSLATED)
+    row = main.load_patch_job(url)
+    assert (row["state"], row["raw_content"], row["translated_content"]) == ("translated", RAW, TRANSLATED)
+    assert url in main.load_pending_patch_jobs()
+
+    main.save_patch_job(url, "bogus")
+    assert main.load_patch_job(url)["state"] == "translated"
+
+    main.save_patch_job(url, "done")
+    row = main.load_patch_job(url)
+    assert (row["state"], row["raw_content"], row["translated_content"]) == ("done", None, None)
+    assert url not in main.load_pending_patch_jobs()
+
+
+def test_fresh_patch_runs_through_all_states(monkeypatch, pipeline):
+    url = "https://forums.playdeadlock.com/posts/31002/"
+    channel = _Channel()
+    assert _run(channel, monkeypatch, url)
+    assert pipeline == {"fetch": 1, "translate": 1}
+    assert len(channel.sent) == len(_chunks()) > 1
+    assert main.load_patch_job(url)["state"] == "done"
+
+
+def test_translated_job_resumes_without_fetch_or_translation(monkeypatch, pipeline):
+    url = "https://forums.playdeadlock.com/posts/31003/"
+    main.save_patch_job(url, "fetched", canonical_url=url, raw_content=RAW)
+    main.save_patch_job(url, "translated", translated_content=TRANSLATED, chunk_index=0)
+    channel = _Channel()
+    assert _run(channel, monkeypatch, url)
+    assert pipeline == {"fetch": 0, "translate": 0}
+    assert channel.sent == _chunks()
+    assert main.load_patch_job(url)["state"] == "done"
+
+
+def test_crash_while_sending_resumes_at_next_chunk(monkeypatch, pipeline):
+    url = "https://forums.playdeadlock.com/posts/31004/"
+    crashing = _Channel(fail_on_send=1)
+    with pytest.raises(RuntimeError):
+        _run(crashing, monkeypatch, url)
+    row = main.load_patch_job(url)
+    assert (row["state"], row["chunk_index"]) == ("sending", 1)
+    assert row["translated_content"] == TRANSLATED
+
+    channel = _Channel()
+    assert _run(channel, monkeypatch, url)
+    assert pipeline == {"fetch": 1, "translate": 1}
+    # Chunk 0 ging schon vor dem Absturz raus; nichts wird doppelt gesendet.
+    assert crashing.sent + channel.sent == _chunks()
+    assert main.load_patch_job(url)["state"] == "done"
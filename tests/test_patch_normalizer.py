@@ -0,0 +1,61 @@
+"""Single-pass model-output cleanup, checked against the step-by-step chain."""
+import pytest
+
+import bench_normalizer
+import main
+import patch_normalizer
+
+PING = "<@&123>"
+HEADING = "### Deadlock Patch Notes (01.01.2026)"
+
+SAMPLES = [
+    "```markdown\n### Deadlock Patch Notes\n## General\n- Mid Boss Leben erhoeht [1]\n```",
+    "## Heroes\n**Abrams**\n- Siphon Life [2, 3] Schaden erhoeht (https://example.com/a)\n\n\n\n- Mehr\n" + PING,
+    "- Siehe [Patch](https://forums.playdeadlock.com/threads/x/) und <https://x.y/z>   mit  Leerzeichen\t\n",
+    "### Deadlock Patch Notes\n- A\n___\n**Kurzzusammenfassung**\n- B",
+    "\n\n  ## Items\n- Bullet\r\n" + PING + " ping\n\n",
+    "",
+]
+
+
+def test_citations_links_and_whitespace():
+    result = patch_normalizer.normalize(
+        "- Schaden erhoeht [1][2, 3]  https://example.com\n- Siehe [Link](https://x.y/z) <https://a.b/c>"
+    )
+    assert result.text == "- Schaden erhoeht\n- Siehe Link"
+    assert result.changes["citations"] == 2
+    assert result.changes["links"] == 3
+
+
+def test_fences_ping_and_heading():
+    result = patch_normalizer.normalize(
+        "```\n### Deadlock Patch Notes\n- A\n" + PING + "\n```",
+        strip_fences=True,
+        role_ping=PING,
+        heading=HEADING,
+    )
+    assert result.text == HEADING + "\n- A"
+    assert result.changes["fences"] == 2
+    assert result.changes["role_ping_lines"] == 1
+
+
+def test_partial_cuts_heading_separator_and_summary():
+    result = patch_normalizer.normalize(
+        "### Deadlock Patch Notes\n- A\n\n\n- B\n___\n- nicht mehr", partial=True
+    )
+    assert result.text == "- A\n\n- B"
+    assert result.changes["truncated_lines"] == 2
+    assert patch_normalizer.normalize("- A\n**Kurzzusammenfassung** kurz\n- B", partial=True).text == "- A"
+
+
+def test_repair_is_applied_and_counted():
+    result = patch_normalizer.normalize("[ Heroes ]\n- A", repair=lambda text: text.replace("[ Heroes ]", "## Heroes"))
+    assert result.text == "## Heroes\n- A"
+    assert result.changes["headers_repaired"] == 1
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_reference_chain(monkeypatch, text):
+    monkeypatch.setattr(main.perplexity_requests, "ROLE_PING", PING)
+    for mode, (reference, fused) in bench_normalizer._modes("2026-01-01").items():
+        assert fused(text) == reference(text), mode
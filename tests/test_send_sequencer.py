@@ -0,0 +1,62 @@
+"""Send turns in detection order for parallel patch workers."""
+import asyncio
+
+import main
+
+
+async def _worker(sequencer: main._SendSequencer, seq: int, delay: float, order: list[int]) -> None:
+    # Spaetere Posts sind mit dem Uebersetzen frueher fertig als fruehere.
+    await asyncio.sleep(delay)
+    async with sequencer.turn(seq):
+        order.append(seq)
+
+
+def test_turns_follow_reservation_order():
+    async def run() -> list[int]:
+        sequencer = main._SendSequencer()
+        seqs = [sequencer.reserve() for _ in range(4)]
+        order: list[int] = []
+        delays = [0.04, 0.03, 0.0, 0.01]
+        await asyncio.gather(*(_worker(sequencer, seq, delay, order) for seq, delay in zip(seqs, delays)))
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+
+
+def test_released_seq_unblocks_followers():
+    async def run() -> tuple[list[int], bool]:
+        sequencer = main._SendSequencer()
+        first, second, third = (sequencer.reserve() for _ in range(3))
+        order: list[int] = []
+        waiting = asyncio.create_task(_worker(sequencer, third, 0.0, order))
+        await asyncio.sleep(0.01)
+        blocked = not waiting.done()
+        # Fehlgeschlagene Posts geben ihren Platz frei, ohne zu senden; Reihenfolge der Freigabe egal.
+        await sequencer.release(second)
+        await sequencer.release(first)
+        await asyncio.wait_for(waiting, 1)
+        return order, blocked
+
+    order, blocked = asyncio.run(run())
+    assert blocked
+    assert order == [2]
+
+
+def test_is_current():
+    async def run() -> list[bool]:
+        sequencer = main._SendSequencer()
+        first, second = sequencer.reserve(), sequencer.reserve()
+        before = [sequencer.is_current(first), sequencer.is_current(second)]
+        await sequencer.release(first)
+        return before + [sequencer.is_current(second)]
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_checkpoint_only_moves_forward(monkeypatch):
+    saved: list[str] = []
+    monkeypatch.setattr(main, "_checkpoint_seq", -1)
+    monkeypatch.setattr(main._db_writer, "submit", lambda func, url: saved.append(url))
+    for url, seq in (("b", 1), ("a", 0), ("c", 2)):
+        main._advance_checkpoint(url, seq)
+    assert saved == ["b", "c"]
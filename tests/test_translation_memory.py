@@ -0,0 +1,111 @@
+"""Local, masked and skipped plans of the bullet translation memory."""
+import translation_memory
+
+RAW = """[ General ]
+- Mid Boss health increased from 7000 to 7500
+- Troopers now spawn 5s earlier
+
+[ Heroes ]
+- Abrams: Siphon Life damage increased from 10 to 20
+- Abrams: Shoulder Charge cooldown reduced from 35s to 30s
+- Haze: Bullet Dance duration reduced from 6s to 5s
+"""
+
+TRANSLATED = """### Deadlock Patch Notes
+## General
+- Mid Boss Leben von 7000 auf 7500 erhoeht
+- Troopers spawnen jetzt 5s frueher
+
+## Heroes
+- Abrams: Siphon Life Schaden von 10 auf 20 erhoeht
+- Abrams: Shoulder Charge Abklingzeit von 35s auf 30s reduziert
+- Haze: Bullet Dance Dauer von 6s auf 5s reduziert
+"""
+
+
+def _memory() -> translation_memory.TranslationMemory:
+    memory = translation_memory.TranslationMemory()
+    assert memory.learn(RAW, TRANSLATED) == 5
+    return memory
+
+
+def test_align_bullets_pairs_groups_with_equal_counts():
+    pairs = translation_memory.align_bullets(RAW, TRANSLATED)
+    assert ("Troopers now spawn 5s earlier", "Troopers spawnen jetzt 5s frueher") in pairs
+    assert len(pairs) == 5
+
+    # Haze hat in der Uebersetzung einen Bullet zu viel: die Gruppe wird nicht zugeordnet.
+    extra = TRANSLATED + "- Haze: Smoke Bomb Abklingzeit reduziert\n"
+    pairs = translation_memory.align_bullets(RAW, extra)
+    assert len(pairs) == 4
+    assert all(not raw.startswith("Bullet Dance") for raw, _ in pairs)
+
+
+def test_learn_ignores_untranslated_output():
+    memory = translation_memory.TranslationMemory()
+    assert memory.learn(RAW, RAW) == 0
+    assert len(memory) == 0
+
+
+def test_fully_known_patch_is_assembled_locally():
+    plan = _memory().plan(RAW)
+    assert plan is not None and plan.masked_content is None
+    assert plan.local_text == TRANSLATED.strip()
+    assert (plan.hits, plan.bullets) == (5, 5)
+
+
+def test_name_headers_are_kept_in_local_text():
+    raw = RAW.replace("- Haze: ", "**Haze**\n- ")
+    translated = TRANSLATED.replace("- Haze: ", "**Haze**\n- ")
+    memory = translation_memory.TranslationMemory()
+    memory.learn(raw, translated)
+    plan = memory.plan(raw)
+    assert plan is not None and plan.local_text is not None
+    assert "**Haze**\n- Bullet Dance Dauer von 6s auf 5s reduziert" in plan.local_text
+
+
+def test_topic_header_prevents_local_text():
+    raw = RAW.replace("[ General ]\n", "[ General ]\n**Map Changes**\n")
+    plan = _memory().plan(raw)
+    assert plan is not None
+    assert plan.local_text is None
+    assert "**Map Changes**" in plan.masked_content
+
+
+def test_partially_known_patch_is_masked_and_spliced():
+    raw = RAW + "- Haze: Smoke Bomb cooldown reduced from 40s to 35s\n"
+    plan = _memory().plan(raw)
+    assert plan is not None and plan.local_text is None
+    assert "- Abrams: {{TM3}}" in plan.masked_content
+    assert plan.masked_content.endswith("- Haze: Smoke Bomb cooldown reduced from 40s to 35s")
+
+    model_output = plan.masked_content.replace(
+        "Smoke Bomb cooldown reduced from 40s to 35s", "Smoke Bomb Abklingzeit von 40s auf 35s reduziert"
+    )
+    spliced = plan.splice(model_output)
+    assert "- Abrams: Shoulder Charge Abklingzeit von 35s auf 30s reduziert" in spliced
+    assert "{{TM" not in spliced
+
+
+def test_splice_returns_none_when_placeholder_is_missing():
+    plan = _memory().plan(RAW + "- Haze: Smoke Bomb cooldown reduced from 40s to 35s\n")
+    assert plan is not None
+    assert plan.splice(plan.masked_content.replace("{{TM2}}", "Troopers spawnen frueher")) is None
+    assert plan.splice(plan.masked_content + "\n- {{TM9}}") is None
+
+
+def test_plan_is_none_when_memory_does_not_help():
+    assert translation_memory.TranslationMemory().plan(RAW) is None
+
+    unknown = "\n".join(
+        f"- Ability {index} damage increased from {index} to {index + 1}" for index in range(10)
+    )
+    assert _memory().plan(unknown + "\n- Troopers now spawn 5s earlier") is None
+
+
+def test_learn_replaces_entries_instead_of_mutating_them():
+    memory = _memory()
+    entries = memory._entries
+    memory.learn("- Haze: Smoke Bomb cooldown reduced\n", "- Haze: Smoke Bomb Abklingzeit reduziert\n")
+    assert memory._entries is not entries
+    assert len(entries) == 5 and len(memory) == 6
@@ -0,0 +1,200 @@
+"""Bullet-level translation memory learned from earlier raw/translated pairs.
+
+Known bullets are filled in locally: a patch made only of known bullets and
+headers that need no translation is assembled without an API call, otherwise
+known bullets are masked with placeholders and only the rest goes to the
+model.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+import hero_index
+import patch_chunking
+import patch_document
+import perplexity_requests
+
+PLACEHOLDER_FORMAT = "{{{{TM{index}}}}}"
+_PLACEHOLDER_RE = re.compile(r"\{\{TM(\d+)\}\}")
+_KEY_STRIP_RE = re.compile(r"[\s.;:!]+$")
+
+# Masking only pays off if a meaningful share of the bullets is already known.
+MIN_MASK_RATIO = 0.3
+
+
+def normalize_key(text: str) -> str:
+    normalized = " ".join((text or "").split()).casefold()
+    return _KEY_STRIP_RE.sub("", normalized)
+
+
+def _group_key(text: str) -> str:
+    canonical = perplexity_requests.canonical_hero_name(text)
+    return normalize_key(canonical or text).strip("*[]# ")
+
+
+def _grouped_bullets(text: str) -> dict[str, list[str]]:
+    """Bullet bodies grouped by the nearest bold/section header or hero prefix."""
+    groups: dict[str, list[str]] = {}
+    for bullet in patch_document.parse(text).bullets:
+        if bullet.hero:
+            group = _group_key(bullet.hero)
+        else:
+            group = _group_key(bullet.header) if bullet.header else ""
+        groups.setdefault(group, []).append(bullet.body)
+    return groups
+
+
+def align_bullets(raw_content: str, translated_content: str) -> list[tuple[str, str]]:
+    """Pair raw and translated bullets group by group where the counts agree."""
+    raw_groups = _grouped_bullets(raw_content)
+    translated_groups = _grouped_bullets(translated_content)
+    pairs: list[tuple[str, str]] = []
+    for group, raw_bullets in raw_groups.items():
+        translated_bullets = translated_groups.get(group)
+        if not translated_bullets or len(translated_bullets) != len(raw_bullets):
+            continue
+        for raw_body, translated_body in zip(raw_bullets, translated_bullets):
+            # Grobe Plausibilitaet, damit verrutschte Zuordnungen nicht gelernt werden.
+            if not 0.5 <= len(translated_body) / max(1, len(raw_body)) <= 3.0:
+                continue
+            pairs.append((raw_body, translated_body))
+    return pairs
+
+
+def _local_headers(document: patch_document.PatchDocument) -> dict[int, str]:
+    """Headers the model would write unchanged, by line: section kinds and hero/item names.
+
+    Topic headers are missing from the result; they still need a translation.
+    """
+    headers: dict[int, str] = {}
+    for section in document.sections:
+        if section.title is not None and section.kind is not None:
+            headers[section.line] = f"## {section.kind.title()}"
+        for group in section.groups:
+            if group.title is None:
+                continue
+            name = group.hero
+            if name is None:
+                match = hero_index.heading_name(group.title)
+                name = match.name if match is not None else None
+            if name is not None:
+                headers[group.line] = f"**{name}**"
+    return headers
+
+
+@dataclass
+class TranslationPlan:
+    masked_content: str | None
+    local_text: str | None
+    fills: dict[int, str] = field(default_factory=dict)
+    hits: int = 0
+    bullets: int = 0
+
+    def splice(self, translated: str) -> str | None:
+        """Replace placeholders in the model output; None if any went missing."""
+        seen: set[int] = set()
+
+        def _replace(match: re.Match) -> str:
+            index = int(match.group(1))
+            seen.add(index)
+            return self.fills.get(index, match.group(0))
+
+        spliced = _PLACEHOLDER_RE.sub(_replace, translated or "")
+        if seen != set(self.fills) or _PLACEHOLDER_RE.search(spliced):
+            return None
+        return spliced
+
+
+class TranslationMemory:
+    def __init__(self) -> None:
+        # Wird bei learn() ersetzt statt veraendert: plan() liest parallel im CPU-Pool.
+        self._entries: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def learn(self, raw_content: str, translated_content: str) -> int:
+        if not raw_content or not translated_content or raw_content.strip() == translated_content.strip():
+            return 0
+        learned: dict[str, str] = {}
+        for raw_body, translated_body in align_bullets(raw_content, translated_content):
+            key = normalize_key(raw_body)
+            if key:
+                learned[key] = translated_body
+        if learned:
+            self._entries = {**self._entries, **learned}
+        return len(learned)
+
+    def lookup(self, bullet_body: str, entries: dict[str, str] | None = None) -> str | None:
+        return (self._entries if entries is None else entries).get(normalize_key(bullet_body))
+
+    def plan(self, raw_content: str) -> TranslationPlan | None:
+        """Fill known bullets locally.
+
+        Returns a plan with local_text when every content line is known (no API
+        call needed), with masked_content when enough bullets are known to send
+        only the rest, or None when the memory does not help.
+        """
+        entries = self._entries
+        if not entries or not raw_content:
+            return None
+
+        document = patch_document.parse(raw_content)
+        bullets_by_line = {bullet.line: bullet for bullet in document.bullets}
+        local_headers = _local_headers(document)
+        masked_lines: list[str] = []
+        local_lines: list[str] = ["### Deadlock Patch Notes"]
+        fills: dict[int, str] = {}
+        bullets = 0
+        fully_known = True
+
+        for index, line in enumerate(document.lines):
+            if line.kind == patch_chunking.BLANK:
+                masked_lines.append(line.text)
+                local_lines.append("")
+                continue
+            if line.kind == patch_chunking.HEADER:
+                masked_lines.append(line.text)
+                header = local_headers.get(index)
+                if header is None:
+                    # Themen-Ueberschrift: braucht eine Uebersetzung, also nicht lokal zusammensetzen.
+                    fully_known = False
+                else:
+                    local_lines.append(header)
+                continue
+            bullet = bullets_by_line.get(index)
+            if bullet is None:
+                fully_known = False
+                masked_lines.append(line.text)
+                continue
+            bullets += 1
+            translation = self.lookup(bullet.body, entries)
+            if translation is None:
+                fully_known = False
+                masked_lines.append(line.text)
+                continue
+            fill_index = len(fills) + 1
+            fills[fill_index] = translation
+            prefix = f"{bullet.hero}: " if bullet.hero else ""
+            masked_lines.append(f"{bullet.indent}- {prefix}{PLACEHOLDER_FORMAT.format(index=fill_index)}")
+            local_lines.append(f"{bullet.indent}- {prefix}{translation}")
+
+        if not fills:
+            return None
+        if fully_known:
+            return TranslationPlan(
+                masked_content=None,
+                local_text="\n".join(local_lines).strip(),
+                hits=len(fills),
+                bullets=bullets,
+            )
+        if len(fills) / max(1, bullets) < MIN_MASK_RATIO:
+            return None
+        return TranslationPlan(
+            masked_content="\n".join(masked_lines),
+            local_text=None,
+            fills=fills,
+            hits=len(fills),
+            bullets=bullets,
+        )